@@ -1,9 +1,11 @@
 import os
 import logging
 import time
-from flask import Flask, jsonify, request, g
+import hmac
+from flask import Flask, Response, jsonify, request, g
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import SQLAlchemyError
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
@@ -13,8 +15,12 @@ from .models.database import db, create_database
 from .models.plant import Plant
 from .models.journal_entry import JournalEntry
 from .models.harvest import Harvest
+from .models.geocode import GeocodedZip
 from .config import config_by_name
 from .logging_config import setup_logging
+from .metrics import collect, init_metrics, render
+from .profiling import init_profiling
+from .query_stats import start_request_stats
 from .errors import register_error_handlers
 
 # Load environment variables
@@ -71,8 +77,10 @@ def create_app(config_name=None):
         response.headers["X-Frame-Options"] = "DENY"
         response.headers["X-XSS-Protection"] = "1; mode=block"
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
+        # Routes that opt into HTTP caching set their own Cache-Control
+        if "Cache-Control" not in response.headers:
+            response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
+            response.headers["Pragma"] = "no-cache"
         # Content-Security-Policy - restrictive default
         response.headers["Content-Security-Policy"] = "default-src 'self'; frame-ancestors 'none'"
         # Strict-Transport-Security for HTTPS environments
@@ -84,20 +92,45 @@ def create_app(config_name=None):
     @app.before_request
     def log_request_start():
         g.request_start_time = time.time()
+        start_request_stats()
 
     @app.after_request
     def log_request_end(response):
         if hasattr(g, "request_start_time"):
             duration_ms = (time.time() - g.request_start_time) * 1000
+            stats = g.query_stats
             logger.info(
-                "method=%s path=%s status=%s duration_ms=%.1f",
+                "method=%s path=%s status=%s duration_ms=%.1f queries=%d db_ms=%.1f",
                 request.method,
                 request.path,
                 response.status_code,
                 duration_ms,
+                stats.count,
+                stats.total_ms,
             )
+            for statement, times in stats.repeated(app.config["QUERY_REPEAT_WARN"]):
+                logger.warning(
+                    "repeated_query path=%s times=%d statement=%s",
+                    request.path,
+                    times,
+                    " ".join(statement.split()),
+                )
+            response.headers["Server-Timing"] = stats.server_timing(duration_ms)
         return response
 
+    init_metrics(app)
+    init_profiling(app)
+
+    # Zone lookups work without the offline table, but every one goes over HTTP
+    zone_table = app.config.get("HARDINESS_ZONE_TABLE")
+    if not app.testing and not (zone_table and os.path.exists(zone_table)):
+        logger.warning(
+            "Hardiness zone table not found at %s; zone lookups will %s. "
+            "Build it with app/scripts/build_hardiness_zone_table.py",
+            zone_table,
+            "use phzmapi.org" if app.config.get("HARDINESS_ZONE_HTTP_FALLBACK", True) else "fail",
+        )
+
     # Register Blueprints
     from .routes.hardiness import hardiness_bp
     from .routes.weather import weather_bp
@@ -116,6 +149,7 @@ def create_app(config_name=None):
     from .routes.harvests import harvests_bp
     from .routes.soil import soil_bp
     from .routes.seasonal_tips import seasonal_tips_bp
+    from .routes.profiling import profiling_bp
 
     app.register_blueprint(hardiness_bp, url_prefix="/api/hardiness")
     app.register_blueprint(weather_bp, url_prefix="/api/weather")
@@ -139,6 +173,7 @@ def create_app(config_name=None):
     app.register_blueprint(harvests_bp, url_prefix="/api/harvests")
     app.register_blueprint(soil_bp, url_prefix="/api/soil")
     app.register_blueprint(seasonal_tips_bp, url_prefix="/api/tips/seasonal")
+    app.register_blueprint(profiling_bp, url_prefix="/api/admin/profiling")
 
     # Health check endpoint
     @app.route("/api/health", methods=["GET"])
@@ -159,9 +194,31 @@ def create_app(config_name=None):
 
         return jsonify(health), status_code
 
+    # Prometheus scrape endpoint
+    @app.route("/api/metrics", methods=["GET"])
+    @limiter.exempt
+    def metrics():
+        token = app.config.get("METRICS_TOKEN")
+        if token and not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return jsonify({"error": "Unauthorized"}), 401
+        body = render(collect(app.config.get("METRICS_DIR")))
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
     @app.route("/")
     def home():
         return {"message": "Welcome to my Gardening App Backend!"}
 
+    # Load the plant catalog and build the planting calendars before the
+    # first request; catalog changes rebuild them in the background
+    if not app.testing:
+        from .routes.planting_calendar import warm_planting_calendars
+        try:
+            warm_planting_calendars(app)
+        except SQLAlchemyError as e:
+            # E.g. `flask db upgrade` on a database without the plant table yet
+            logger.warning("Planting calendars not prebuilt: %s", e)
+
     logger.info("Application created with %s configuration", config_name)
     return app
@@ -41,6 +41,33 @@ class BaseConfig:
 
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    # Log statements slower than this with their parameters
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+    # Log a statement run this many times in one request as a likely N+1
+    QUERY_REPEAT_WARN = int(os.getenv("QUERY_REPEAT_WARN", "10"))
+
+    # Metrics: shared snapshot directory for multi-worker servers, and an
+    # optional bearer token required to scrape /api/metrics
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Share of requests profiled with cProfile (admins can also send X-Profile: 1)
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    # Captured profiles kept per process
+    PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+
+    # How often (seconds) each process re-checks the shared plant catalog version
+    PLANT_CATALOG_RECHECK_SECONDS = float(os.getenv("PLANT_CATALOG_RECHECK_SECONDS", "5"))
+
+    # Offline zip -> USDA hardiness zone table (built by app/scripts/build_hardiness_zone_table.py)
+    HARDINESS_ZONE_TABLE = os.getenv(
+        "HARDINESS_ZONE_TABLE", os.path.join(BASE_DIR, "data", "hardiness_zones.bin")
+    )
+    # Ask phzmapi.org about zip codes the table does not cover
+    HARDINESS_ZONE_HTTP_FALLBACK = os.getenv("HARDINESS_ZONE_HTTP_FALLBACK", "true").lower() == "true"
+    # Let profile saves return before a fallback zone lookup finishes
+    HARDINESS_ZONE_ASYNC = os.getenv("HARDINESS_ZONE_ASYNC", "true").lower() == "true"
 
 
 class DevelopmentConfig(BaseConfig):
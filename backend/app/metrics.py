@@ -0,0 +1,361 @@
+"""
+Prometheus-style metrics, served as text exposition at ``/api/metrics``.
+
+Collected:
+    - request latency histograms and counts by endpoint, method and status
+    - in-flight requests and SQL statements per endpoint
+    - time spent waiting for a pooled database connection
+    - latency and errors of upstream calls (Open-Meteo, phzmapi, Google)
+    - hit/miss/stale counts and hit ratios of every ``TTLCache``
+
+Recording is lock-free: each thread only ever writes to its own shard of
+counters, and a scrape sums the shards. Shards of finished threads are
+folded into a retired total.
+
+Each gunicorn worker is a separate process with its own shards. When
+``METRICS_DIR`` is set, every worker writes a snapshot of its totals to
+``<METRICS_DIR>/<pid>.json`` every ``METRICS_FLUSH_SECONDS`` and a scrape
+merges the snapshots of all workers. In-flight gauges of workers that have
+exited are dropped. Empty the directory when the server is (re)started.
+"""
+
+import bisect
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .services.ttl_cache import all_caches
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "gardening_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests handled.", None),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency.", LATENCY_BUCKETS),
+    "http_requests_in_flight": ("gauge", "HTTP requests being handled.", None),
+    "db_statements_total": ("counter", "SQL statements executed by requests.", None),
+    "db_pool_checkout_wait_seconds": (
+        "histogram", "Time spent waiting for a pooled database connection.", POOL_WAIT_BUCKETS),
+    "external_request_duration_seconds": ("histogram", "Latency of upstream API calls.", LATENCY_BUCKETS),
+    "external_request_errors_total": ("counter", "Failed upstream API calls.", None),
+    "cache_hits_total": ("counter", "Fresh cache hits.", None),
+    "cache_stale_hits_total": ("counter", "Stale cache hits served while refreshing.", None),
+    "cache_misses_total": ("counter", "Cache misses.", None),
+    "cache_hit_ratio": ("gauge", "Share of cache lookups served from the cache.", None),
+}
+
+# Gauges summed over live processes only
+LIVE_GAUGES = {"http_requests_in_flight"}
+
+
+class _Shard:
+    """Metric values written by one thread."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.thread = threading.current_thread()
+        self.values = {}      # (name, labels) -> float
+        self.histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+
+
+_local = threading.local()
+_shards = []
+_retired = _Shard()
+_shards_lock = threading.Lock()
+
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None or shard.pid != os.getpid():
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            if _retired.pid != shard.pid:
+                # Forked worker: drop totals inherited from the parent
+                _reset()
+            _shards.append(shard)
+    return shard
+
+
+def _reset():
+    global _retired
+    _shards.clear()
+    _retired = _Shard()
+
+
+def inc(name, labels=(), amount=1.0):
+    """Add to a counter or gauge. ``labels`` is a tuple of (key, value) pairs."""
+    values = _shard().values
+    key = (name, labels)
+    values[key] = values.get(key, 0.0) + amount
+
+
+def observe(name, value, labels=()):
+    """Record a histogram observation."""
+    histograms = _shard().histograms
+    key = (name, labels)
+    counts = histograms.get(key)
+    buckets = METRICS[name][2]
+    if counts is None:
+        counts = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+    counts[bisect.bisect_left(buckets, value)] += 1
+    counts[-1] += value
+
+
+@contextmanager
+def external_call(service):
+    """Time an upstream API call; an exception counts as an error."""
+    labels = (("service", service),)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("external_request_errors_total", labels)
+        raise
+    finally:
+        observe("external_request_duration_seconds", time.perf_counter() - start, labels)
+
+
+def _merge(target, source):
+    values, histograms = target
+    for key, value in source.values.items():
+        values[key] = values.get(key, 0.0) + value
+    for key, counts in source.histograms.items():
+        merged = histograms.get(key)
+        if merged is None:
+            histograms[key] = list(counts)
+        else:
+            for i, count in enumerate(counts):
+                merged[i] += count
+
+
+def _process_totals():
+    """Sum this process's shards, retiring those of finished threads."""
+    totals = ({}, {})
+    with _shards_lock:
+        for shard in list(_shards):
+            if not shard.thread.is_alive():
+                _merge((_retired.values, _retired.histograms), shard)
+                _shards.remove(shard)
+        shards = list(_shards)
+        _merge(totals, _retired)
+    for shard in shards:
+        # dict.copy() is atomic under the GIL, so a concurrent insert is safe
+        snapshot = _Shard.__new__(_Shard)
+        snapshot.values = shard.values.copy()
+        snapshot.histograms = {key: list(counts) for key, counts in shard.histograms.copy().items()}
+        _merge(totals, snapshot)
+
+    values = totals[0]
+    for cache in all_caches():
+        labels = (("cache", cache.name),)
+        values[("cache_hits_total", labels)] = float(cache.hits)
+        values[("cache_stale_hits_total", labels)] = float(cache.stale_hits)
+        values[("cache_misses_total", labels)] = float(cache.misses)
+    return totals
+
+
+# Multi-process snapshots
+
+def _encode(totals):
+    values, histograms = totals
+    return {
+        "values": [[name, list(labels), value] for (name, labels), value in values.items()],
+        "histograms": [[name, list(labels), counts] for (name, labels), counts in histograms.items()],
+    }
+
+
+def _decode(data):
+    values = {(name, tuple(map(tuple, labels))): value for name, labels, value in data["values"]}
+    histograms = {(name, tuple(map(tuple, labels))): counts for name, labels, counts in data["histograms"]}
+    return values, histograms
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(directory):
+    """Atomically write this process's totals to ``<directory>/<pid>.json``."""
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(_encode(_process_totals()), fh)
+    os.replace(tmp_path, os.path.join(directory, f"{os.getpid()}.json"))
+
+
+_flusher_pid = None
+
+
+def _start_flusher(directory, interval):
+    global _flusher_pid
+    with _shards_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    def flush_forever():
+        while True:
+            time.sleep(interval)
+            try:
+                write_snapshot(directory)
+            except OSError as e:
+                logger.warning("Failed to write metrics snapshot to %s: %s", directory, e)
+
+    threading.Thread(target=flush_forever, name="metrics-flusher", daemon=True).start()
+
+
+def collect(directory=None):
+    """Return merged (values, histograms) for this process or all workers."""
+    totals = _process_totals()
+    if not directory:
+        return totals
+    own = f"{os.getpid()}.json"
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        if os.path.basename(path) == own:
+            continue
+        try:
+            pid = int(os.path.basename(path)[:-len(".json")])
+            with open(path) as fh:
+                values, histograms = _decode(json.load(fh))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Skipping unreadable metrics snapshot %s: %s", path, e)
+            continue
+        if not _pid_alive(pid):
+            values = {key: v for key, v in values.items() if key[0] not in LIVE_GAUGES}
+        snapshot = _Shard.__new__(_Shard)
+        snapshot.values, snapshot.histograms = values, histograms
+        _merge(totals, snapshot)
+    return totals
+
+
+# Exposition
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals):
+    """Render (values, histograms) in the Prometheus text format."""
+    values, histograms = totals
+
+    # Hit ratio per cache, from the merged counters
+    for (name, labels), hits in list(values.items()):
+        if name == "cache_hits_total":
+            served = hits + values.get(("cache_stale_hits_total", labels), 0.0)
+            total = served + values.get(("cache_misses_total", labels), 0.0)
+            values[("cache_hit_ratio", labels)] = served / total if total else 0.0
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        full_name = PREFIX + name
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), counts in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + [float("inf")], counts[:-1]):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{_label_text(labels, [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{full_name}_sum{_label_text(labels)} {counts[-1]}")
+                lines.append(f"{full_name}_count{_label_text(labels)} {cumulative}")
+        else:
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{full_name}{_label_text(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Flask and SQLAlchemy hooks
+
+def init_metrics(app):
+    """Record request metrics for ``app`` and start the snapshot writer if configured."""
+
+    @app.before_request
+    def _metrics_request_start():
+        g.metrics_start = time.perf_counter()
+        g.metrics_endpoint = request.endpoint or "unmatched"
+        inc("http_requests_in_flight", (("endpoint", g.metrics_endpoint),))
+        directory = app.config.get("METRICS_DIR")
+        if directory and _flusher_pid != os.getpid():
+            _start_flusher(directory, app.config.get("METRICS_FLUSH_SECONDS", 5.0))
+
+    @app.after_request
+    def _metrics_request_end(response):
+        if "metrics_start" in g:
+            endpoint = (("endpoint", g.metrics_endpoint),)
+            status = str(response.status_code)
+            observe("http_request_duration_seconds", time.perf_counter() - g.metrics_start,
+                    endpoint + (("status", status),))
+            inc("http_requests_total", endpoint + (("method", request.method), ("status", status)))
+            stats = g.get("query_stats")
+            if stats is not None and stats.count:
+                inc("db_statements_total", endpoint, stats.count)
+        return response
+
+    @app.teardown_request
+    def _metrics_request_teardown(exc):
+        if "metrics_start" in g:
+            inc("http_requests_in_flight", (("endpoint", g.metrics_endpoint),), -1.0)
+
+
+# Pool checkout wait: from the first statement or flush of a session
+# transaction until the session has its connection (after_begin).
+
+def _mark_checkout_start(session):
+    session.info.setdefault("metrics_checkout_start", time.perf_counter())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _metrics_orm_execute(orm_execute_state):
+    _mark_checkout_start(orm_execute_state.session)
+
+
+@event.listens_for(Session, "before_flush")
+def _metrics_before_flush(session, flush_context, instances):
+    _mark_checkout_start(session)
+
+
+@event.listens_for(Session, "after_begin")
+def _metrics_after_begin(session, transaction, connection):
+    start = session.info.pop("metrics_checkout_start", None)
+    if start is not None:
+        observe("db_pool_checkout_wait_seconds", time.perf_counter() - start)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _metrics_transaction_end(session):
+    session.info.pop("metrics_checkout_start", None)
@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+from .database import db
+
+
+class GeocodedZip(db.Model):
+    """Persistent zip code -> coordinates cache for the weather lookup."""
+    __tablename__ = "geocoded_zip"
+
+    zip_code = db.Column(db.String(10), primary_key=True)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<GeocodedZip {self.zip_code}>"
@@ -60,5 +60,41 @@ class Harvest(db.Model):
     plant = db.relationship("Plant", backref="harvests")
     user = db.relationship("User", backref="harvests")
 
+    __table_args__ = (
+        # Per-garden listing, newest first, and per-user history/summary
+        db.Index("ix_harvest_garden_user_date", "garden_id", "user_id", "harvest_date"),
+        db.Index("ix_harvest_user_date", "user_id", "harvest_date"),
+    )
+
     def __repr__(self):
         return f"<Harvest id={self.id} plant_id={self.plant_id} quantity={self.quantity}{self.unit}>"
+
+
+class HarvestUserRollup(db.Model):
+    """Running harvest count per user (maintained by services.harvest_rollups)."""
+    __tablename__ = "harvest_user_rollup"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    harvest_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class HarvestPlantRollup(db.Model):
+    """Running harvest count and quantity per user, plant and unit."""
+    __tablename__ = "harvest_plant_rollup"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    plant_id = db.Column(db.Integer, db.ForeignKey("plant.id"), primary_key=True)
+    unit = db.Column(db.String(20), primary_key=True)
+    harvest_count = db.Column(db.Integer, nullable=False, default=0)
+    total_quantity = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class HarvestMonthRollup(db.Model):
+    """Running harvest count and quantity per user and calendar month."""
+    __tablename__ = "harvest_month_rollup"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)
+    harvest_count = db.Column(db.Integer, nullable=False, default=0)
+    total_quantity = db.Column(db.Float, nullable=False, default=0.0)
@@ -40,3 +40,8 @@ class JournalEntry(db.Model):
 
     garden = db.relationship("UserGarden", backref="journal_entries")
     user = db.relationship("User", backref="journal_entries")
+
+    __table_args__ = (
+        # Per-garden listing, newest first
+        db.Index("ix_journal_entry_garden_user_date", "garden_id", "user_id", "entry_date"),
+    )
@@ -1,6 +1,28 @@
+import re
 from marshmallow import Schema, fields, validate
+from sqlalchemy import event
 from .database import db
 
+_ZONE_RE = re.compile(r"^\s*(\d{1,2})\s*([ab])?\s*$", re.IGNORECASE)
+
+
+def zone_code_range(zone):
+    """Return the (lowest, highest) half-zone codes covered by a zone string.
+
+    Half-zones are numbered consecutively: 7a -> 14, 7b -> 15. A bare "7"
+    covers both halves, (14, 15). Returns (None, None) if unparseable.
+    """
+    match = _ZONE_RE.match(zone or "")
+    if not match:
+        return None, None
+    code = int(match.group(1)) * 2
+    half = (match.group(2) or "").lower()
+    if half == "a":
+        return code, code
+    if half == "b":
+        return code + 1, code + 1
+    return code, code + 1
+
 class PlantSchema(Schema):
     """
     Validation schema for plant data.
@@ -119,6 +141,29 @@ class Plant(db.Model):
     height = db.Column(db.Float) # Height in inches/cm
     description = db.Column(db.Text) # Description of the plant
     image_url = db.Column(db.Text) # URL to the plant image
-    
+
+    # Integer half-zone bounds derived from hardiness_min/max (see zone_code_range)
+    hardiness_min_code = db.Column(db.Integer)
+    hardiness_max_code = db.Column(db.Integer)
+
     def __repr__(self):
-        return f"<Plant {self.name}>"
\ No newline at end of file
+        return f"<Plant {self.name}>"
+
+
+@event.listens_for(Plant, "before_insert")
+@event.listens_for(Plant, "before_update")
+def _sync_zone_codes(mapper, connection, plant):
+    plant.hardiness_min_code = zone_code_range(plant.hardiness_min)[0]
+    plant.hardiness_max_code = zone_code_range(plant.hardiness_max)[1]
+
+
+class PlantCatalogVersion(db.Model):
+    """Single-row counter bumped whenever the plant catalog is written.
+
+    Lets every worker process notice catalog changes made elsewhere
+    (other workers, the import scripts) with one primary-key read.
+    """
+    __tablename__ = "plant_catalog_version"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
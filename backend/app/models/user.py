@@ -113,7 +113,7 @@ class User(db.Model):
         comment="Indicates whether the user has admin privileges"
     )
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    last_login_at = db.Column(db.DateTime, nullable=True)
+    last_login_at = db.Column(db.DateTime, nullable=True, index=True)
     
     def set_password(self, password):
         """Hashes the password and stores it."""
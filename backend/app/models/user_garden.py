@@ -119,6 +119,11 @@ class UserGarden(db.Model):
     # Grid dimensions for interactive garden map
     grid_rows = db.Column(db.Integer, nullable=True, default=8)
     grid_cols = db.Column(db.Integer, nullable=True, default=10)
+
+    # Bumped whenever plants are added to or removed from this garden
+    contents_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Bumped once per transaction that changes the garden map (see services/map_versions.py)
+    map_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     
     # Timestamp management with timezone awareness
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -126,4 +131,9 @@ class UserGarden(db.Model):
     
     # Relationship definitions
     user = db.relationship("User", backref="garden")
-    garden_type = db.relationship("GardenType", backref="garden_type")
\ No newline at end of file
+    garden_type = db.relationship("GardenType", backref="garden_type")
+
+    __table_args__ = (
+        # Covers ownership checks and garden_contents_key()
+        db.Index("ix_user_garden_user_contents", "user_id", "id", "contents_version"),
+    )
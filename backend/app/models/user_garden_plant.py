@@ -71,4 +71,25 @@ class UserGardenPlant(db.Model):
 
     garden = db.relationship("UserGarden", backref="garden_plants", lazy="joined")
     plant = db.relationship("Plant", backref="plant_gardens")
-    
\ No newline at end of file
+
+    __table_args__ = (
+        # One plant per map cell; unplaced plants (NULL row/col) are not constrained
+        db.Index("uq_user_garden_plant_garden_cell", "garden_id", "row", "col", unique=True),
+    )
+
+
+class GardenMapChange(db.Model):
+    """A garden plant that changed (placed, moved, updated or removed) in a map version."""
+
+    __tablename__ = "garden_map_change"
+
+    id = db.Column(db.Integer, primary_key=True)
+    garden_id = db.Column(db.Integer, db.ForeignKey("user_garden.id"), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    # Not a foreign key: removals are logged after the plant row is gone
+    garden_plant_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        # Changes of a garden since a version
+        db.Index("ix_garden_map_change_garden_version", "garden_id", "version"),
+    )
@@ -0,0 +1,185 @@
+"""
+Opt-in request profiling.
+
+A request runs under ``cProfile`` when an admin sends ``X-Profile: 1`` with
+it, or when it is picked by the sampling rate (``PROFILE_SAMPLE_RATE``, or
+changed at runtime through ``/api/admin/profiling``). The resulting pstats
+go into a fixed-size ring buffer, newest first, from which admins can list
+and download them; profiled responses carry an ``X-Profile-Id`` header.
+
+The sampling rate and the buffer are per process: with several gunicorn
+workers each keeps its own, so enable sampling through the config (or
+repeat the runtime change) to cover all of them.
+
+Only one request per process is profiled at a time: from Python 3.12 a
+second active ``cProfile`` profiler fails to enable, and one profiler sees
+every thread, so overlapping profiles would mix requests. A request that
+would be profiled while another one is runs unprofiled.
+"""
+
+import cProfile
+import io
+import itertools
+import logging
+import marshal
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from .models.database import db
+from .models.user import User
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+# Endpoints never profiled (the profiler's own admin routes)
+EXCLUDED_ENDPOINTS = {"profiling.get_profiling", "profiling.update_profiling",
+                      "profiling.download_profile"}
+
+
+class _LoadedStats:
+    """Adapter that lets ``pstats.Stats`` read a stored stats dict."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class ProfileBuffer:
+    """Thread-safe ring buffer of captured profiles."""
+
+    def __init__(self, size):
+        self._profiles = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.sample_rate = None  # None: use PROFILE_SAMPLE_RATE
+
+    def resize(self, size):
+        with self._lock:
+            if size != self._profiles.maxlen:
+                self._profiles = deque(self._profiles, maxlen=size)
+
+    def add(self, profile):
+        with self._lock:
+            profile["id"] = next(self._ids)
+            self._profiles.appendleft(profile)
+        return profile["id"]
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+    def list(self):
+        with self._lock:
+            return [{key: value for key, value in p.items() if key != "stats"} for p in self._profiles]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profiles = ProfileBuffer(50)
+
+# Held by the request being profiled
+_profiler_lock = threading.Lock()
+
+
+def current_sample_rate():
+    if profiles.sample_rate is not None:
+        return profiles.sample_rate
+    return current_app.config.get("PROFILE_SAMPLE_RATE", 0.0)
+
+
+def _requested_by_admin():
+    if request.headers.get(PROFILE_HEADER) != "1":
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return False
+    if not identity:
+        return False
+    user = db.session.get(User, int(identity))
+    return bool(user and user.is_admin)
+
+
+def render_stats(stats, sort="cumulative", limit=50):
+    """Return the top ``limit`` functions of a stats dict as text."""
+    stream = io.StringIO()
+    pstats.Stats(_LoadedStats(stats), stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def dump_stats(stats):
+    """Return a stats dict in the binary format read by ``pstats.Stats(path)``."""
+    return marshal.dumps(stats)
+
+
+def init_profiling(app):
+    """Profile requests of ``app`` that ask for it or are sampled."""
+    profiles.resize(app.config.get("PROFILE_BUFFER_SIZE", 50))
+
+    @app.before_request
+    def _profile_request_start():
+        if request.endpoint in EXCLUDED_ENDPOINTS:
+            return
+        rate = current_sample_rate()
+        sampled = rate > 0 and random.random() < rate
+        if not sampled and not _requested_by_admin():
+            return
+        if not _profiler_lock.acquire(blocking=False):
+            logger.debug("Profiler busy, not profiling path=%s", request.path)
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiling tool (a debugger, coverage) is active
+            _profiler_lock.release()
+            logger.warning("Could not profile path=%s: %s", request.path, e)
+            return
+        g.profiler = profiler
+        g.profile_started = time.perf_counter()
+        g.profile_reason = "sampled" if sampled else "header"
+
+    @app.after_request
+    def _profile_request_end(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        try:
+            profiler.disable()
+        finally:
+            _profiler_lock.release()
+        profiler.create_stats()
+        profile_id = profiles.add({
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - g.profile_started) * 1000, 1),
+            "reason": g.profile_reason,
+            "stats": profiler.stats,
+        })
+        response.headers["X-Profile-Id"] = str(profile_id)
+        logger.info("Captured profile id=%s path=%s", profile_id, request.path)
+        return response
+
+    @app.teardown_request
+    def _profile_request_teardown(exc):
+        # The request failed before after_request ran
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            try:
+                profiler.disable()
+            finally:
+                _profiler_lock.release()
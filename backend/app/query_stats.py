@@ -0,0 +1,94 @@
+"""
+Per-request SQL statement counting.
+
+Engine-level cursor hooks time every statement, including ones that fail
+(``handle_error``). While a request is being
+handled, the count and total database time are added to ``g.query_stats``,
+which ``create_app`` reports in the request log line and in a
+``Server-Timing`` header. Statements slower than ``SLOW_QUERY_MS`` are logged
+with their bound parameters, and a statement repeated ``QUERY_REPEAT_WARN``
+times or more in one request is logged as a likely N+1 pattern.
+"""
+
+import logging
+import time
+from collections import Counter
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Longest parameter repr written to the slow query log
+MAX_LOGGED_PARAMS = 500
+
+
+class QueryStats:
+    """Statement count, database time and repeats for one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        """Return [(statement, times)] run at least ``threshold`` times, most first."""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self, total_ms):
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries", total;dur={total_ms:.1f}'
+
+
+def start_request_stats():
+    g.query_stats = QueryStats()
+
+
+def _current_stats():
+    return g.get("query_stats") if has_app_context() else None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current_stats()
+    if stats is None:
+        return
+    stats.record(statement, elapsed_ms)
+
+    if elapsed_ms >= current_app.config.get("SLOW_QUERY_MS", 200):
+        params = repr(parameters[:3] if executemany else parameters)
+        logger.warning(
+            "slow_query duration_ms=%.1f statement=%s params=%s",
+            elapsed_ms,
+            " ".join(statement.split()),
+            params[:MAX_LOGGED_PARAMS],
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement gets no after_cursor_execute; drop its start time
+    # here and still count it against the request
+    conn = exception_context.connection
+    starts = conn.info.get("query_start_time") if conn is not None else None
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current_stats()
+    if stats is not None and exception_context.statement is not None:
+        stats.record(exception_context.statement, elapsed_ms)
@@ -1,11 +1,10 @@
-import requests
+import logging
 from datetime import date
 from flask import Blueprint, request, jsonify
+from ..services.hardiness_zones import ZoneServiceError, resolve_zone
 
 frost_dates_bp = Blueprint("frost_dates", __name__)
-
-# USDA API URL for hardiness zone lookup
-USDA_API_URL = "https://phzmapi.org/"
+logger = logging.getLogger(__name__)
 
 # Typical frost date ranges per USDA hardiness zone (month, day)
 FROST_DATA = {
@@ -70,7 +69,7 @@ def get_frost_dates_for_zone(zone_str):
 def frost_dates():
     """Returns estimated first and last frost dates for a location.
 
-    Accepts either a `zip` query param (looks up zone via USDA API)
+    Accepts either a `zip` query param (looks up zone in the offline USDA zone table)
     or a `zone` query param directly (e.g. '7a').
     """
     zip_code = request.args.get("zip")
@@ -82,15 +81,15 @@ def frost_dates():
     # If zip provided, look up the zone
     if zip_code and not zone:
         try:
-            response = requests.get(f"{USDA_API_URL}/{zip_code}.json")
-            if response.status_code != 200:
-                return jsonify({"error": "Failed to fetch hardiness zone for ZIP code."}), 500
-            data = response.json()
-            zone = data.get("zone")
-            if not zone:
-                return jsonify({"error": "Could not determine hardiness zone for this ZIP code."}), 404
-        except Exception:
+            result = resolve_zone(zip_code)
+        except ZoneServiceError:
+            return jsonify({"error": "Failed to fetch hardiness zone for ZIP code."}), 500
+        except Exception as e:
+            logger.warning("Hardiness zone lookup failed for zip=%s: %s", zip_code, e)
             return jsonify({"error": "Failed to look up hardiness zone."}), 500
+        if result is None:
+            return jsonify({"error": "Could not determine hardiness zone for this ZIP code."}), 404
+        zone = result["zone"]
 
     result = get_frost_dates_for_zone(zone)
     if result is None:
@@ -2,17 +2,12 @@ import logging
 import re
 import requests as http_requests
 from flask import Blueprint, request, jsonify
+from ..services.hardiness_zones import ZoneServiceError, resolve_zone
 
 # Create a Blueprint for the plant hardiness API
 hardiness_bp = Blueprint("hardiness", __name__)
 logger = logging.getLogger(__name__)
 
-# USDA API URL
-USDA_API_URL = "https://phzmapi.org/"
-
-# Timeout for external API calls (seconds)
-EXTERNAL_API_TIMEOUT = 10
-
 # Zip code validation pattern
 ZIP_CODE_PATTERN = re.compile(r"^\d{5}(-\d{4})?$")
 
@@ -29,24 +24,18 @@ def get_hardiness_zone():
         return jsonify({"error": "Invalid zip code format. Use 12345 or 12345-6789."}), 400
 
     try:
-        # Call the USDA API
-        response = http_requests.get(
-            f"{USDA_API_URL}/{zip_code}.json",
-            timeout=EXTERNAL_API_TIMEOUT,
-        )
-
-        if response.status_code == 200:
-            return jsonify(response.json()), 200
-        else:
-            logger.warning(
-                "USDA API returned status=%s for zip=%s",
-                response.status_code, zip_code
-            )
-            return jsonify({
-                "error": "Failed to fetch hardiness zone.",
-                "status_code": response.status_code,
-            }), 502
-
+        # Offline zone table, with phzmapi.org as an optional fallback
+        result = resolve_zone(zip_code)
+        if result is None:
+            return jsonify({"error": "No hardiness zone found for this zip code."}), 404
+        return jsonify(result), 200
+
+    except ZoneServiceError as e:
+        logger.warning("USDA API returned status=%s for zip=%s", e.status_code, zip_code)
+        return jsonify({
+            "error": "Failed to fetch hardiness zone.",
+            "status_code": e.status_code,
+        }), 502
     except http_requests.Timeout:
         logger.error("USDA API timed out for zip=%s", zip_code)
         return jsonify({"error": "Hardiness zone service timed out. Please try again."}), 504
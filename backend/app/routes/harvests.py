@@ -2,12 +2,18 @@ import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
-from sqlalchemy import func, extract
 from datetime import datetime, timezone
+from sqlalchemy import func, select
 from ..models.database import db
-from ..models.harvest import Harvest, HarvestSchema
-from ..models.user_garden import UserGarden
+from ..models.harvest import Harvest, HarvestMonthRollup, HarvestPlantRollup, HarvestSchema, HarvestUserRollup
 from ..models.plant import Plant
+from ..models.user_garden import UserGarden
+from ..services.bulk_import import BulkImportError, import_harvests, iter_request_rows
+from ..services.exports import EXPORT_FORMATS, export_response
+from ..services.pagination import filter_date_range, keyset_page, parse_listing_args
+from ..services.plant_catalog import find_plant
+# Importing the module registers the flush hook that keeps the summary rollups current
+from ..services import harvest_rollups  # noqa: F401
 
 harvests_bp = Blueprint("harvests", __name__)
 logger = logging.getLogger(__name__)
@@ -32,7 +38,7 @@ def log_harvest():
         return jsonify({"error": "Garden not found or access denied"}), 404
 
     # Validate plant exists
-    plant = Plant.query.get(data.get("plant_id"))
+    plant = find_plant(data.get("plant_id"))
     if not plant:
         return jsonify({"error": "Plant not found"}), 404
 
@@ -68,27 +74,58 @@ def log_harvest():
         return jsonify({"error": "An unexpected error occurred."}), 500
 
 
+@harvests_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def bulk_import_harvests():
+    """Import many harvests from a JSON array, NDJSON or CSV body.
+
+    Valid rows are saved in chunks; invalid rows are reported by row number.
+    """
+    user_id = get_jwt_identity()
+    try:
+        result = import_harvests(iter_request_rows(request), user_id)
+    except BulkImportError as e:
+        return jsonify({"error": str(e)}), e.status_code
+
+    if not result["inserted"] and not result["failed"]:
+        return jsonify({"error": "No input data provided"}), 400
+    logger.info("Bulk harvest import user_id=%s inserted=%d failed=%d",
+                user_id, result["inserted"], result["failed"])
+    return jsonify(result), 201 if result["inserted"] else 422
+
+
 @harvests_bp.route("/<int:garden_id>", methods=["GET"])
 @jwt_required()
 def get_harvests(garden_id):
-    """Get all harvests for a garden, ordered by harvest_date desc."""
+    """Get a garden's harvests, newest first.
+
+    Optional ``from``/``to`` dates filter the range. ``limit`` with the
+    ``before``/``after`` cursors pages through it (see services.pagination).
+    """
     user_id = get_jwt_identity()
+    try:
+        params = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     # Verify garden ownership
     garden = UserGarden.query.filter_by(id=garden_id, user_id=user_id).first()
     if not garden:
         return jsonify({"error": "Garden not found or access denied"}), 404
 
-    harvests = Harvest.query.filter_by(garden_id=garden_id, user_id=user_id)\
-        .order_by(Harvest.harvest_date.desc()).all()
+    harvests, next_cursor, prev_cursor = keyset_page(
+        Harvest.query.filter_by(garden_id=garden_id, user_id=user_id),
+        Harvest.harvest_date, Harvest.id, params,
+    )
 
     result = []
     for h in harvests:
+        plant = find_plant(h.plant_id)
         result.append({
             "id": h.id,
             "garden_id": h.garden_id,
             "plant_id": h.plant_id,
-            "plant_name": h.plant.name if h.plant else "Unknown",
+            "plant_name": plant.name if plant else "Unknown",
             "harvest_date": h.harvest_date.isoformat() if h.harvest_date else None,
             "quantity": h.quantity,
             "unit": h.unit,
@@ -97,10 +134,70 @@ def get_harvests(garden_id):
             "created_at": h.created_at.isoformat() if h.created_at else None,
         })
 
-    return jsonify({
+    response = {
         "harvests": result,
         "garden_name": garden.garden_name,
-    }), 200
+    }
+    if params["limit"] or params["before"] or params["after"]:
+        response["next_cursor"] = next_cursor
+        response["prev_cursor"] = prev_cursor
+    return jsonify(response), 200
+
+
+@harvests_bp.route("/<int:garden_id>/count", methods=["GET"])
+@jwt_required()
+def count_harvests(garden_id):
+    """Count a garden's harvests, optionally within ``from``/``to`` dates."""
+    user_id = get_jwt_identity()
+    try:
+        params = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    garden = UserGarden.query.filter_by(id=garden_id, user_id=user_id).first()
+    if not garden:
+        return jsonify({"error": "Garden not found or access denied"}), 404
+
+    query = filter_date_range(
+        db.session.query(func.count(Harvest.id)).filter(
+            Harvest.garden_id == garden_id, Harvest.user_id == user_id
+        ),
+        Harvest.harvest_date, params,
+    )
+    return jsonify({"garden_id": garden_id, "count": query.scalar()}), 200
+
+
+@harvests_bp.route("/<int:garden_id>/export", methods=["GET"])
+@jwt_required()
+def export_harvests(garden_id):
+    """Stream a garden's harvests as CSV or NDJSON (?format=csv|ndjson)."""
+    user_id = get_jwt_identity()
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be one of: " + ", ".join(EXPORT_FORMATS)}), 400
+
+    garden = UserGarden.query.filter_by(id=garden_id, user_id=user_id).first()
+    if not garden:
+        return jsonify({"error": "Garden not found or access denied"}), 404
+
+    statement = (
+        select(
+            Harvest.id,
+            Harvest.garden_id,
+            Harvest.plant_id,
+            func.coalesce(Plant.name, "Unknown").label("plant_name"),
+            Harvest.harvest_date,
+            Harvest.quantity,
+            Harvest.unit,
+            Harvest.quality,
+            Harvest.notes,
+            Harvest.created_at,
+        )
+        .outerjoin(Plant, Plant.id == Harvest.plant_id)
+        .where(Harvest.garden_id == garden_id, Harvest.user_id == user_id)
+        .order_by(Harvest.harvest_date.desc(), Harvest.id.desc())
+    )
+    return export_response(statement, fmt, f"harvests-garden-{garden_id}")
 
 
 @harvests_bp.route("/summary", methods=["GET"])
@@ -109,46 +206,37 @@ def get_harvest_summary():
     """Get harvest summary across all user's gardens."""
     user_id = get_jwt_identity()
 
-    # Total harvests count
-    total_count = Harvest.query.filter_by(user_id=user_id).count()
+    # Served from the rollup tables maintained by services.harvest_rollups
+    user_rollup = HarvestUserRollup.query.filter_by(user_id=user_id).first()
+    total_count = user_rollup.harvest_count if user_rollup else 0
 
-    # Total quantity by plant
-    quantity_by_plant = db.session.query(
-        Plant.name,
-        func.sum(Harvest.quantity).label("total_quantity"),
-        Harvest.unit
-    ).join(Plant, Harvest.plant_id == Plant.id)\
-     .filter(Harvest.user_id == user_id)\
-     .group_by(Plant.name, Harvest.unit)\
-     .order_by(func.sum(Harvest.quantity).desc())\
-     .all()
+    # Total quantity by plant name and unit
+    totals = {}
+    for row in HarvestPlantRollup.query.filter_by(user_id=user_id):
+        plant = find_plant(row.plant_id)
+        if plant:
+            key = (plant.name, row.unit)
+            totals[key] = totals.get(key, 0.0) + row.total_quantity
 
     plants_summary = []
-    for name, total_qty, unit in quantity_by_plant:
+    for (name, unit), total_qty in sorted(totals.items(), key=lambda item: -item[1]):
         plants_summary.append({
             "plant_name": name,
             "total_quantity": round(total_qty, 2),
             "unit": unit,
         })
 
-    # Harvests by month (last 12 months)
-    harvests_by_month = db.session.query(
-        extract("year", Harvest.harvest_date).label("year"),
-        extract("month", Harvest.harvest_date).label("month"),
-        func.count(Harvest.id).label("count"),
-        func.sum(Harvest.quantity).label("total_quantity"),
-    ).filter(Harvest.user_id == user_id)\
-     .group_by("year", "month")\
-     .order_by("year", "month")\
-     .all()
+    # Harvests by month
+    harvests_by_month = HarvestMonthRollup.query.filter_by(user_id=user_id)\
+        .order_by(HarvestMonthRollup.year, HarvestMonthRollup.month).all()
 
     monthly_data = []
-    for year, month, count, total_qty in harvests_by_month:
+    for row in harvests_by_month:
         monthly_data.append({
-            "year": int(year),
-            "month": int(month),
-            "count": count,
-            "total_quantity": round(total_qty, 2),
+            "year": row.year,
+            "month": row.month,
+            "count": row.harvest_count,
+            "total_quantity": round(row.total_quantity, 2),
         })
 
     # Best performing plants (top 5 by total quantity)
@@ -2,9 +2,13 @@ import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
+from sqlalchemy import func, select
 from ..models.database import db
 from ..models.journal_entry import JournalEntry, JournalEntrySchema
 from ..models.user_garden import UserGarden
+from ..services.bulk_import import BulkImportError, import_journal_entries, iter_request_rows
+from ..services.exports import EXPORT_FORMATS, export_response
+from ..services.pagination import filter_date_range, keyset_page, parse_listing_args
 
 journal_bp = Blueprint("journal", __name__)
 logger = logging.getLogger(__name__)
@@ -78,25 +82,111 @@ def create_journal_entry():
         return jsonify({"error": "An unexpected error occurred."}), 500
 
 
+@journal_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def bulk_import_journal_entries():
+    """Import many journal entries from a JSON array, NDJSON or CSV body.
+
+    Valid rows are saved in chunks; invalid rows are reported by row number.
+    """
+    user_id = get_jwt_identity()
+    try:
+        result = import_journal_entries(iter_request_rows(request), user_id)
+    except BulkImportError as e:
+        return jsonify({"error": str(e)}), e.status_code
+
+    if not result["inserted"] and not result["failed"]:
+        return jsonify({"error": "No input data provided"}), 400
+    logger.info("Bulk journal import user_id=%s inserted=%d failed=%d",
+                user_id, result["inserted"], result["failed"])
+    return jsonify(result), 201 if result["inserted"] else 422
+
+
 @journal_bp.route("/<int:garden_id>", methods=["GET"])
 @jwt_required()
 def get_journal_entries(garden_id):
-    """Get all journal entries for a garden, ordered by entry_date descending."""
+    """Get a garden's journal entries, newest first.
+
+    Optional ``from``/``to`` dates filter the range. ``limit`` with the
+    ``before``/``after`` cursors pages through it (see services.pagination).
+    """
     user_id = get_jwt_identity()
+    try:
+        params = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     # Verify garden ownership
     garden = UserGarden.query.filter_by(id=garden_id, user_id=user_id).first()
     if not garden:
         return jsonify({"error": "Garden not found"}), 404
 
-    entries = JournalEntry.query.filter_by(
-        garden_id=garden_id, user_id=user_id
-    ).order_by(JournalEntry.entry_date.desc()).all()
+    entries, next_cursor, prev_cursor = keyset_page(
+        JournalEntry.query.filter_by(garden_id=garden_id, user_id=user_id),
+        JournalEntry.entry_date, JournalEntry.id, params,
+    )
 
-    return jsonify({
+    response = {
         "entries": [serialize_entry(e) for e in entries],
         "garden_name": garden.garden_name,
-    }), 200
+    }
+    if params["limit"] or params["before"] or params["after"]:
+        response["next_cursor"] = next_cursor
+        response["prev_cursor"] = prev_cursor
+    return jsonify(response), 200
+
+
+@journal_bp.route("/<int:garden_id>/count", methods=["GET"])
+@jwt_required()
+def count_journal_entries(garden_id):
+    """Count a garden's journal entries, optionally within ``from``/``to`` dates."""
+    user_id = get_jwt_identity()
+    try:
+        params = parse_listing_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    garden = UserGarden.query.filter_by(id=garden_id, user_id=user_id).first()
+    if not garden:
+        return jsonify({"error": "Garden not found"}), 404
+
+    query = filter_date_range(
+        db.session.query(func.count(JournalEntry.id)).filter(
+            JournalEntry.garden_id == garden_id, JournalEntry.user_id == user_id
+        ),
+        JournalEntry.entry_date, params,
+    )
+    return jsonify({"garden_id": garden_id, "count": query.scalar()}), 200
+
+
+@journal_bp.route("/<int:garden_id>/export", methods=["GET"])
+@jwt_required()
+def export_journal_entries(garden_id):
+    """Stream a garden's journal entries as CSV or NDJSON (?format=csv|ndjson)."""
+    user_id = get_jwt_identity()
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be one of: " + ", ".join(EXPORT_FORMATS)}), 400
+
+    garden = UserGarden.query.filter_by(id=garden_id, user_id=user_id).first()
+    if not garden:
+        return jsonify({"error": "Garden not found"}), 404
+
+    statement = (
+        select(
+            JournalEntry.id,
+            JournalEntry.garden_id,
+            JournalEntry.user_id,
+            JournalEntry.entry_type,
+            JournalEntry.title,
+            JournalEntry.notes,
+            JournalEntry.entry_date,
+            JournalEntry.created_at,
+        )
+        .where(JournalEntry.garden_id == garden_id, JournalEntry.user_id == user_id)
+        .order_by(JournalEntry.entry_date.desc(), JournalEntry.id.desc())
+    )
+    return export_response(statement, fmt, f"journal-garden-{garden_id}")
 
 
 @journal_bp.route("/<int:garden_id>/recent", methods=["GET"])
@@ -1,9 +1,14 @@
+import hashlib
+import logging
+import threading
+import zlib
 from datetime import date, timedelta
-from flask import Blueprint, request, jsonify
-from ..models.plant import Plant
+from flask import Blueprint, request, jsonify, current_app
+from ..services.plant_catalog import get_plant_catalog, on_catalog_change
 from .frost_dates import FROST_DATA, parse_zone_number
 
 planting_calendar_bp = Blueprint("planting_calendar", __name__)
+logger = logging.getLogger(__name__)
 
 MONTH_NAMES = [
     "January", "February", "March", "April", "May", "June",
@@ -515,33 +520,42 @@ def _generate_activities_for_plant(plant, last_frost_date, first_frost_date, yea
     return activities
 
 
-@planting_calendar_bp.route("", methods=["GET"])
-def get_planting_calendar():
-    """Return a month-by-month planting calendar for a given hardiness zone."""
-    zone = request.args.get("zone")
-    if not zone:
-        return jsonify({"error": "The 'zone' query parameter is required."}), 400
+# Sort order for activities within a month
+CATEGORY_ORDER = {
+    "planning": 0,
+    "start_indoors": 1,
+    "direct_sow": 2,
+    "transplant": 3,
+    "harvest": 4,
+    "maintenance": 5,
+}
+
+# Calendars only depend on the zone bucket: 3-10 (clamped) or year-round 11+
+YEAR_ROUND_BUCKET = "year_round"
+ZONE_BUCKETS = (*range(3, 11), YEAR_ROUND_BUCKET)
+
+# Browsers may reuse a calendar for this long before revalidating its ETag
+CALENDAR_MAX_AGE = 300
+
+
+def _zone_bucket(zone_num):
+    """Map a numeric zone to the calendar bucket that serves it."""
+    if zone_num >= 11:
+        return YEAR_ROUND_BUCKET
+    return max(3, min(10, zone_num))
 
-    zone_num = parse_zone_number(zone)
-    if zone_num is None:
-        return jsonify({"error": f"Invalid zone: {zone}"}), 400
 
-    # Determine frost dates
-    year_round = False
+def _build_calendar(bucket, plants):
+    """Build the 12-month calendar for one zone bucket."""
+    year_round = bucket == YEAR_ROUND_BUCKET
     last_frost_date = None
     first_frost_date = None
 
-    if zone_num >= 11:
-        year_round = True
-    else:
-        lookup_zone = max(3, min(10, zone_num))
-        data = FROST_DATA[lookup_zone]
+    if not year_round:
+        data = FROST_DATA[bucket]
         last_frost_date = date(CURRENT_YEAR, data["last_frost"][0], data["last_frost"][1])
         first_frost_date = date(CURRENT_YEAR, data["first_frost"][0], data["first_frost"][1])
 
-    # Fetch all plants
-    plants = Plant.query.all()
-
     # Build calendar structure: month -> activities
     calendar_months = {m: [] for m in range(1, 13)}
 
@@ -559,29 +573,151 @@ def get_planting_calendar():
                 })
 
     # Sort activities within each month by category then plant name
-    category_order = {
-        "planning": 0,
-        "start_indoors": 1,
-        "direct_sow": 2,
-        "transplant": 3,
-        "harvest": 4,
-        "maintenance": 5,
-    }
-
     calendar = []
     for m in range(1, 13):
         activities = sorted(
             calendar_months[m],
-            key=lambda a: (category_order.get(a["category"], 99), a["plant_name"]),
+            key=lambda a: (CATEGORY_ORDER.get(a["category"], 99), a["plant_name"]),
         )
         calendar.append({
             "month": m,
             "month_name": MONTH_NAMES[m - 1],
             "activities": activities,
         })
+    return calendar
+
+
+# (catalog, {bucket: calendar entry}) pair, swapped atomically on rebuild
+_calendar_cache = (None, {})
+_calendar_lock = threading.Lock()
+_rebuild_scheduled = threading.Event()
+
+
+def _build_zone_calendars(catalog):
+    """Build every zone bucket's calendar for a catalog.
+
+    Each one is kept both as a structure (for slicing) and as serialized JSON
+    bytes with a content digest (for the unfiltered response and its ETag).
+    """
+    calendars = {}
+    for bucket in ZONE_BUCKETS:
+        calendar = _build_calendar(bucket, catalog)
+        body = current_app.json.dumps(calendar).encode("utf-8")
+        calendars[bucket] = {
+            "calendar": calendar,
+            "body": body,
+            "digest": hashlib.sha1(body).hexdigest()[:16],
+        }
+    logger.info("Built planting calendars for %d zone buckets", len(calendars))
+    return calendars
+
+
+def _refresh_zone_calendars():
+    """Rebuild the calendars until they match the current catalog; returns them."""
+    global _calendar_cache
+
+    with _calendar_lock:
+        while True:
+            catalog = get_plant_catalog()
+            built_for, calendars = _calendar_cache
+            if built_for is catalog:
+                return calendars
+            _calendar_cache = (catalog, _build_zone_calendars(catalog))
+
+
+def warm_planting_calendars(app):
+    """Build the calendars for the current catalog (at startup)."""
+    with app.app_context():
+        _refresh_zone_calendars()
+
+
+def _rebuild_in_background(app):
+    try:
+        warm_planting_calendars(app)
+    except Exception:
+        logger.error("Failed to rebuild planting calendars", exc_info=True)
+    finally:
+        _rebuild_scheduled.clear()
+
+
+@on_catalog_change
+def _schedule_rebuild(app):
+    """Rebuild the calendars on a background thread; requests keep the old ones meanwhile."""
+    if app.testing or _rebuild_scheduled.is_set():
+        return
+    _rebuild_scheduled.set()
+    threading.Thread(target=_rebuild_in_background, args=(app,),
+                     name="planting-calendar-rebuild", daemon=True).start()
+
+
+def _get_zone_calendars():
+    """Return prebuilt calendars for every zone bucket.
+
+    Calendars are built at startup and rebuilt together, off the request
+    path, whenever the plant catalog changes; until a rebuild finishes the
+    previous calendars are served. Only a process that has none yet (or a
+    testing app, which rebuilds nothing in the background) builds them in
+    the request.
+    """
+    built_for, calendars = _calendar_cache
+    if built_for is None:
+        return _refresh_zone_calendars()
+    if built_for is not get_plant_catalog():
+        if current_app.testing:
+            return _refresh_zone_calendars()
+        _schedule_rebuild(current_app._get_current_object())
+    return calendars
+
+
+@planting_calendar_bp.route("", methods=["GET"])
+def get_planting_calendar():
+    """Return a month-by-month planting calendar for a given hardiness zone.
 
-    return jsonify({
-        "zone": zone,
-        "calendar": calendar,
-        "current_month": 4,  # April 2026
-    }), 200
+    Optional `month` (1-12) and `category` query params narrow the result.
+    """
+    zone = request.args.get("zone")
+    if not zone:
+        return jsonify({"error": "The 'zone' query parameter is required."}), 400
+
+    zone_num = parse_zone_number(zone)
+    if zone_num is None:
+        return jsonify({"error": f"Invalid zone: {zone}"}), 400
+
+    month = request.args.get("month", "").strip()
+    if month:
+        if not month.isdigit() or not 1 <= int(month) <= 12:
+            return jsonify({"error": "The 'month' parameter must be between 1 and 12."}), 400
+        month = int(month)
+
+    category = request.args.get("category", "").strip()
+    if category and category not in CATEGORY_ORDER:
+        return jsonify({"error": f"Invalid category: {category}"}), 400
+
+    entry = _get_zone_calendars()[_zone_bucket(zone_num)]
+
+    if month or category:
+        calendar = entry["calendar"]
+        if month:
+            calendar = [calendar[month - 1]]
+        if category:
+            calendar = [
+                {**m, "activities": [a for a in m["activities"] if a["category"] == category]}
+                for m in calendar
+            ]
+        calendar_body = current_app.json.dumps(calendar).encode("utf-8")
+    else:
+        calendar_body = entry["body"]
+
+    # The zone string is echoed back, so it is part of the representation
+    variant = zlib.crc32(f"{zone}|{month}|{category}".encode("utf-8"))
+    body = b"".join([
+        b'{"calendar":', calendar_body,
+        b',"current_month":4,"zone":',  # April 2026
+        current_app.json.dumps(zone).encode("utf-8"), b"}",
+    ])
+
+    response = current_app.response_class(body, status=200, mimetype="application/json")
+    response.set_etag(f"{entry['digest']}-{variant:08x}")
+    response.cache_control.public = True
+    response.cache_control.max_age = CALENDAR_MAX_AGE
+    return response.make_conditional(request)
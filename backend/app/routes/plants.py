@@ -1,8 +1,12 @@
 import logging
-from flask import Blueprint, request, jsonify
+from bisect import bisect_right
+from operator import attrgetter
+from flask import Blueprint, request, jsonify, abort
 from ..models.database import db
-from ..models.plant import Plant, PlantSchema
-from .garden_map import COMPANION_DATA
+from ..models.plant import Plant, PlantSchema, zone_code_range
+from ..services.companions import COMPANION_DATA
+from ..services.plant_catalog import find_plant, get_plant_catalog
+from ..services.plant_search import get_search_index
 
 plants_bp = Blueprint("plants", __name__)
 logger = logging.getLogger(__name__)
@@ -19,11 +23,66 @@ def _normalize_image_url(url):
 
 # Creating instance of PlantSchema
 plant_schema = PlantSchema()
-plants_schema = PlantSchema(many=True) # For serializing multiple plants
+
+# Plant list response keys and the catalog attributes they come from
+PLANT_LIST_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "description": "description",
+    "hardinessMin": "hardiness_min",
+    "hardinessMax": "hardiness_max",
+    "requiresGreenhouse": "requires_greenhouse",
+    "suitableForContainers": "suitable_for_containers",
+    "growingSeason": "growing_season",
+    "waterNeeds": "water_needs",
+    "sunlight": "sunlight",
+    "spaceRequired": "space_required",
+    "imageUrl": "image_url",
+}
+
+MAX_PAGE_SIZE = 500
+
+
+def _list_field_getters(fields):
+    """Return (key, getter) pairs for the requested list fields."""
+    getters = []
+    for key in fields:
+        getter = attrgetter(PLANT_LIST_FIELDS[key])
+        if key == "imageUrl":
+            getter = lambda plant, _get=getter: _normalize_image_url(_get(plant))
+        getters.append((key, getter))
+    return getters
+
+
+def _serialize_plants(plants, fields):
+    """Build list-view dicts straight from catalog records."""
+    getters = _list_field_getters(fields)
+    return [{key: get(plant) for key, get in getters} for plant in plants]
 
 @plants_bp.route("/get_plants", methods=["GET"])
 def get_plants():
-    """Fetches plant recommendations based on filters from the database."""
+    """Fetches plant recommendations based on filters from the database.
+
+    Optional paging: ``limit`` returns at most that many plants plus a
+    ``next_cursor`` to pass back as ``cursor``. ``fields`` is a
+    comma-separated subset of the response keys (``id`` is always included).
+    """
+    fields = list(PLANT_LIST_FIELDS)
+    fields_param = request.args.get("fields", "").strip()
+    if fields_param:
+        requested = [f.strip() for f in fields_param.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in PLANT_LIST_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        fields = ["id"] + [f for f in fields if f in requested and f != "id"]
+
+    limit = request.args.get("limit", type=int)
+    if "limit" in request.args and (limit is None or not 1 <= limit <= MAX_PAGE_SIZE):
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}."}), 400
+    cursor = request.args.get("cursor", type=int)
+    if "cursor" in request.args and cursor is None:
+        return jsonify({"error": "Invalid cursor."}), 400
+
     hardiness_zone = request.args.get("zone") # User's hardiness zone
     greenhouse = request.args.get("greenhouse", "false").lower() == "true" # Convert to boolean
     container_gardening = request.args.get("containers", "false").lower() == "true" # Convert to boolean
@@ -36,69 +95,92 @@ def get_plants():
     space_required = request.args.get("space_required", "").strip()
     sowing_method = request.args.get("sowing_method", "").strip()
 
-    # Starting with all plants
-    query = Plant.query
-
-    # Apply filters
-    if hardiness_zone:
-        query = query.filter(
-            Plant.hardiness_min <= hardiness_zone,
-            Plant.hardiness_max >= hardiness_zone,
-        )
-
+    # Exact-match filters are served by the catalog's attribute indexes
+    criteria = {}
     if greenhouse:
-        query = query.filter(Plant.requires_greenhouse == True)
-
+        criteria["requires_greenhouse"] = True
     if container_gardening:
-        query = query.filter(Plant.suitable_for_containers == True)
-
-    if search:
-        query = query.filter(Plant.name.ilike(f"%{search}%"))
-
+        criteria["suitable_for_containers"] = True
     if sunlight:
-        query = query.filter(Plant.sunlight == sunlight)
-
+        criteria["sunlight"] = sunlight
     if water_needs:
-        query = query.filter(Plant.water_needs == water_needs)
-
+        criteria["water_needs"] = water_needs
     if growing_season:
-        query = query.filter(Plant.growing_season == growing_season)
-
+        criteria["growing_season"] = growing_season
     if space_required:
-        query = query.filter(Plant.space_required == space_required)
-
+        criteria["space_required"] = space_required
     if sowing_method:
-        query = query.filter(Plant.sowing_method == sowing_method)
+        criteria["sowing_method"] = sowing_method
+
+    catalog = get_plant_catalog()
+    plants = catalog.filter(**criteria)
 
-    # Fetch filtered plants
-    plants = query.all()
+    if hardiness_zone:
+        # Numeric half-zone overlap; a bare "7" matches plants hardy in 7a or 7b
+        zone_low, zone_high = zone_code_range(hardiness_zone)
+        if zone_low is None:
+            return jsonify({"error": f"Invalid zone: {hardiness_zone}"}), 400
+        plants = [
+            p for p in plants
+            if p.hardiness_min_code is not None and p.hardiness_max_code is not None
+            and p.hardiness_min_code <= zone_high and p.hardiness_max_code >= zone_low
+        ]
+
+    if search:
+        # Ranked full-text match over name, scientific name and description
+        allowed = {p.id for p in plants}
+        plants = [
+            catalog.by_id[plant_id]
+            for plant_id, _ in get_search_index().search(search)
+            if plant_id in allowed
+        ]
 
-    result = plants_schema.dump(plants)
+    # Keyset paging: the cursor is the id of the last plant already returned.
+    # Unranked results are in id order; ranked search results keep their order.
+    if cursor is not None:
+        if search:
+            ids = [p.id for p in plants]
+            start = ids.index(cursor) + 1 if cursor in ids else len(ids)
+        else:
+            start = bisect_right(plants, cursor, key=attrgetter("id"))
+        plants = plants[start:]
 
-    # Format data for JSON response
-    plants_data = []
-    for plant in result:
-        plants_data.append({
-            "id": plant.get("id"),
-            "name": plant.get("name"),
-            "description": plant.get("description", "No description available."),
-            "hardinessMin": plant.get("hardiness_min", "N/A"),
-            "hardinessMax": plant.get("hardiness_max", "N/A"),
-            "requiresGreenhouse": plant.get("requires_greenhouse", False),
-            "suitableForContainers": plant.get("suitable_for_containers", False),
-            "growingSeason": plant.get("growing_season", "N/A"),
-            "waterNeeds": plant.get("water_needs", "N/A"),
-            "sunlight": plant.get("sunlight", "N/A"),
-            "spaceRequired": plant.get("space_required", "N/A"),
-            "imageUrl": _normalize_image_url(plant.get("image_url")),
-        })
+    if limit is None:
+        return jsonify({"plants": _serialize_plants(plants, fields)})
 
-    return jsonify({"plants": plants_data})
+    page = plants[:limit]
+    next_cursor = str(page[-1].id) if len(plants) > limit else None
+    return jsonify({"plants": _serialize_plants(page, fields), "next_cursor": next_cursor})
+
+@plants_bp.route("/search", methods=["GET"])
+def search_plants():
+    """Type-ahead search: best matches for a (possibly partial) query."""
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", 10, type=int)
+    if not 1 <= limit <= 50:
+        return jsonify({"error": "limit must be between 1 and 50."}), 400
+    if not query:
+        return jsonify({"results": []})
+
+    catalog = get_plant_catalog()
+    results = []
+    for plant_id, score in get_search_index().search(query)[:limit]:
+        plant = catalog.by_id[plant_id]
+        results.append({
+            "id": plant.id,
+            "name": plant.name,
+            "scientificName": plant.scientific_name,
+            "imageUrl": _normalize_image_url(plant.image_url),
+            "score": round(score, 2),
+        })
+    return jsonify({"results": results})
 
 @plants_bp.route("/<int:plant_id>", methods=["GET"])
 def get_plant(plant_id):
     """Retrieves a specific plant by ID."""
-    plant = Plant.query.get_or_404(plant_id)
+    plant = find_plant(plant_id)
+    if not plant:
+        abort(404)
     
     # Using schema to serialize a single plant
     result = plant_schema.dump(plant)
@@ -1527,7 +1609,9 @@ CARE_TIPS = {
 def get_plant_care_tips(plant_id):
     """Return detailed growing tips, common problems, harvesting advice,
     and storage tips for a specific plant."""
-    plant = Plant.query.get_or_404(plant_id)
+    plant = find_plant(plant_id)
+    if not plant:
+        abort(404)
 
     tips = CARE_TIPS.get(plant.name)
 
@@ -0,0 +1,61 @@
+import logging
+from flask import Blueprint, Response, jsonify, request
+from .users import admin_required
+from ..profiling import current_sample_rate, dump_stats, profiles, render_stats
+
+profiling_bp = Blueprint("profiling", __name__)
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+
+@profiling_bp.route("", methods=["GET"])
+@admin_required()
+def get_profiling():
+    """Return the sampling rate and the captured profiles, newest first."""
+    return jsonify({
+        "sample_rate": current_sample_rate(),
+        "profiles": profiles.list(),
+    }), 200
+
+
+@profiling_bp.route("", methods=["PUT"])
+@admin_required()
+def update_profiling():
+    """Set this worker's sampling rate (0-1) and optionally clear the buffer."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "No input data provided"}), 400
+
+    if "sample_rate" in data:
+        rate = data["sample_rate"]
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            return jsonify({"error": "sample_rate must be a number between 0 and 1."}), 400
+        profiles.sample_rate = float(rate)
+        logger.warning("Profiling sample rate set to %s", rate)
+    if data.get("clear"):
+        profiles.clear()
+
+    return jsonify({"sample_rate": current_sample_rate(), "profiles": len(profiles.list())}), 200
+
+
+@profiling_bp.route("/<int:profile_id>", methods=["GET"])
+@admin_required()
+def download_profile(profile_id):
+    """Download a profile as a pstats file, or ``?format=text`` for a summary."""
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "Profile not found"}), 404
+
+    if request.args.get("format") == "text":
+        sort = request.args.get("sort", "cumulative")
+        if sort not in SORT_KEYS:
+            return jsonify({"error": "sort must be one of: " + ", ".join(SORT_KEYS)}), 400
+        limit = request.args.get("limit", 50, type=int)
+        return Response(render_stats(profile["stats"], sort, limit), mimetype="text/plain")
+
+    return Response(
+        dump_stats(profile["stats"]),
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.prof"'},
+    )
@@ -2,8 +2,8 @@ from datetime import date
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models.database import db
-from ..models.plant import Plant
 from ..models.profile import UserProfile
+from ..services.plant_scoring import get_scoring_engine
 from .frost_dates import parse_zone_number
 
 recommendations_bp = Blueprint("recommendations", __name__)
@@ -170,6 +170,18 @@ def plant_to_dict(plant, score, max_score, reasons, warnings):
     }
 
 
+def seasonal_activity(plant, current_season):
+    """Describe what to do with a seasonal candidate right now."""
+    if plant.growing_season == current_season:
+        if plant.sowing_method and "transplant" in plant.sowing_method.lower():
+            return "Transplant soon"
+        elif plant.sowing_method and "direct" in plant.sowing_method.lower():
+            return "Direct sow now"
+        return "Plant now"
+    # Otherwise it is a next-season plant to start indoors
+    return "Start indoors"
+
+
 @recommendations_bp.route("", methods=["GET"])
 @jwt_required()
 def get_recommendations():
@@ -190,16 +202,19 @@ def get_recommendations():
     today = date.today()
     current_season = MONTH_TO_SEASON[today.month]
 
-    plants = Plant.query.all()
-    scored = []
-    for plant in plants:
+    engine = get_scoring_engine()
+    scores = engine.score_all(
+        user_zone, sunlight_category(user_sunlight_hours), user_has_irrigation, current_season
+    )
+    top_plants = [engine.records[i] for i in engine.top_k(scores, 20)]
+
+    # Reasons and warnings are only built for the plants we return
+    top_20 = []
+    for plant in top_plants:
         s, ms, reasons, warnings = score_plant(
             plant, user_zone, user_sunlight_hours, user_has_irrigation, current_season
         )
-        scored.append(plant_to_dict(plant, s, ms, reasons, warnings))
-
-    scored.sort(key=lambda x: x["score"], reverse=True)
-    top_20 = scored[:20]
+        top_20.append(plant_to_dict(plant, s, ms, reasons, warnings))
 
     return jsonify({
         "recommendations": top_20,
@@ -233,42 +248,24 @@ def get_seasonal_recommendations():
     current_idx = season_order.index(current_season)
     next_season = season_order[(current_idx + 1) % 4]
 
-    plants = Plant.query.all()
-    seasonal_results = []
-
-    for plant in plants:
-        activity = None
-
-        # Direct sow: matches current season
-        if plant.growing_season == current_season:
-            if plant.sowing_method and "transplant" in plant.sowing_method.lower():
-                activity = "Transplant soon"
-            elif plant.sowing_method and "direct" in plant.sowing_method.lower():
-                activity = "Direct sow now"
-            else:
-                activity = "Plant now"
-        # Start indoors: next season's plants
-        elif plant.growing_season == next_season:
-            if plant.requires_greenhouse or (
-                plant.sowing_method and "transplant" in (plant.sowing_method or "").lower()
-            ):
-                activity = "Start indoors"
-            else:
-                continue
-        else:
-            continue
+    engine = get_scoring_engine()
+    scores = engine.score_all(
+        user_zone, sunlight_category(user_sunlight_hours), user_has_irrigation, current_season
+    )
+    candidates = engine.seasonal_candidates(current_season, next_season)
+    top_plants = [engine.records[i] for i in engine.top_k(scores, 20, candidates)]
 
+    seasonal_results = []
+    for plant in top_plants:
         s, ms, reasons, warnings = score_plant(
             plant, user_zone, user_sunlight_hours, user_has_irrigation, current_season
         )
         result = plant_to_dict(plant, s, ms, reasons, warnings)
-        result["activity"] = activity
+        result["activity"] = seasonal_activity(plant, current_season)
         seasonal_results.append(result)
 
-    seasonal_results.sort(key=lambda x: x["score"], reverse=True)
-
     return jsonify({
-        "seasonal": seasonal_results[:20],
+        "seasonal": seasonal_results,
         "zone": user_zone,
         "season": current_season,
         "month": today.strftime("%B"),
@@ -5,6 +5,7 @@ from ..models.database import db
 from ..models.profile import UserProfile
 from ..models.user_garden import UserGarden
 from ..models.user_garden_plant import UserGardenPlant
+from ..services.plant_catalog import find_plant
 
 soil_bp = Blueprint("soil", __name__)
 logger = logging.getLogger(__name__)
@@ -214,7 +215,7 @@ def get_soil_recommendations():
     alkaline_plants = []
 
     for gp in garden_plants:
-        plant_name = gp.plant.name
+        plant_name = find_plant(gp.plant_id).name
         garden_name = garden_map.get(gp.garden_id, "Unknown")
         pref = PLANT_PH_PREFERENCES.get(plant_name, DEFAULT_PH)
         status, ph_diff, recommendation = get_plant_status(soil_ph, pref)
@@ -1,12 +1,14 @@
 from datetime import datetime, date, timedelta, timezone
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import lazyload
 
 from ..models.database import db
+from ..models.user import User
 from ..models.user_garden import UserGarden
 from ..models.user_garden_plant import UserGardenPlant, GrowthStage
-from ..models.plant import Plant
 from ..models.profile import UserProfile
+from ..services.plant_catalog import find_plant
 from .frost_dates import FROST_DATA, parse_zone_number
 
 tasks_bp = Blueprint("tasks", __name__)
@@ -239,6 +241,36 @@ def _frost_warning_tasks(zone_str, gardens):
     return tasks
 
 
+def _load_user_gardens(user_id):
+    """Load the user's profile zone, gardens and garden plants in one query.
+
+    Returns (zone_str, [(garden, [garden_plant, ...]), ...]) in garden id order.
+    """
+    rows = (
+        db.session.query(UserProfile.plant_hardiness_zone, UserGarden, UserGardenPlant)
+        .select_from(User)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .outerjoin(UserGarden, UserGarden.user_id == User.id)
+        .outerjoin(UserGardenPlant, UserGardenPlant.garden_id == UserGarden.id)
+        .filter(User.id == user_id)
+        # The garden is already in the row; skip the relationship's joined load
+        .options(lazyload(UserGardenPlant.garden))
+        .order_by(UserGarden.id, UserGardenPlant.id)
+        .all()
+    )
+
+    zone_str = None
+    gardens = {}
+    for zone, garden, garden_plant in rows:
+        zone_str = zone
+        if garden is None:
+            continue
+        plants = gardens.setdefault(garden.id, (garden, []))[1]
+        if garden_plant is not None:
+            plants.append(garden_plant)
+    return zone_str, list(gardens.values())
+
+
 @tasks_bp.route("", methods=["GET"])
 @jwt_required()
 def get_tasks():
@@ -246,20 +278,14 @@ def get_tasks():
     user_id = get_jwt_identity()
     tasks = []
 
-    # Fetch user profile for zone info
-    profile = UserProfile.query.filter_by(user_id=user_id).first()
-    zone_str = profile.plant_hardiness_zone if profile else None
-
-    # Fetch user gardens
-    gardens = UserGarden.query.filter_by(user_id=user_id).all()
+    # Profile zone, gardens and their plants in a single query; plant
+    # attributes come from the in-memory catalog
+    zone_str, gardens = _load_user_gardens(user_id)
 
     # Plant-specific tasks
-    for garden in gardens:
-        garden_zone = garden.plant_hardiness_zone or zone_str
-        garden_plants = UserGardenPlant.query.filter_by(garden_id=garden.id).all()
-
+    for garden, garden_plants in gardens:
         for gp in garden_plants:
-            plant = Plant.query.get(gp.plant_id)
+            plant = find_plant(gp.plant_id)
             if not plant:
                 continue
 
@@ -271,7 +297,7 @@ def get_tasks():
     tasks.extend(_seasonal_tasks(zone_str))
 
     # Frost warnings
-    tasks.extend(_frost_warning_tasks(zone_str, gardens))
+    tasks.extend(_frost_warning_tasks(zone_str, [garden for garden, _ in gardens]))
 
     # Sort by priority: high first, then medium, then low
     priority_order = {"high": 0, "medium": 1, "low": 2}
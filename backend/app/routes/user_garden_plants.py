@@ -4,8 +4,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from ..models.database import db
 from ..models.user_garden import UserGarden
-from ..models.plant import Plant
 from ..models.user_garden_plant import UserGardenPlant, GrowthStage
+from ..services.plant_catalog import find_plant
 
 user_garden_plants_bp = Blueprint("user_garden_plants", __name__)
 logger = logging.getLogger(__name__)
@@ -35,7 +35,7 @@ def add_plant_to_garden():
     if not garden:
         return jsonify({"error": "Garden not found"}), 404
     
-    plant = Plant.query.get(data["plant_id"])
+    plant = find_plant(data["plant_id"])
     if not plant:
         return jsonify({"error": "Plant not found"}), 404
     
@@ -65,7 +65,7 @@ def get_garden_plants(garden_id):
         {
             "id": gp.id,
             "plant_id": gp.plant_id,
-            "plant_name": gp.plant.name,
+            "plant_name": find_plant(gp.plant_id).name,
             "growth_stage": gp.growth_stage.value,
             "expected_harvest_date": gp.expected_harvest_date
         }
@@ -7,6 +7,7 @@ from ..models.database import db
 from ..models.user_garden import UserGarden, UserGardenSchema
 from ..models.garden_type import GardenType, GardenTypeEnum
 from ..models.profile import UserProfile
+from ..services.plant_catalog import find_plant
 
 user_gardens_bp = Blueprint("user_gardens", __name__)
 logger = logging.getLogger(__name__)
@@ -94,7 +95,7 @@ def get_user_gardens():
             garden_plants.append({
                 "id": gp.id,
                 "plant_id": gp.plant_id,
-                "plant_name": gp.plant.name,
+                "plant_name": find_plant(gp.plant_id).name,
                 "growth_stage": gp.growth_stage.value,
                 "expected_harvest_date": gp.expected_harvest_date.isoformat() if gp.expected_harvest_date else None,
                 "row": gp.row,
@@ -140,7 +141,7 @@ def get_garden_by_id(garden_id):
         garden_plants.append({
             "id": gp.id,
             "plant_id": gp.plant_id,
-            "plant_name": gp.plant.name,
+            "plant_name": find_plant(gp.plant_id).name,
             "growth_stage": gp.growth_stage.value,
             "expected_harvest_date": gp.expected_harvest_date.isoformat() if gp.expected_harvest_date else None
         })
@@ -195,9 +196,9 @@ def update_garden(garden_id):
         if "current_plants" in data and isinstance(data["current_plants"], list):
             data["current_plants"] = ",".join(data["current_plants"])
         
-        # Adding the user_8id and garden_id to ensure ownership validation
+        # Adding the user_id to ensure ownership validation (id is dump-only
+        # in the schema, and the garden was already looked up by id and owner)
         data["user_id"] = user_id
-        data["id"] = garden_id
         
         # Validating the fields that are being updated
         errors = garden_schema.validate(data, partial=True)
@@ -1,7 +1,6 @@
 import jwt
 import logging
 import re
-import requests
 from datetime import datetime, timezone, timedelta
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -10,9 +9,11 @@ from sqlalchemy import or_
 from functools import wraps
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
+from ..metrics import external_call
 from ..models.database import db
 from ..models.user import User, UserSchema
 from ..models.profile import UserProfile
+from ..services.hardiness_zones import peek_zone, resolve_profile_zone_async, resolve_zone
 
 users_bp = Blueprint("users", __name__)
 logger = logging.getLogger(__name__)
@@ -111,11 +112,12 @@ def google_login():
 
     try:
         # Verify the Google ID token
-        idinfo = id_token.verify_oauth2_token(
-            credential,
-            google_requests.Request(),
-            google_client_id
-        )
+        with external_call("google_token_verification"):
+            idinfo = id_token.verify_oauth2_token(
+                credential,
+                google_requests.Request(),
+                google_client_id
+            )
 
         google_id = idinfo["sub"]
         email = idinfo.get("email")
@@ -330,6 +332,8 @@ def update_profile():
             profile = UserProfile(user_id=user_id)
             db.session.add(profile)
 
+        previous_zip = profile.zip_code
+
         # Update fields
         profile.zip_code = formatted_data["zip_code"]
         profile.city = formatted_data["city"]
@@ -338,26 +342,36 @@ def update_profile():
         profile.sunlight_hours = formatted_data["sunlight_hours"]
         profile.soil_ph = formatted_data["soil_ph"]
 
-        # Fetch hardiness zone if zip code is provided and changed
+        # Resolve the hardiness zone if the zip code changed. Zips in the
+        # offline table resolve immediately; anything that needs the HTTP
+        # fallback is filled in after the save when HARDINESS_ZONE_ASYNC is set.
         new_zip = formatted_data["zip_code"]
-        if new_zip and new_zip != profile.zip_code:
-            try:
-                base_url = current_app.config.get("BASE_URL", "http://127.0.0.1:5000")
-                hardiness_url = f"{base_url}/api/hardiness/get_hardiness_zone?zip={new_zip}"
-                response = requests.get(hardiness_url, timeout=10)
-
-                if response.status_code == 200:
-                    hardiness_data = response.json()
-                    profile.plant_hardiness_zone = hardiness_data.get("zone", profile.plant_hardiness_zone)
-            except Exception as e:
-                logger.warning("Failed to fetch hardiness zone for zip=%s: %s", new_zip, e)
+        zone_pending = False
+        if new_zip and new_zip != previous_zip:
+            hardiness_data = peek_zone(new_zip)
+            if hardiness_data is None:
+                if current_app.config.get("HARDINESS_ZONE_ASYNC", True):
+                    zone_pending = True
+                    # The old zone belongs to the old zip; leave it unset until resolved
+                    profile.plant_hardiness_zone = None
+                else:
+                    try:
+                        hardiness_data = resolve_zone(new_zip)
+                    except Exception as e:
+                        logger.warning("Failed to fetch hardiness zone for zip=%s: %s", new_zip, e)
+            if hardiness_data is not None:
+                profile.plant_hardiness_zone = hardiness_data["zone"]
 
         db.session.commit()
+        if zone_pending:
+            resolve_profile_zone_async(profile.user_id, new_zip)
+
         logger.info("Profile updated for user_id=%s", user_id)
         return jsonify(
             {
                 "message": "Profile updated successfully.",
                 "plant_hardiness_zone": profile.plant_hardiness_zone,
+                "zone_pending": zone_pending,
             }
         )
     except Exception as e:
@@ -1,10 +1,15 @@
+import threading
+from collections import OrderedDict, namedtuple
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
 from ..models.database import db
+from ..models.plant import Plant
 from ..models.profile import UserProfile
 from ..models.user_garden import UserGarden
 from ..models.user_garden_plant import UserGardenPlant
-from ..models.plant import Plant
+from ..services.garden_contents import garden_contents_key
+from ..services.plant_catalog import get_plant_catalog
 
 weather_alerts_bp = Blueprint("weather_alerts", __name__)
 
@@ -41,38 +46,67 @@ CLOUDY_CODES = {3, 45, 48}
 STORM_CODES = {95}
 
 
-def _get_user_plants(user_id):
-    """Fetch all plants across all of a user's gardens."""
-    gardens = UserGarden.query.filter_by(user_id=user_id).all()
-    if not gardens:
-        return []
-
-    garden_ids = [g.id for g in gardens]
-    garden_plants = (
-        UserGardenPlant.query
-        .filter(UserGardenPlant.garden_id.in_(garden_ids))
+# Names of a user's plants, grouped the way the alert rules consume them
+UserPlantGroups = namedtuple("UserPlantGroups", ["all", "high_water", "full_sun"])
+
+# Per-user plant groups, keyed on the user's garden contents versions
+USER_PLANTS_CACHE_SIZE = 1024
+_user_plants_cache = OrderedDict()
+_user_plants_lock = threading.Lock()
+
+
+def _query_user_plant_groups(user_id):
+    """Fetch each distinct plant across the user's gardens in one join."""
+    rows = (
+        db.session.query(Plant.name, Plant.water_needs, Plant.sunlight)
+        .join(UserGardenPlant, UserGardenPlant.plant_id == Plant.id)
+        .join(UserGarden, UserGarden.id == UserGardenPlant.garden_id)
+        .filter(UserGarden.user_id == user_id)
+        .group_by(Plant.id)
+        .order_by(func.min(UserGardenPlant.id))
         .all()
     )
+    return UserPlantGroups(
+        all=tuple(name for name, _, _ in rows),
+        high_water=tuple(name for name, water, _ in rows if water == "High"),
+        full_sun=tuple(name for name, _, sun in rows if sun == "Full Sun"),
+    )
 
-    plants = []
-    seen_plant_ids = set()
-    for gp in garden_plants:
-        if gp.plant_id not in seen_plant_ids:
-            seen_plant_ids.add(gp.plant_id)
-            plant = Plant.query.get(gp.plant_id)
-            if plant:
-                plants.append(plant)
-    return plants
+
+def _get_user_plants(user_id):
+    """Return the user's plant names grouped for the alert rules.
+
+    Cached per user until a plant is added to or removed from one of their
+    gardens, or the plant catalog changes.
+    """
+    key = (get_plant_catalog().version, garden_contents_key(user_id))
+    with _user_plants_lock:
+        cached = _user_plants_cache.get(user_id)
+        if cached is not None and cached[0] == key:
+            _user_plants_cache.move_to_end(user_id)
+            return cached[1]
+
+    groups = _query_user_plant_groups(user_id) if key[1] else UserPlantGroups((), (), ())
+
+    with _user_plants_lock:
+        _user_plants_cache[user_id] = (key, groups)
+        _user_plants_cache.move_to_end(user_id)
+        while len(_user_plants_cache) > USER_PLANTS_CACHE_SIZE:
+            _user_plants_cache.popitem(last=False)
+    return groups
 
 
 def _generate_alerts(temperature, precipitation, weathercode, plants):
-    """Generate weather-aware gardening alerts based on conditions and plants."""
+    """Generate weather-aware gardening alerts based on conditions and plants.
+
+    `plants` is a UserPlantGroups of plant names.
+    """
     alerts = []
     alert_counter = 0
 
-    plant_names = [p.name for p in plants]
-    high_water_plants = [p.name for p in plants if p.water_needs == "High"]
-    full_sun_plants = [p.name for p in plants if p.sunlight == "Full Sun"]
+    plant_names = list(plants.all)
+    high_water_plants = list(plants.high_water)
+    full_sun_plants = list(plants.full_sun)
 
     # Frost Alert (critical): temperature < 2 C or freezing weather codes
     if temperature < 2 or weathercode in FREEZING_CODES:
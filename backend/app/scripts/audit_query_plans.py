@@ -0,0 +1,233 @@
+"""
+Audits the SQLite query plans behind the API routes.
+
+Seeds a throwaway in-memory database (schema from the models), drives every
+route through the Flask test client, captures each SQL statement it issues
+and runs EXPLAIN QUERY PLAN on it. A full scan of any table outside
+ALLOWED_SCANS fails the audit, so an index that stops being used (or a new
+query without one) is caught before it reaches a large database.
+A route call that does not succeed (2xx or 304) fails the audit too, since
+its real queries never ran.
+
+Routes that only talk to external services (weather, Google login) are not
+driven.
+
+Usage:
+    cd backend
+    PYTHONPATH=. venv/bin/python app/scripts/audit_query_plans.py
+    PYTHONPATH=. venv/bin/python app/scripts/audit_query_plans.py --verbose
+"""
+
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app
+from app.models.database import db
+from app.models.garden_type import GardenType, GardenTypeEnum
+from app.models.harvest import Harvest
+from app.models.journal_entry import JournalEntry
+from app.models.plant import Plant
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.models.user_garden import UserGarden
+from app.models.user_garden_plant import UserGardenPlant
+from app.scripts.populate_plant_database import PLANTS
+
+# Tables that are small and read whole on purpose (the plant catalog load,
+# garden type lists, single-row counters)
+ALLOWED_SCANS = {"plant", "garden_type", "plant_catalog_version"}
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)")
+
+
+def _seed():
+    """Create a user with a couple of gardens and some history."""
+    for plant_data in PLANTS[:40]:
+        db.session.add(Plant(**plant_data))
+    for garden_type in GardenTypeEnum:
+        db.session.add(GardenType(name=garden_type))
+
+    user = User(username="audit", email="audit@example.com", is_admin=True)
+    user.set_password("Audit-passw0rd")
+    other = User(username="other", email="other@example.com")
+    other.set_password("Other-passw0rd")
+    db.session.add_all([user, other])
+    db.session.flush()
+
+    db.session.add(UserProfile(user_id=user.id, zip_code="10001", plant_hardiness_zone="7b",
+                               sunlight_hours=6, has_irrigation=False, soil_ph=6.5))
+    gardens = [
+        UserGarden(user_id=owner.id, garden_name=f"Garden {i}", garden_type_id=1)
+        for i, owner in enumerate([user, user, other])
+    ]
+    db.session.add_all(gardens)
+    db.session.flush()
+
+    now = datetime.now(timezone.utc)
+    for garden in gardens:
+        for i in range(12):
+            db.session.add(UserGardenPlant(garden_id=garden.id, plant_id=i + 1, row=i // 4, col=i % 4))
+        for i in range(30):
+            db.session.add(Harvest(garden_id=garden.id, plant_id=i % 10 + 1, user_id=garden.user_id,
+                                   quantity=1.5, unit="lbs", harvest_date=now - timedelta(days=i)))
+            db.session.add(JournalEntry(garden_id=garden.id, user_id=garden.user_id, entry_type="observation",
+                                        title=f"Entry {i}", entry_date=now - timedelta(days=i)))
+    db.session.commit()
+    return user, gardens[0]
+
+
+def _route_calls(garden_id):
+    """(method, url, json) for every route that touches the database."""
+    return [
+        ("POST", "/api/users/register", {"username": "newuser", "email": "new@example.com",
+                                         "password": "New-passw0rd!"}),
+        ("POST", "/api/users/login", {"username": "audit", "password": "Audit-passw0rd"}),
+        ("GET", "/api/users/get_user", None),
+        ("GET", "/api/users/profile", None),
+        ("GET", "/api/users/inactive_users", None),
+        ("GET", "/api/garden_types", None),
+        ("GET", "/api/garden_types/1", None),
+        ("GET", "/api/plants/get_plants?zone=7b&sunlight=Full+Sun&limit=10", None),
+        ("GET", "/api/plants/search?q=tom", None),
+        ("GET", "/api/plants/1", None),
+        ("GET", "/api/plants/1/care-tips", None),
+        ("GET", "/api/recommendations", None),
+        ("GET", "/api/recommendations/seasonal", None),
+        ("GET", "/api/planting_calendar?zone=7b", None),
+        ("GET", "/api/tasks", None),
+        ("GET", "/api/tips/seasonal?zone=7b", None),
+        ("GET", "/api/frost_dates?zone=7b", None),
+        ("GET", "/api/soil/recommendations", None),
+        ("GET", "/api/user_gardens", None),
+        ("GET", f"/api/user_gardens/{garden_id}", None),
+        ("PUT", f"/api/user_gardens/{garden_id}", {"garden_name": "Renamed"}),
+        ("GET", f"/api/user_garden_plants/{garden_id}", None),
+        ("POST", "/api/user_garden_plants", {"garden_id": garden_id, "plant_id": 2}),
+        ("GET", f"/api/user_gardens/{garden_id}/map", None),
+        ("POST", f"/api/user_gardens/{garden_id}/map/place", {"plant_id": 3, "row": 5, "col": 5}),
+        ("GET", f"/api/user_gardens/{garden_id}/map/1/info", None),
+        ("GET", f"/api/user_gardens/{garden_id}/map/companions?radius=2&plant_id=3", None),
+        ("POST", f"/api/user_gardens/{garden_id}/map/optimize",
+         {"plants": [{"plant_id": 3, "count": 2}], "time_budget_ms": 10}),
+        ("POST", f"/api/user_gardens/{garden_id}/map/batch",
+         {"operations": [{"op": "place", "plant_id": 4, "row": 6, "col": 6},
+                         {"op": "move", "garden_plant_id": 1, "row": 7, "col": 7},
+                         {"op": "remove", "garden_plant_id": 4}]}),
+        ("PUT", f"/api/user_gardens/{garden_id}/map/resize", {"grid_rows": 10, "grid_cols": 12}),
+        ("DELETE", f"/api/user_gardens/{garden_id}/map/2", None),
+        ("GET", f"/api/user_gardens/{garden_id}/map?since=0", None),
+        ("POST", "/api/harvests", {"garden_id": garden_id, "plant_id": 1, "quantity": 2, "unit": "lbs"}),
+        ("POST", "/api/harvests/bulk", [{"garden_id": garden_id, "plant_id": 2, "quantity": 1, "unit": "kg"}]),
+        ("GET", f"/api/harvests/{garden_id}", None),
+        ("GET", f"/api/harvests/{garden_id}/export?format=csv", None),
+        ("GET", f"/api/harvests/{garden_id}?limit=5&from=2020-01-01&to=2100-01-01", None),
+        ("GET", f"/api/harvests/{garden_id}?limit=5&before=2100-01-01T00:00:00,999", None),
+        ("GET", f"/api/harvests/{garden_id}?limit=5&after=2000-01-01T00:00:00,1", None),
+        ("GET", f"/api/harvests/{garden_id}/count?from=2020-01-01", None),
+        ("GET", "/api/harvests/summary", None),
+        ("DELETE", "/api/harvests/1", None),
+        ("POST", "/api/journal", {"garden_id": garden_id, "entry_type": "observation", "title": "Audit"}),
+        ("POST", "/api/journal/bulk", [{"garden_id": garden_id, "entry_type": "other", "title": "Bulk"}]),
+        ("GET", f"/api/journal/{garden_id}", None),
+        ("GET", f"/api/journal/{garden_id}/export?format=ndjson", None),
+        ("GET", f"/api/journal/{garden_id}?limit=5&before=2100-01-01T00:00:00,999", None),
+        ("GET", f"/api/journal/{garden_id}?limit=5&after=,1", None),
+        ("GET", f"/api/journal/{garden_id}/count?to=2100-01-01", None),
+        ("GET", f"/api/journal/{garden_id}/recent", None),
+        ("DELETE", "/api/journal/1", None),
+        ("DELETE", "/api/user_garden_plants/3", None),
+        # Last: the zip change leaves the zone pending, and routes that need it reject the profile
+        ("POST", "/api/users/profile", {"zip_code": "10002", "sunlight_hours": 6, "soil_ph": 6.5}),
+    ]
+
+
+def _table_name(name):
+    """Strip SQLAlchemy alias suffixes such as user_garden_plant_1."""
+    return re.sub(r"_\d+$", "", name)
+
+
+def audit(verbose=False):
+    """Drive the routes and return ``(scans, failed_calls)``.
+
+    ``scans`` are (route, statement, plan line) triples; ``failed_calls`` are
+    (route, status) pairs of calls that did not return 2xx or 304, whose
+    queries were never really audited.
+    """
+    app = create_app("testing")
+    app.config["HARDINESS_ZONE_HTTP_FALLBACK"] = False
+    # Throwaway keys so tokens can be issued without a configured environment
+    app.config["SECRET_KEY"] = app.config.get("SECRET_KEY") or "query-plan-audit"
+    app.config["JWT_SECRET_KEY"] = app.config.get("JWT_SECRET_KEY") or "query-plan-audit"
+
+    with app.app_context():
+        db.create_all()
+        user, garden = _seed()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        calls = _route_calls(garden.id)
+
+        captured = []
+        failed_calls = []
+        current = {"route": None}
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if current["route"] and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                params = parameters[0] if executemany else parameters
+                captured.append((current["route"], statement, params))
+
+        event.listen(db.engine, "before_cursor_execute", capture)
+        client = app.test_client()
+        try:
+            for method, url, payload in calls:
+                current["route"] = f"{method} {url}"
+                response = client.open(url, method=method, json=payload, headers=headers)
+                if not (200 <= response.status_code < 300 or response.status_code == 304):
+                    failed_calls.append((current["route"], response.status_code))
+                    print(f"!! {current['route']} FAILING: returned {response.status_code}")
+        finally:
+            current["route"] = None
+            event.remove(db.engine, "before_cursor_execute", capture)
+
+        failures = []
+        seen = set()
+        with db.engine.connect() as conn:
+            for route, statement, params in captured:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).all()
+                details = [row[-1] for row in plan]
+                if verbose:
+                    print(f"-- {route}\n{statement.strip()}")
+                    for detail in details:
+                        print(f"   {detail}")
+                for detail in details:
+                    match = _SCAN_RE.match(detail)
+                    if match and _table_name(match.group(1)) not in ALLOWED_SCANS | {"CONSTANT"}:
+                        failures.append((route, statement.strip(), detail))
+
+        print(f"Audited {len(seen)} distinct statements from {len(calls)} route calls.")
+        return failures, failed_calls
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fail on full table scans in route queries")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement and its plan")
+    args = parser.parse_args()
+
+    failures, failed_calls = audit(verbose=args.verbose)
+    for route, statement, detail in failures:
+        print(f"\nSCAN in {route}: {detail}\n{statement}")
+    if failed_calls:
+        print(f"\n{len(failed_calls)} route call(s) failed: "
+              + ", ".join(f"{route} ({status})" for route, status in failed_calls))
+    if failures:
+        print(f"\n{len(failures)} statement(s) scan a table.")
+    if failures or failed_calls:
+        sys.exit(1)
+    print("No table scans found.")
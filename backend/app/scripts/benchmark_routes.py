@@ -0,0 +1,627 @@
+"""
+Benchmarks the API routes against generated data in a file-backed SQLite
+database.
+
+Generates N users with M gardens each, K placed plants per garden and some
+harvest and journal history, on top of the curated catalog from
+populate_plant_database.PLANTS (optionally padded with synthetic plants to
+a Perenual-sized catalog). Every blueprint is then driven through the Flask
+test client and, per route, the script reports p50/p95 latency, SQL
+statements per request and peak Python memory allocated while handling one
+request (tracemalloc).
+
+Weather and hardiness lookups are served from seeded caches and a generated
+zone table, so nothing leaves the machine. Google login is not driven.
+The layout solver is also timed on its own (50x50 grid, 300 plants) for
+its iteration throughput, and re-optimizing its layout after adding a plant
+is scored against a cold solve of the same plants.
+
+Every route is expected to answer with a 2xx (or 304) status; a route that
+returns anything else is reported as FAILING and the run exits non-zero, so
+a fast error response is never mistaken for a speedup.
+
+Results can be saved as a JSON baseline and later runs compared against it;
+a comparison exits non-zero when a route's p50 got slower by more than
+--threshold or it issues more statements.
+
+Usage:
+    cd backend
+    PYTHONPATH=. venv/bin/python app/scripts/benchmark_routes.py
+    PYTHONPATH=. venv/bin/python app/scripts/benchmark_routes.py --users 200 --gardens 3 --plants-per-garden 60 --catalog-size 10000
+    PYTHONPATH=. venv/bin/python app/scripts/benchmark_routes.py --only harvests --iterations 100
+    PYTHONPATH=. venv/bin/python app/scripts/benchmark_routes.py --only layout_optimizer --optimizer-seconds 2
+    PYTHONPATH=. venv/bin/python app/scripts/benchmark_routes.py --save benchmarks/baseline.json
+    PYTHONPATH=. venv/bin/python app/scripts/benchmark_routes.py --compare benchmarks/baseline.json
+"""
+
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert, select
+
+from app import create_app
+from app.config import TestingConfig, config_by_name
+from app.models.database import db
+from app.models.garden_type import GardenType, GardenTypeEnum
+from app.models.geocode import GeocodedZip
+from app.models.harvest import Harvest
+from app.models.journal_entry import JournalEntry
+from app.models.plant import Plant
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.models.user_garden import UserGarden
+from app.models.user_garden_plant import GrowthStage, UserGardenPlant
+from app.scripts.populate_plant_database import PLANTS
+from app.services.hardiness_zones import write_zone_table
+from app.services.harvest_rollups import rebuild_harvest_rollups
+from app.services.companions import COMPANION_INDEX
+from app.services.layout_optimizer import LayoutOptimizer
+from app.services.plant_catalog import get_plant_catalog
+from app.services.weather_cache import _forecast_cache, grid_cell
+
+PASSWORD = "Bench-passw0rd!"
+
+# (zip, zone, latitude, longitude) assigned to users round-robin
+LOCATIONS = [
+    ("10001", "7b", 40.75, -73.99),
+    ("94103", "10b", 37.77, -122.41),
+    ("60601", "6a", 41.88, -87.62),
+    ("33101", "11a", 25.77, -80.19),
+    ("80202", "5b", 39.75, -104.99),
+]
+
+HARVEST_UNITS = ["lbs", "kg", "oz", "count"]
+ENTRY_TYPES = ["watering", "fertilizing", "pruning", "planting", "observation"]
+
+
+def synthetic_plants(count):
+    """Return ``count`` plant dicts: PLANTS first, then numbered variants of them."""
+    plants = [dict(plant) for plant in PLANTS[:count]]
+    for i in range(count - len(plants)):
+        plant = dict(PLANTS[i % len(PLANTS)])
+        plant["name"] = f"{plant['name']} {i // len(PLANTS) + 2}"
+        plants.append(plant)
+    return plants
+
+
+def grid_shape(plants_per_garden):
+    """Grid big enough for the placed plants plus a free row, within 50x50."""
+    cols = min(50, max(10, math.ceil(math.sqrt(plants_per_garden))))
+    rows = min(50, max(8, math.ceil(plants_per_garden / cols) + 1))
+    return rows, cols
+
+
+class BenchUser:
+    """A generated user, its auth header and ids the benchmarks draw from."""
+
+    def __init__(self, user_id, username, location):
+        self.id = user_id
+        self.username = username
+        self.zip_code, self.zone = location[0], location[1]
+        self.headers = None
+        self.gardens = []         # garden ids
+        self.garden_plants = {}   # garden id -> [garden plant ids]
+        self.free_cells = {}      # garden id -> [(row, col)]
+        self.grid = None          # (rows, cols) of the generated gardens
+        self.harvest_ids = []
+        self.entry_ids = []
+        self.new_gardens = []     # created by the add_garden benchmark
+
+
+def generate(users, gardens, plants_per_garden, history, catalog_size, rng):
+    """Fill the database and return (bench users, admin user, plant ids)."""
+    db.session.add_all(Plant(**plant) for plant in synthetic_plants(catalog_size))
+    db.session.add_all(GardenType(name=garden_type) for garden_type in GardenTypeEnum)
+    db.session.commit()
+    plant_ids = db.session.execute(select(Plant.id)).scalars().all()
+
+    # One real hash shared by every user keeps generation fast
+    template = User(username="template", email="template@example.com")
+    template.set_password(PASSWORD)
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(User.__table__), [
+        {"username": f"bench{i}", "email": f"bench{i}@example.com", "password_hash": template.password_hash,
+         "auth_provider": "local", "is_admin": i == 0, "created_at": now,
+         "last_login_at": now - timedelta(days=rng.randint(0, 90))}
+        for i in range(users)
+    ])
+    user_rows = db.session.execute(select(User.id, User.username).order_by(User.id)).all()
+    bench_users = [BenchUser(uid, name, LOCATIONS[i % len(LOCATIONS)]) for i, (uid, name) in enumerate(user_rows)]
+
+    db.session.execute(insert(UserProfile.__table__), [
+        {"user_id": u.id, "zip_code": u.zip_code, "plant_hardiness_zone": u.zone,
+         "sunlight_hours": 6, "has_irrigation": False, "soil_ph": round(rng.uniform(5.5, 7.5), 1)}
+        for u in bench_users
+    ])
+
+    rows, cols = grid_shape(plants_per_garden)
+    for u in bench_users:
+        u.grid = (rows, cols)
+    db.session.execute(insert(UserGarden.__table__), [
+        {"user_id": u.id, "garden_name": f"Garden {i}", "garden_type_id": 1,
+         "grid_rows": rows, "grid_cols": cols, "plant_hardiness_zone": u.zone}
+        for u in bench_users for i in range(gardens)
+    ])
+    for garden_id, user_id in db.session.execute(select(UserGarden.id, UserGarden.user_id).order_by(UserGarden.id)):
+        bench_users[user_id - bench_users[0].id].gardens.append(garden_id)
+
+    cells = [(r, c) for r in range(rows) for c in range(cols)]
+    garden_plants, harvests, entries = [], [], []
+    for u in bench_users:
+        for garden_id in u.gardens:
+            placed = cells[:plants_per_garden]
+            u.free_cells[garden_id] = cells[plants_per_garden:]
+            for row, col in placed:
+                garden_plants.append({"garden_id": garden_id, "plant_id": rng.choice(plant_ids),
+                                      "growth_stage": GrowthStage.SEEDLING.name, "row": row, "col": col,
+                                      "planted_at": now})
+            for i in range(history):
+                day = now - timedelta(days=rng.randint(0, 3 * 365), minutes=i)
+                harvests.append({"garden_id": garden_id, "plant_id": rng.choice(plant_ids), "user_id": u.id,
+                                 "quantity": round(rng.uniform(0.1, 10), 2), "unit": rng.choice(HARVEST_UNITS),
+                                 "harvest_date": day, "created_at": day})
+                entries.append({"garden_id": garden_id, "user_id": u.id, "entry_type": rng.choice(ENTRY_TYPES),
+                                "title": f"Entry {i}", "entry_date": day, "created_at": day})
+    for table, rows_ in ((UserGardenPlant.__table__, garden_plants), (Harvest.__table__, harvests),
+                         (JournalEntry.__table__, entries)):
+        for start in range(0, len(rows_), 5000):
+            db.session.execute(insert(table), rows_[start:start + 5000])
+    db.session.commit()
+    rebuild_harvest_rollups()
+
+    by_id = {u.id: u for u in bench_users}
+    for garden_plant_id, garden_id in db.session.execute(select(UserGardenPlant.id, UserGardenPlant.garden_id)):
+        garden = db.session.get(UserGarden, garden_id)
+        by_id[garden.user_id].garden_plants.setdefault(garden_id, []).append(garden_plant_id)
+    for harvest_id, user_id in db.session.execute(select(Harvest.id, Harvest.user_id)):
+        by_id[user_id].harvest_ids.append(harvest_id)
+    for entry_id, user_id in db.session.execute(select(JournalEntry.id, JournalEntry.user_id)):
+        by_id[user_id].entry_ids.append(entry_id)
+
+    for u in bench_users:
+        u.headers = {"Authorization": f"Bearer {create_access_token(identity=str(u.id))}"}
+    return bench_users, bench_users[0], plant_ids
+
+
+def seed_external(zone_table_path):
+    """Serve weather and hardiness lookups locally."""
+    write_zone_table(zone_table_path, {zip_code: zone for zip_code, zone, _, _ in LOCATIONS})
+    for zip_code, _, latitude, longitude in LOCATIONS:
+        db.session.merge(GeocodedZip(zip_code=zip_code, latitude=latitude, longitude=longitude))
+        _forecast_cache.set(grid_cell(latitude, longitude), {
+            "latitude": latitude, "longitude": longitude,
+            "current": {"temperature_2m": 18.5, "precipitation": 0.0, "weathercode": 2},
+        })
+    db.session.commit()
+
+
+class Call:
+    """Per-iteration values a benchmark builds its request from."""
+
+    _serial = itertools.count()
+
+    def __init__(self, user, admin, plant_ids, rng):
+        self.user = user
+        self.admin = admin
+        self.rng = rng
+        self.plant_ids = plant_ids
+        self.n = next(self._serial)
+        self.garden_id = rng.choice(user.gardens)
+        self.plant_id = rng.choice(plant_ids)
+        self.garden_plant_id = rng.choice(user.garden_plants.get(self.garden_id) or [0])
+
+    def pop(self, ids):
+        return ids.pop() if ids else 0
+
+    def free_cell(self):
+        cells = self.user.free_cells[self.garden_id]
+        return cells.pop() if cells else (0, 0)
+
+
+def _harvest_rows(call, count=50):
+    return [{"garden_id": call.garden_id, "plant_id": call.plant_id, "quantity": 1.5, "unit": "lbs",
+             "harvest_date": "2024-06-01T08:00:00"} for _ in range(count)]
+
+
+def _entry_rows(call, count=50):
+    return [{"garden_id": call.garden_id, "entry_type": "observation", "title": f"Bulk {i}"} for i in range(count)]
+
+
+def _map_batch(call):
+    ids = call.user.garden_plants.get(call.garden_id, [])
+    operations = [{"op": "place", "plant_id": call.plant_id, "row": r, "col": c}
+                  for r, c in (call.free_cell(), call.free_cell())]
+    if len(ids) >= 2:
+        a, b = call.rng.sample(ids, 2)
+        operations.append({"op": "swap", "garden_plant_ids": [a, b]})
+    return {"operations": operations}
+
+
+# (name, method, url(call), body(call) or None, auth[, extra headers]) where auth is
+# "user", "admin" or None.
+# Writes that consume ids (deletes) come after the reads of the same blueprint.
+BENCHMARKS = [
+    ("health", "GET", lambda c: "/api/health", None, None),
+    ("users.register", "POST", lambda c: "/api/users/register",
+     lambda c: {"username": f"newbench{c.n}", "email": f"newbench{c.n}@example.com", "password": PASSWORD}, None),
+    ("users.login", "POST", lambda c: "/api/users/login",
+     lambda c: {"username": c.user.username, "password": PASSWORD}, None),
+    ("users.get_user", "GET", lambda c: "/api/users/get_user", None, "user"),
+    ("users.get_profile", "GET", lambda c: "/api/users/profile", None, "user"),
+    ("users.update_profile", "POST", lambda c: "/api/users/profile",
+     lambda c: {"zip_code": c.user.zip_code, "sunlight_hours": 6, "soil_ph": 6.5}, "user"),
+    ("users.inactive_users", "GET", lambda c: "/api/users/inactive_users", None, "admin"),
+    ("hardiness.zone", "GET", lambda c: f"/api/hardiness/get_hardiness_zone?zip={c.user.zip_code}", None, None),
+    ("weather.get_weather", "GET", lambda c: f"/api/weather/get_weather?zip={c.user.zip_code}", None, None),
+    ("weather_alerts", "GET", lambda c: "/api/weather_alerts?temperature=35", None, "user"),
+    ("frost_dates.zone", "GET", lambda c: f"/api/frost_dates?zone={c.user.zone}", None, None),
+    ("frost_dates.zip", "GET", lambda c: f"/api/frost_dates?zip={c.user.zip_code}", None, None),
+    ("plants.get_plants", "GET", lambda c: "/api/plants/get_plants", None, None),
+    ("plants.get_plants:zone_page", "GET",
+     lambda c: f"/api/plants/get_plants?zone={c.user.zone}&sunlight=Full+Sun&limit=50", None, None),
+    ("plants.get_plants:search", "GET", lambda c: "/api/plants/get_plants?search=tom", None, None),
+    ("plants.search", "GET", lambda c: "/api/plants/search?q=be", None, None),
+    ("plants.get_plant", "GET", lambda c: f"/api/plants/{c.plant_id}", None, None),
+    ("plants.care_tips", "GET", lambda c: f"/api/plants/{c.plant_id}/care-tips", None, None),
+    ("garden_types.list", "GET", lambda c: "/api/garden_types", None, None),
+    ("garden_types.get", "GET", lambda c: "/api/garden_types/1", None, None),
+    ("recommendations", "GET", lambda c: "/api/recommendations", None, "user"),
+    ("recommendations.seasonal", "GET", lambda c: "/api/recommendations/seasonal", None, "user"),
+    ("planting_calendar", "GET", lambda c: f"/api/planting_calendar?zone={c.user.zone}", None, None),
+    ("tasks", "GET", lambda c: "/api/tasks", None, "user"),
+    ("soil.recommendations", "GET", lambda c: "/api/soil/recommendations", None, "user"),
+    ("soil.ph_guide", "GET", lambda c: "/api/soil/ph-guide", None, None),
+    ("tips.seasonal", "GET", lambda c: f"/api/tips/seasonal?zone={c.user.zone}", None, None),
+    ("user_gardens.list", "GET", lambda c: "/api/user_gardens", None, "user"),
+    ("user_gardens.get", "GET", lambda c: f"/api/user_gardens/{c.garden_id}", None, "user"),
+    ("user_gardens.update", "PUT", lambda c: f"/api/user_gardens/{c.garden_id}",
+     lambda c: {"garden_name": f"Garden {c.n}"}, "user"),
+    ("user_gardens.add", "POST", lambda c: "/api/user_gardens",
+     lambda c: {"garden_name": f"Extra {c.n}", "garden_type_id": 1}, "user"),
+    ("user_gardens.delete", "DELETE", lambda c: f"/api/user_gardens/{c.pop(c.user.new_gardens)}", None, "user"),
+    ("user_garden_plants.list", "GET", lambda c: f"/api/user_garden_plants/{c.garden_id}", None, "user"),
+    ("user_garden_plants.add", "POST", lambda c: "/api/user_garden_plants",
+     lambda c: {"garden_id": c.garden_id, "plant_id": c.plant_id}, "user"),
+    ("garden_map.get", "GET", lambda c: f"/api/user_gardens/{c.garden_id}/map", None, "user"),
+    ("garden_map.companions", "GET",
+     lambda c: f"/api/user_gardens/{c.garden_id}/map/companions?radius=2&plant_id={c.plant_id}", None, "user"),
+    ("garden_map.info", "GET", lambda c: f"/api/user_gardens/{c.garden_id}/map/{c.garden_plant_id}/info", None, "user"),
+    ("garden_map.place", "POST", lambda c: f"/api/user_gardens/{c.garden_id}/map/place",
+     lambda c: dict(zip(("row", "col"), c.free_cell()), plant_id=c.plant_id), "user"),
+    ("garden_map.optimize", "POST", lambda c: f"/api/user_gardens/{c.garden_id}/map/optimize",
+     lambda c: {"plants": [{"plant_id": c.plant_id, "count": 4}, {"plant_id": c.rng.choice(c.plant_ids)}],
+                "time_budget_ms": 20, "seed": c.n}, "user"),
+    ("garden_map.batch", "POST", lambda c: f"/api/user_gardens/{c.garden_id}/map/batch", _map_batch, "user"),
+    # Alternately drops the last row (repacking its plants) and restores it
+    ("garden_map.resize", "PUT", lambda c: f"/api/user_gardens/{c.garden_id}/map/resize",
+     lambda c: {"grid_rows": c.user.grid[0] - c.n % 2, "grid_cols": c.user.grid[1], "repack": True}, "user"),
+    ("garden_map.remove", "DELETE",
+     lambda c: f"/api/user_gardens/{c.garden_id}/map/{c.pop(c.user.garden_plants.get(c.garden_id, []))}", None, "user"),
+    # Seeded plants are not in the change log, so this returns the edits made by the runs above
+    ("garden_map.get:since", "GET", lambda c: f"/api/user_gardens/{c.garden_id}/map?since=0", None, "user"),
+    ("garden_map.get:not_modified", "GET", lambda c: f"/api/user_gardens/{c.garden_id}/map", None, "user",
+     {"If-None-Match": "*"}),
+    ("user_garden_plants.remove", "DELETE",
+     lambda c: f"/api/user_garden_plants/{c.pop(c.user.garden_plants.get(c.garden_id, []))}", None, "user"),
+    ("journal.create", "POST", lambda c: "/api/journal",
+     lambda c: {"garden_id": c.garden_id, "entry_type": "watering", "title": "Bench"}, "user"),
+    ("journal.list", "GET", lambda c: f"/api/journal/{c.garden_id}", None, "user"),
+    ("journal.list:page", "GET", lambda c: f"/api/journal/{c.garden_id}?limit=20", None, "user"),
+    ("journal.recent", "GET", lambda c: f"/api/journal/{c.garden_id}/recent", None, "user"),
+    ("journal.count", "GET", lambda c: f"/api/journal/{c.garden_id}/count?from=2024-01-01", None, "user"),
+    ("journal.export", "GET", lambda c: f"/api/journal/{c.garden_id}/export?format=ndjson", None, "user"),
+    ("journal.bulk", "POST", lambda c: "/api/journal/bulk", _entry_rows, "user"),
+    ("journal.delete", "DELETE", lambda c: f"/api/journal/{c.pop(c.user.entry_ids)}", None, "user"),
+    ("harvests.log", "POST", lambda c: "/api/harvests",
+     lambda c: {"garden_id": c.garden_id, "plant_id": c.plant_id, "quantity": 2, "unit": "lbs"}, "user"),
+    ("harvests.list", "GET", lambda c: f"/api/harvests/{c.garden_id}", None, "user"),
+    ("harvests.list:page", "GET", lambda c: f"/api/harvests/{c.garden_id}?limit=20", None, "user"),
+    ("harvests.count", "GET", lambda c: f"/api/harvests/{c.garden_id}/count", None, "user"),
+    ("harvests.export", "GET", lambda c: f"/api/harvests/{c.garden_id}/export?format=csv", None, "user"),
+    ("harvests.summary", "GET", lambda c: "/api/harvests/summary", None, "user"),
+    ("harvests.bulk", "POST", lambda c: "/api/harvests/bulk", _harvest_rows, "user"),
+    ("harvests.delete", "DELETE", lambda c: f"/api/harvests/{c.pop(c.user.harvest_ids)}", None, "user"),
+    ("metrics", "GET", lambda c: "/api/metrics", None, None),
+    ("profiling.list", "GET", lambda c: "/api/admin/profiling", None, "admin"),
+    # Invalidates the plant catalog, so it runs last
+    ("plants.add", "POST", lambda c: "/api/plants",
+     lambda c: {"name": f"Bench Plant {c.n}", "growing_season": "Summer"}, None),
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_benchmarks(app, users, admin, plant_ids, iterations, warmup, memory_iterations, only, rng):
+    """Drive each benchmark and return {name: result dict}."""
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    client = app.test_client()
+    results = {}
+    try:
+        for name, method, url, body, auth, *extra_headers in BENCHMARKS:
+            if only and not any(pattern in name for pattern in only):
+                continue
+
+            def request_once():
+                user = rng.choice(users)
+                if name == "user_gardens.delete":
+                    # Only users that the add benchmark gave a garden have one to delete
+                    user = rng.choice([u for u in users if u.new_gardens] or users)
+                call = Call(user, admin, plant_ids, rng)
+                headers = {"user": user.headers, "admin": admin.headers}.get(auth)
+                if extra_headers:
+                    headers = {**(headers or {}), **extra_headers[0]}
+                path = url(call)
+                response = client.open(path, method=method, json=body(call) if body else None, headers=headers)
+                response.get_data()  # drain streamed bodies
+                if name == "user_gardens.add" and response.status_code == 201:
+                    user.new_gardens.append(response.get_json()["garden_id"])
+                return response.status_code
+
+            for _ in range(warmup):
+                request_once()
+
+            timings, queries, statuses = [], [], Counter()
+            for _ in range(iterations):
+                before = statements[0]
+                start = time.perf_counter()
+                status = request_once()
+                timings.append((time.perf_counter() - start) * 1000)
+                queries.append(statements[0] - before)
+                statuses[str(status)] += 1
+
+            peak = 0
+            if memory_iterations:
+                tracemalloc.start()
+                try:
+                    for _ in range(memory_iterations):
+                        tracemalloc.reset_peak()
+                        current = tracemalloc.get_traced_memory()[0]
+                        request_once()
+                        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+                finally:
+                    tracemalloc.stop()
+
+            results[name] = {
+                "method": method,
+                "iterations": iterations,
+                "p50_ms": round(_percentile(timings, 50), 3),
+                "p95_ms": round(_percentile(timings, 95), 3),
+                "mean_ms": round(sum(timings) / len(timings), 3),
+                "queries_per_request": round(sum(queries) / len(queries), 2),
+                "peak_kib": round(peak / 1024, 1),
+                "statuses": dict(statuses),
+            }
+            print(_format_row(name, results[name]), flush=True)
+            unexpected = _unexpected_statuses(results[name])
+            if unexpected:
+                print(f"!! {name} FAILING: returned {', '.join(unexpected)}", flush=True)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    return results
+
+
+def benchmark_optimizer(seconds, rounds=3):
+    """Time the layout solver alone: 300 plants on a 50x50 grid, best values of ``rounds`` runs.
+
+    Each round also adds a plant to the solved layout and re-optimizes it
+    from the previous anchors (the incremental path), next to a cold solve
+    of the same 301 plants with the same budget.
+    """
+    plants = [record for record in get_plant_catalog() if record.name in COMPANION_INDEX]
+    extra = plants[len(plants) // 2]
+    runs, warm_runs = [], []
+    for _ in range(rounds):
+        optimizer = LayoutOptimizer(50, 50, rng=random.Random(0))
+        for i in range(300):
+            optimizer.add(plants[i * 7 % len(plants)])
+        stats = optimizer.optimize(seconds)
+        runs.append((stats, optimizer.score))
+
+        warm = LayoutOptimizer(50, 50, rng=random.Random(1))
+        for plant, row, col, _, _ in optimizer.layout():
+            warm.add(plant, row, col)
+        warm.add(extra)
+        warm_stats = warm.optimize(seconds)
+
+        cold = LayoutOptimizer(50, 50, rng=random.Random(1))
+        for plant, _, _, _, _ in warm.layout():
+            cold.add(plant)
+        cold.optimize(seconds)
+        warm_runs.append((warm_stats, warm.score, cold.score))
+
+    best = {
+        "initial_ms": round(min(stats["initial_seconds"] for stats, _ in runs) * 1000, 1),
+        "iterations_per_s": round(max(stats["iterations"] / (stats["seconds"] - stats["initial_seconds"])
+                                      for stats, _ in runs)),
+        "score": max(score for _, score in runs),
+        "warm_initial_ms": round(min(stats["initial_seconds"] for stats, _, _ in warm_runs) * 1000, 1),
+        "warm_score": max(score for _, score, _ in warm_runs),
+        "cold_score": max(score for _, _, score in warm_runs),
+    }
+    print(f"\nlayout optimizer (50x50, 300 plants, {seconds}s): initial placement {best['initial_ms']} ms, "
+          f"{best['iterations_per_s']} iterations/s, score {best['score']}")
+    print(f"layout optimizer re-optimize after adding a plant: initial placement {best['warm_initial_ms']} ms, "
+          f"score {best['warm_score']} (cold solve of the same plants: {best['cold_score']})")
+    return best
+
+
+def _unexpected_statuses(result):
+    """Return the status codes of a route result other than 2xx and 304."""
+    return sorted(code for code in result["statuses"] if not (code.startswith("2") or code == "304"))
+
+
+HEADER = f"{'route':<34} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'peak KiB':>9}  statuses"
+
+
+def _format_row(name, result):
+    statuses = ",".join(f"{code}x{n}" for code, n in sorted(result["statuses"].items()))
+    return (f"{name:<34} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['queries_per_request']:>8.1f} {result['peak_kib']:>9.1f}  {statuses}")
+
+
+def compare(results, baseline, threshold, min_ms):
+    """Print deltas against a baseline and return the regressed route names."""
+    regressions = []
+    print(f"\n{'route':<34} {'p50 base':>9} {'p50 now':>9} {'p95 base':>9} {'p95 now':>9} {'queries':>13}")
+    for name, result in results.items():
+        base = baseline["routes"].get(name)
+        if base is None:
+            continue
+        # p95 of a few dozen samples is mostly noise, so only p50 gates
+        slower = result["p50_ms"] > base["p50_ms"] * (1 + threshold) and result["p50_ms"] - base["p50_ms"] > min_ms
+        more_queries = result["queries_per_request"] > base["queries_per_request"] + 0.5
+        if _unexpected_statuses(result):
+            flag = "  FAILING"
+        elif slower or more_queries:
+            flag = "  REGRESSION"
+        else:
+            flag = ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<34} {base['p50_ms']:>9.2f} {result['p50_ms']:>9.2f} {base['p95_ms']:>9.2f} "
+              f"{result['p95_ms']:>9.2f} {base['queries_per_request']:>6.1f}->{result['queries_per_request']:<6.1f}{flag}")
+    return regressions
+
+
+def compare_optimizer(result, base, threshold):
+    """Return True when solver throughput or initial placement regressed."""
+    slower = result["iterations_per_s"] < base["iterations_per_s"] * (1 - threshold)
+    slower_start = result["initial_ms"] > base["initial_ms"] * (1 + threshold) and result["initial_ms"] - base["initial_ms"] > 5
+    print(f"\nlayout optimizer: {base['iterations_per_s']} -> {result['iterations_per_s']} iterations/s, "
+          f"initial {base['initial_ms']} -> {result['initial_ms']} ms{'  REGRESSION' if slower or slower_start else ''}")
+    if "warm_score" in base:
+        print(f"layout optimizer re-optimize: score {base['warm_score']} -> {result['warm_score']} "
+              f"(cold {base['cold_score']} -> {result['cold_score']})")
+    return slower or slower_start
+
+
+def main(args):
+    logging.disable(logging.WARNING)
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="gardening-bench-")
+    db_path = args.db or os.path.join(workdir, "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    zone_table = os.path.join(workdir, "zones.bin")
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        LOG_LEVEL = "WARNING"
+        HARDINESS_ZONE_TABLE = zone_table
+        HARDINESS_ZONE_HTTP_FALLBACK = False
+        HARDINESS_ZONE_ASYNC = False
+        SECRET_KEY = "benchmark"
+        JWT_SECRET_KEY = "benchmark-jwt-secret-key-0123456789"
+
+    config_by_name["benchmark"] = BenchmarkConfig
+    try:
+        app = create_app("benchmark")
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            users, admin, plant_ids = generate(args.users, args.gardens, args.plants_per_garden,
+                                               args.history, args.catalog_size, rng)
+            seed_external(zone_table)
+            setup_seconds = time.perf_counter() - started
+            print(f"Generated {len(users)} users, {len(users) * args.gardens} gardens, "
+                  f"{len(plant_ids)} plants in {setup_seconds:.1f}s ({db_path})\n")
+
+            print(HEADER)
+            results = run_benchmarks(app, users, admin, plant_ids, args.iterations, args.warmup,
+                                     args.memory_iterations, args.only, rng)
+            optimizer = None
+            if args.optimizer_seconds and (not args.only or any(p in "layout_optimizer" for p in args.only)):
+                optimizer = benchmark_optimizer(args.optimizer_seconds)
+    finally:
+        config_by_name.pop("benchmark", None)
+        if not args.db:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "params": {key: getattr(args, key) for key in (
+            "users", "gardens", "plants_per_garden", "history", "catalog_size",
+            "iterations", "warmup", "memory_iterations", "seed", "optimizer_seconds")},
+        "setup_seconds": round(setup_seconds, 2),
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "routes": results,
+        "optimizer": optimizer,
+    }
+    failing = [name for name, result in results.items() if _unexpected_statuses(result)]
+    if args.save and failing:
+        print(f"\nNot saving a baseline: {', '.join(failing)} returned unexpected statuses.")
+    elif args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if baseline.get("params") != report["params"]:
+            print("\nWarning: baseline was recorded with different parameters.")
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        if optimizer and baseline.get("optimizer") and compare_optimizer(optimizer, baseline["optimizer"], args.threshold):
+            regressions.append("layout_optimizer")
+        if regressions:
+            print(f"\n{len(regressions)} route(s) regressed: {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions.")
+    if failing:
+        print(f"\n{len(failing)} route(s) returned unexpected statuses: {', '.join(failing)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the API routes on generated data")
+    parser.add_argument("--users", type=int, default=20, help="Users to generate")
+    parser.add_argument("--gardens", type=int, default=2, help="Gardens per user")
+    parser.add_argument("--plants-per-garden", type=int, default=30, help="Placed plants per garden")
+    parser.add_argument("--history", type=int, default=200, help="Harvests and journal entries per garden")
+    parser.add_argument("--catalog-size", type=int, default=len(PLANTS),
+                        help="Plants in the catalog; above len(PLANTS) synthetic variants are added")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed requests per route")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per route")
+    parser.add_argument("--memory-iterations", type=int, default=3,
+                        help="Requests per route traced for peak memory (0 to skip)")
+    parser.add_argument("--optimizer-seconds", type=float, default=1.0,
+                        help="Budget of each standalone layout solver run (0 to skip)")
+    parser.add_argument("--only", action="append", help="Only routes whose name contains this (repeatable)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for data and request choice")
+    parser.add_argument("--db", help="Keep the generated database at this path")
+    parser.add_argument("--save", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative p50 increase counted as a regression (default 0.25)")
+    parser.add_argument("--min-ms", type=float, default=0.5,
+                        help="Ignore latency increases smaller than this many ms")
+    sys.exit(main(parser.parse_args()))
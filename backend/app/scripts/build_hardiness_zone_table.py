@@ -0,0 +1,44 @@
+"""
+Builds the offline zip code -> USDA hardiness zone table.
+
+Input is a CSV with ``zipcode`` and ``zone`` columns, such as the PRISM
+"phzm_us_zipcode_2023.csv" release of the 2023 USDA Plant Hardiness Zone Map.
+The output is the binary table read by app/services/hardiness_zones.py.
+
+Usage:
+    cd backend
+    PYTHONPATH=. venv/bin/python app/scripts/build_hardiness_zone_table.py phzm_us_zipcode_2023.csv
+    PYTHONPATH=. venv/bin/python app/scripts/build_hardiness_zone_table.py zones.csv -o /tmp/zones.bin
+"""
+
+import csv
+import os
+
+from app.config import BaseConfig
+from app.services.hardiness_zones import ZoneTable, write_zone_table
+
+
+def build_zone_table(csv_path, output_path):
+    """Read zip/zone pairs from a CSV and write the binary table."""
+    with open(csv_path, newline="") as f:
+        zones_by_zip = {row["zipcode"].zfill(5): row["zone"] for row in csv.DictReader(f)}
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    written = write_zone_table(output_path, zones_by_zip)
+    print(f"Wrote {written} of {len(zones_by_zip)} zip codes to {output_path}")
+
+    # Sanity check: every written zip must read back
+    table = ZoneTable.open(output_path)
+    assert len(table) == written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the offline hardiness zone table")
+    parser.add_argument("csv_path", help="CSV with zipcode and zone columns")
+    parser.add_argument("-o", "--output", default=BaseConfig.HARDINESS_ZONE_TABLE,
+                        help="Output path (default: HARDINESS_ZONE_TABLE)")
+    args = parser.parse_args()
+
+    build_zone_table(args.csv_path, args.output)
@@ -0,0 +1,28 @@
+"""
+Rebuilds the harvest summary rollup tables from the harvest table.
+
+Run after bulk edits that bypassed the ORM (manual SQL, restores) or if the
+summary page ever disagrees with the harvest list.
+
+Usage:
+    cd backend
+    PYTHONPATH=. venv/bin/python app/scripts/rebuild_harvest_rollups.py
+    PYTHONPATH=. venv/bin/python app/scripts/rebuild_harvest_rollups.py --user-id 42
+"""
+
+from app import create_app
+from app.services.harvest_rollups import rebuild_harvest_rollups
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild harvest summary rollups")
+    parser.add_argument("--user-id", type=int, default=None,
+                        help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        rebuild_harvest_rollups(args.user_id)
+        print("Harvest rollups rebuilt for", "all users" if args.user_id is None else f"user {args.user_id}")
@@ -0,0 +1,6 @@
+"""
+In-process services shared across blueprints.
+
+Services hold precomputed, read-mostly state (indexes, lookup tables,
+caches) so that routes do not have to rebuild it on every request.
+"""
@@ -0,0 +1,229 @@
+"""
+Bulk harvest and journal imports.
+
+Rows arrive as a JSON array (``application/json``), newline-delimited JSON
+(``application/x-ndjson``) or CSV with a header row (``text/csv``). NDJSON and
+CSV bodies are read from the request stream line by line, so a large
+spreadsheet export is never held in memory as a whole.
+
+Rows are validated with the model schemas and processed in chunks of
+``CHUNK_SIZE``: garden ownership is checked with one query per chunk (and
+remembered for the rest of the import), plant ids or names are resolved
+against the shared plant catalog, the valid rows are written with a single
+``executemany`` insert and the chunk is committed. Invalid rows are skipped
+and reported by row number; they never abort the rest of the import.
+"""
+
+import codecs
+import csv
+import json
+import logging
+from datetime import datetime, timezone
+from marshmallow import EXCLUDE, ValidationError
+from sqlalchemy import insert, select
+from ..models.database import db
+from ..models.harvest import Harvest, HarvestSchema
+from ..models.journal_entry import JournalEntry, JournalEntrySchema
+from ..models.user_garden import UserGarden
+from .harvest_rollups import apply_harvest_rows
+from .plant_catalog import get_plant_catalog
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+MAX_IMPORT_ROWS = 10000
+MAX_REPORTED_ERRORS = 200
+
+JSON_TYPES = ("application/json",)
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+CSV_TYPES = ("text/csv", "application/csv")
+
+_harvest_schema = HarvestSchema(unknown=EXCLUDE)
+_entry_schema = JournalEntrySchema(unknown=EXCLUDE)
+
+
+class BulkImportError(Exception):
+    """The request body cannot be imported at all."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _ndjson_rows(stream):
+    for number, line in enumerate(codecs.iterdecode(stream, "utf-8-sig"), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+def _csv_rows(stream):
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    for number, row in enumerate(reader, start=1):
+        # Spreadsheet exports leave optional cells empty
+        yield number, {key.strip(): value for key, value in row.items()
+                       if key and value not in (None, "")}
+
+
+def iter_request_rows(request):
+    """Yield (row_number, data) pairs from the request body.
+
+    ``data`` is None for an NDJSON line that is not valid JSON.
+    """
+    mimetype = request.mimetype
+    if mimetype in JSON_TYPES:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise BulkImportError("Expected a JSON array of rows")
+        return enumerate(data, start=1)
+    if mimetype in NDJSON_TYPES:
+        return _ndjson_rows(request.stream)
+    if mimetype in CSV_TYPES:
+        return _csv_rows(request.stream)
+    raise BulkImportError(
+        "Unsupported content type; send application/json, application/x-ndjson or text/csv",
+        415,
+    )
+
+
+class _Import:
+    """Shared chunking, ownership and reporting for one bulk import."""
+
+    def __init__(self, user_id):
+        self.user_id = int(user_id)
+        self.owned_gardens = {}  # garden_id -> bool
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def reject(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "errors": errors})
+
+    def check_gardens(self, garden_ids):
+        """Look up ownership of gardens not seen earlier in this import."""
+        unseen = {gid for gid in garden_ids if gid not in self.owned_gardens}
+        if not unseen:
+            return
+        owned = set(db.session.execute(
+            select(UserGarden.id).where(UserGarden.user_id == self.user_id, UserGarden.id.in_(unseen))
+        ).scalars())
+        for garden_id in unseen:
+            self.owned_gardens[garden_id] = garden_id in owned
+
+    def run(self, rows, prepare, table, after_insert=None):
+        """Validate, insert and commit ``rows`` chunk by chunk."""
+        chunk = []
+        for count, (number, data) in enumerate(rows, start=1):
+            if count > MAX_IMPORT_ROWS:
+                self.reject(number, {"_schema": [f"Imports are limited to {MAX_IMPORT_ROWS} rows."]})
+                break
+            if data is None:
+                self.reject(number, {"_schema": ["Row is not valid JSON."]})
+                continue
+            if not isinstance(data, dict):
+                self.reject(number, {"_schema": ["Row must be a JSON object."]})
+                continue
+            values, errors = prepare(data)
+            if errors:
+                self.reject(number, errors)
+                continue
+            chunk.append((number, values))
+            if len(chunk) >= CHUNK_SIZE:
+                self._flush(chunk, table, after_insert)
+                chunk = []
+        if chunk:
+            self._flush(chunk, table, after_insert)
+        return self.result()
+
+    def _flush(self, chunk, table, after_insert):
+        self.check_gardens({values["garden_id"] for _, values in chunk})
+        rows = []
+        for number, values in chunk:
+            if self.owned_gardens[values["garden_id"]]:
+                rows.append(values)
+            else:
+                self.reject(number, {"garden_id": ["Garden not found or access denied."]})
+        if not rows:
+            return
+
+        try:
+            db.session.execute(insert(table), rows)
+            if after_insert is not None:
+                after_insert(db.session.connection(), rows)
+            db.session.commit()
+            self.inserted += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Bulk insert into %s failed: %s", table.name, e, exc_info=True)
+            for number, values in chunk:
+                if self.owned_gardens[values["garden_id"]]:
+                    self.reject(number, {"_schema": ["Row could not be saved."]})
+
+    def result(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
+
+
+def import_harvests(rows, user_id):
+    """Import harvest rows for a user. Rows may name the plant instead of its id."""
+    job = _Import(user_id)
+    catalog = get_plant_catalog()
+    now = datetime.now(timezone.utc)
+
+    def prepare(data):
+        if data.get("plant_id") in (None, "") and data.get("plant_name"):
+            plant = catalog.get_by_name(data["plant_name"])
+            if plant is None:
+                return None, {"plant_name": ["Plant not found."]}
+            data = dict(data, plant_id=plant.id)
+        try:
+            loaded = _harvest_schema.load(data)
+        except ValidationError as err:
+            return None, err.messages
+        if catalog.get(loaded["plant_id"]) is None:
+            return None, {"plant_id": ["Plant not found."]}
+        return {
+            "garden_id": loaded["garden_id"],
+            "plant_id": loaded["plant_id"],
+            "user_id": job.user_id,
+            "quantity": loaded["quantity"],
+            "unit": loaded["unit"],
+            "quality": loaded.get("quality"),
+            "notes": loaded.get("notes"),
+            "harvest_date": loaded.get("harvest_date") or now,
+        }, None
+
+    # Core inserts bypass the flush hook, so the rollups are updated here
+    return job.run(rows, prepare, Harvest.__table__,
+                   after_insert=lambda connection, inserted: apply_harvest_rows(connection, inserted))
+
+
+def import_journal_entries(rows, user_id):
+    """Import journal entry rows for a user."""
+    job = _Import(user_id)
+    now = datetime.now(timezone.utc)
+
+    def prepare(data):
+        try:
+            loaded = _entry_schema.load(data)
+        except ValidationError as err:
+            return None, err.messages
+        return {
+            "garden_id": loaded["garden_id"],
+            "user_id": job.user_id,
+            "entry_type": loaded["entry_type"],
+            "title": loaded["title"],
+            "notes": loaded.get("notes"),
+            "entry_date": loaded.get("entry_date") or now,
+        }, None
+
+    return job.run(rows, prepare, JournalEntry.__table__)
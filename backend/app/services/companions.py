@@ -0,0 +1,632 @@
+"""
+Companion-planting relations and the garden map compatibility engine.
+
+``COMPANION_DATA`` is compiled at import into dense integer ids (every
+plant name that appears as a key or in a good/bad list gets one), per-plant
+good/bad bitsets as listed by that plant, and a symmetric relation matrix:
++1 when either plant lists the other as good, -1 when either lists it as
+bad (bad wins), 0 otherwise.
+
+``companion_heatmap`` scores a whole garden grid in one pass: every placed
+plant is compared with the plants within ``radius`` cells of it (Chebyshev
+distance, so diagonals count), and optionally every empty cell is scored
+for a candidate plant.
+"""
+
+import threading
+from array import array
+from .plant_catalog import get_plant_catalog
+
+DEFAULT_COMPANION_RADIUS = 1
+MAX_COMPANION_RADIUS = 5
+
+# Companion planting data: plant_name -> {good: [...], bad: [...], tips: str}
+COMPANION_DATA = {
+    "Artichoke": {
+        "good": ["Sunflower", "Tarragon", "Pea"],
+        "bad": [],
+        "tips": "Artichokes are large plants; give them plenty of space and pair with nitrogen-fixers like peas."
+    },
+    "Arugula": {
+        "good": ["Carrot", "Beet", "Lettuce", "Onion", "Dill"],
+        "bad": ["Strawberry"],
+        "tips": "Arugula grows quickly and can be tucked between slower crops as a living mulch."
+    },
+    "Asparagus": {
+        "good": ["Tomato", "Parsley", "Basil", "Marigold", "Dill"],
+        "bad": ["Onion", "Garlic", "Potato"],
+        "tips": "Asparagus and tomatoes are classic companions - tomatoes repel asparagus beetles."
+    },
+    "Basil": {
+        "good": ["Tomato", "Pepper", "Oregano", "Lettuce", "Asparagus", "Marigold"],
+        "bad": ["Sage", "Thyme"],
+        "tips": "Plant near tomatoes and peppers. Basil can repel aphids and mosquitoes."
+    },
+    "Bay Laurel": {
+        "good": ["Rosemary", "Lavender", "Thyme"],
+        "bad": [],
+        "tips": "Bay laurel pairs well with other Mediterranean herbs that share similar growing needs."
+    },
+    "Beet": {
+        "good": ["Lettuce", "Onion", "Garlic", "Cabbage", "Kohlrabi", "Broccoli"],
+        "bad": ["Green Bean", "Mustard"],
+        "tips": "Beets and onions make great companions. The beet greens provide ground cover."
+    },
+    "Bell Pepper": {
+        "good": ["Basil", "Tomato", "Carrot", "Onion", "Spinach", "Marigold"],
+        "bad": ["Fennel", "Green Bean", "Kohlrabi"],
+        "tips": "Bell peppers love basil nearby - it may improve flavor and repel common pests."
+    },
+    "Blackberry": {
+        "good": ["Borage", "Mint", "Garlic", "Chives", "Tansy"],
+        "bad": ["Tomato", "Pepper", "Eggplant", "Potato", "Raspberry"],
+        "tips": "Keep blackberries away from nightshades to avoid shared diseases. Borage attracts pollinators."
+    },
+    "Blueberry": {
+        "good": ["Strawberry", "Rhododendron", "Azalea", "Thyme"],
+        "bad": ["Tomato", "Pepper"],
+        "tips": "Blueberries love acidic soil. Pair with other acid-loving plants."
+    },
+    "Bok Choy": {
+        "good": ["Celery", "Onion", "Beet", "Thyme", "Chamomile"],
+        "bad": ["Strawberry", "Tomato"],
+        "tips": "Bok choy grows well with alliums that help repel cabbage pests."
+    },
+    "Borage": {
+        "good": ["Tomato", "Cucumber", "Squash", "Strawberry", "Cabbage"],
+        "bad": [],
+        "tips": "Borage is a powerful pollinator attractor and may improve the flavor of nearby tomatoes and strawberries."
+    },
+    "Broccoli": {
+        "good": ["Beet", "Celery", "Chamomile", "Dill", "Onion", "Rosemary", "Sage"],
+        "bad": ["Tomato", "Strawberry", "Hot Pepper"],
+        "tips": "Aromatic herbs like rosemary and sage repel cabbage moths that attack broccoli."
+    },
+    "Brussels Sprouts": {
+        "good": ["Beet", "Carrot", "Dill", "Onion", "Sage", "Thyme"],
+        "bad": ["Strawberry", "Tomato"],
+        "tips": "Plant with strong-scented herbs to deter cabbage white butterflies."
+    },
+    "Butternut Squash": {
+        "good": ["Corn", "Green Bean", "Radish", "Marigold", "Nasturtium", "Borage"],
+        "bad": ["Potato"],
+        "tips": "A classic Three Sisters crop. Large leaves shade soil and suppress weeds."
+    },
+    "Cabbage": {
+        "good": ["Beet", "Celery", "Chamomile", "Dill", "Onion", "Rosemary", "Sage", "Thyme"],
+        "bad": ["Strawberry", "Tomato", "Grape"],
+        "tips": "Cabbage benefits from aromatic herbs and alliums that confuse cabbage moths."
+    },
+    "Calendula": {
+        "good": ["Tomato", "Pepper", "Asparagus", "Cucumber", "Pea"],
+        "bad": [],
+        "tips": "Calendula attracts beneficial insects and can serve as a trap crop for aphids."
+    },
+    "Cantaloupe": {
+        "good": ["Corn", "Sunflower", "Nasturtium", "Radish", "Marigold"],
+        "bad": ["Potato", "Cucumber"],
+        "tips": "Melons need space. Nasturtiums help repel cucumber beetles."
+    },
+    "Carrot": {
+        "good": ["Tomato", "Lettuce", "Onion", "Pea", "Radish", "Rosemary", "Chives", "Sage"],
+        "bad": ["Dill", "Celery", "Parsnip"],
+        "tips": "Carrots grow well with onions - onions repel carrot fly."
+    },
+    "Cauliflower": {
+        "good": ["Beet", "Celery", "Dill", "Onion", "Spinach", "Sage"],
+        "bad": ["Strawberry", "Tomato"],
+        "tips": "Similar to broccoli companions. Celery deters cabbage white butterflies."
+    },
+    "Celery": {
+        "good": ["Tomato", "Cabbage", "Cauliflower", "Leek", "Spinach", "Onion"],
+        "bad": ["Carrot", "Parsnip", "Corn"],
+        "tips": "Celery and tomatoes or brassicas are mutually beneficial companions."
+    },
+    "Chamomile": {
+        "good": ["Cabbage", "Broccoli", "Cauliflower", "Onion", "Cucumber"],
+        "bad": [],
+        "tips": "Chamomile improves the health and flavor of brassicas and attracts beneficial insects."
+    },
+    "Cherry Tomato": {
+        "good": ["Basil", "Carrot", "Parsley", "Marigold", "Lettuce", "Onion", "Chives"],
+        "bad": ["Cabbage", "Fennel", "Potato", "Corn"],
+        "tips": "Same companions as regular tomatoes. Basil may enhance flavor and repel pests."
+    },
+    "Chives": {
+        "good": ["Carrot", "Tomato", "Rose", "Strawberry", "Apple"],
+        "bad": ["Green Bean", "Pea"],
+        "tips": "Chives repel aphids and carrot fly. Excellent border plant."
+    },
+    "Cilantro": {
+        "good": ["Tomato", "Pepper", "Spinach", "Lettuce", "Pea", "Anise"],
+        "bad": ["Fennel"],
+        "tips": "Cilantro attracts beneficial insects when it bolts and flowers."
+    },
+    "Collard Greens": {
+        "good": ["Onion", "Garlic", "Beet", "Rosemary", "Thyme", "Dill"],
+        "bad": ["Strawberry", "Tomato"],
+        "tips": "Alliums and aromatic herbs help repel cabbage family pests."
+    },
+    "Comfrey": {
+        "good": ["Fruit trees", "Raspberry", "Strawberry", "Grape"],
+        "bad": [],
+        "tips": "Comfrey is a dynamic accumulator - its deep roots pull up nutrients. Excellent mulch plant."
+    },
+    "Corn": {
+        "good": ["Green Bean", "Squash", "Cucumber", "Pea", "Cantaloupe", "Watermelon", "Pumpkin"],
+        "bad": ["Tomato", "Celery"],
+        "tips": "The classic 'Three Sisters' planting: corn, beans, and squash support each other."
+    },
+    "Cosmos": {
+        "good": ["Tomato", "Squash", "Cucumber"],
+        "bad": [],
+        "tips": "Cosmos attract pollinators and beneficial insects like lacewings and parasitic wasps."
+    },
+    "Cucumber": {
+        "good": ["Green Bean", "Pea", "Radish", "Sunflower", "Lettuce", "Corn", "Dill", "Nasturtium"],
+        "bad": ["Potato", "Sage", "Mint"],
+        "tips": "Train cucumbers to grow up trellises near corn for natural support."
+    },
+    "Dill": {
+        "good": ["Cabbage", "Lettuce", "Onion", "Cucumber", "Broccoli", "Tomato"],
+        "bad": ["Carrot"],
+        "tips": "Dill attracts beneficial wasps and ladybugs. Young dill benefits tomatoes; harvest before it goes to seed near them. Keep away from carrots (cross-pollination risk)."
+    },
+    "Eggplant": {
+        "good": ["Green Bean", "Pepper", "Spinach", "Thyme", "Marigold"],
+        "bad": ["Fennel"],
+        "tips": "Eggplant benefits from beans (nitrogen) and marigolds (pest deterrent)."
+    },
+    "Endive": {
+        "good": ["Carrot", "Radish", "Onion", "Chives"],
+        "bad": [],
+        "tips": "Endive pairs well with root vegetables and alliums."
+    },
+    "Fennel": {
+        "good": ["Dill"],
+        "bad": ["Tomato", "Pepper", "Green Bean", "Carrot", "Eggplant", "Kohlrabi"],
+        "tips": "Fennel is allelopathic and inhibits many plants. Grow it isolated or with dill."
+    },
+    "Garlic": {
+        "good": ["Tomato", "Pepper", "Lettuce", "Beet", "Strawberry", "Rose", "Raspberry"],
+        "bad": ["Green Bean", "Pea"],
+        "tips": "Garlic is a natural pest deterrent. Plant around roses and vegetables."
+    },
+    "Ginger": {
+        "good": ["Cilantro", "Lemongrass", "Turmeric", "Green Bean"],
+        "bad": [],
+        "tips": "Ginger grows well with other tropical plants and benefits from partial shade."
+    },
+    "Grape": {
+        "good": ["Chives", "Garlic", "Rosemary", "Hyssop", "Geranium"],
+        "bad": ["Cabbage", "Radish"],
+        "tips": "Grapes benefit from alliums and aromatic herbs that deter Japanese beetles."
+    },
+    "Green Bean": {
+        "good": ["Corn", "Cucumber", "Potato", "Carrot", "Pea", "Squash", "Eggplant"],
+        "bad": ["Onion", "Garlic", "Pepper", "Fennel", "Chives"],
+        "tips": "Beans fix nitrogen in the soil, benefiting neighboring plants."
+    },
+    "Green Onion": {
+        "good": ["Carrot", "Lettuce", "Tomato", "Beet", "Strawberry", "Pepper"],
+        "bad": ["Green Bean", "Pea"],
+        "tips": "Green onions repel pests and fit neatly between other crops."
+    },
+    "Horseradish": {
+        "good": ["Potato", "Sweet Potato"],
+        "bad": [],
+        "tips": "Horseradish planted at potato patch corners may repel Colorado potato beetles."
+    },
+    "Hot Pepper": {
+        "good": ["Basil", "Tomato", "Carrot", "Onion", "Spinach", "Marigold"],
+        "bad": ["Fennel", "Green Bean", "Broccoli"],
+        "tips": "Hot peppers benefit from the same companions as bell peppers."
+    },
+    "Jalapeno Pepper": {
+        "good": ["Basil", "Tomato", "Carrot", "Onion", "Spinach", "Marigold"],
+        "bad": ["Fennel", "Green Bean"],
+        "tips": "Same companion guidelines as other peppers. Basil helps repel aphids."
+    },
+    "Kale": {
+        "good": ["Beet", "Celery", "Cucumber", "Dill", "Garlic", "Lettuce", "Onion", "Spinach"],
+        "bad": ["Strawberry", "Tomato"],
+        "tips": "Kale benefits from alliums and aromatic herbs. Interplant with lettuce for efficient space use."
+    },
+    "Kohlrabi": {
+        "good": ["Beet", "Onion", "Cucumber", "Lettuce"],
+        "bad": ["Tomato", "Pepper", "Fennel", "Strawberry"],
+        "tips": "Kohlrabi pairs well with other brassica companions like beets and onions."
+    },
+    "Lavender": {
+        "good": ["Rose", "Rosemary", "Thyme", "Sage", "Oregano"],
+        "bad": ["Mint"],
+        "tips": "Lavender repels fleas, moths, and mosquitoes. Attracts pollinators."
+    },
+    "Leek": {
+        "good": ["Carrot", "Celery", "Onion", "Strawberry"],
+        "bad": ["Green Bean", "Pea"],
+        "tips": "Leeks repel carrot fly and work well interplanted with carrots."
+    },
+    "Lemon Balm": {
+        "good": ["Tomato", "Squash", "Melon", "Broccoli"],
+        "bad": [],
+        "tips": "Lemon balm attracts pollinators and repels mosquitoes. Can be invasive - contain it."
+    },
+    "Lemongrass": {
+        "good": ["Ginger", "Turmeric", "Cilantro", "Tomato"],
+        "bad": [],
+        "tips": "Lemongrass repels mosquitoes and pairs well with tropical edibles."
+    },
+    "Lettuce": {
+        "good": ["Carrot", "Radish", "Strawberry", "Onion", "Garlic", "Beet", "Chives"],
+        "bad": ["Celery", "Parsley"],
+        "tips": "Lettuce benefits from taller plants nearby that provide partial shade."
+    },
+    "Marigold": {
+        "good": ["Tomato", "Pepper", "Cucumber", "Squash", "Potato", "Eggplant", "Rose"],
+        "bad": ["Green Bean", "Cabbage"],
+        "tips": "Marigolds repel nematodes, aphids, and whiteflies. Plant throughout the garden."
+    },
+    "Marjoram": {
+        "good": ["Pepper", "Eggplant", "Squash", "Green Bean"],
+        "bad": [],
+        "tips": "Marjoram improves the flavor of nearby vegetables and attracts pollinators."
+    },
+    "Mint": {
+        "good": ["Cabbage", "Tomato", "Pea"],
+        "bad": ["Lavender", "Chamomile", "Parsley"],
+        "tips": "Mint repels cabbage moths and ants. Always grow in containers to prevent spreading."
+    },
+    "Nasturtium": {
+        "good": ["Cucumber", "Squash", "Tomato", "Cabbage", "Radish", "Green Bean"],
+        "bad": [],
+        "tips": "Nasturtium is an excellent trap crop for aphids. Flowers are edible."
+    },
+    "Okra": {
+        "good": ["Pepper", "Eggplant", "Melon", "Cucumber", "Basil"],
+        "bad": [],
+        "tips": "Okra provides shade for heat-sensitive crops. Pairs well with other warm-season plants."
+    },
+    "Onion": {
+        "good": ["Carrot", "Lettuce", "Tomato", "Pepper", "Beet", "Strawberry", "Cabbage"],
+        "bad": ["Green Bean", "Pea"],
+        "tips": "Onions repel many pests and pair well with most garden vegetables."
+    },
+    "Oregano": {
+        "good": ["Basil", "Pepper", "Tomato", "Squash", "Grape"],
+        "bad": [],
+        "tips": "Oregano provides ground cover and repels aphids. Great near peppers and tomatoes."
+    },
+    "Parsley": {
+        "good": ["Tomato", "Asparagus", "Corn", "Pepper", "Rose"],
+        "bad": ["Lettuce", "Mint"],
+        "tips": "Parsley attracts beneficial insects and pairs well with tomatoes and asparagus."
+    },
+    "Parsnip": {
+        "good": ["Radish", "Onion", "Garlic", "Pea", "Green Bean"],
+        "bad": ["Carrot", "Celery"],
+        "tips": "Parsnips grow well with alliums. Radishes help mark the slow-germinating rows."
+    },
+    "Pea": {
+        "good": ["Carrot", "Corn", "Cucumber", "Green Bean", "Radish", "Turnip", "Spinach"],
+        "bad": ["Onion", "Garlic", "Chives"],
+        "tips": "Peas fix nitrogen in the soil. Follow peas with nitrogen-loving crops."
+    },
+    "Pepper": {
+        "good": ["Basil", "Tomato", "Carrot", "Onion", "Spinach", "Marigold"],
+        "bad": ["Fennel", "Green Bean"],
+        "tips": "Peppers and basil are great companions. Basil may improve pepper flavor."
+    },
+    "Peppermint": {
+        "good": ["Cabbage", "Broccoli", "Kale"],
+        "bad": ["Lavender", "Chamomile"],
+        "tips": "Peppermint deters cabbage moths and flea beetles. Grow in pots to contain spreading."
+    },
+    "Potato": {
+        "good": ["Green Bean", "Corn", "Cabbage", "Pea", "Marigold", "Horseradish"],
+        "bad": ["Tomato", "Cucumber", "Squash", "Sunflower", "Raspberry"],
+        "tips": "Keep potatoes away from tomatoes - they share diseases (late blight)."
+    },
+    "Pumpkin": {
+        "good": ["Corn", "Green Bean", "Radish", "Marigold", "Nasturtium", "Sunflower"],
+        "bad": ["Potato"],
+        "tips": "Another great Three Sisters crop. Nasturtiums repel squash bugs."
+    },
+    "Radicchio": {
+        "good": ["Carrot", "Onion", "Lettuce", "Chives"],
+        "bad": [],
+        "tips": "Radicchio pairs well with other salad greens and alliums."
+    },
+    "Radish": {
+        "good": ["Carrot", "Lettuce", "Pea", "Cucumber", "Spinach", "Nasturtium", "Chives"],
+        "bad": [],
+        "tips": "Fast-growing radishes mark rows for slow-germinating carrots."
+    },
+    "Raspberry": {
+        "good": ["Garlic", "Marigold", "Tansy", "Turnip"],
+        "bad": ["Blackberry", "Potato"],
+        "tips": "Garlic deters Japanese beetles. Keep raspberries away from other brambles."
+    },
+    "Rhubarb": {
+        "good": ["Garlic", "Onion", "Cabbage", "Kale", "Strawberry"],
+        "bad": [],
+        "tips": "Rhubarb leaves deter pests (never eat the leaves). Pairs with brassicas."
+    },
+    "Romaine Lettuce": {
+        "good": ["Carrot", "Radish", "Strawberry", "Onion", "Garlic", "Beet", "Chives"],
+        "bad": ["Celery", "Parsley"],
+        "tips": "Same companion guidelines as regular lettuce. Benefits from afternoon shade."
+    },
+    "Rose": {
+        "good": ["Garlic", "Chives", "Lavender", "Marigold", "Parsley", "Geranium"],
+        "bad": [],
+        "tips": "Garlic and chives repel aphids from roses. Lavender attracts pollinators."
+    },
+    "Rosemary": {
+        "good": ["Sage", "Lavender", "Thyme", "Cabbage", "Broccoli", "Carrot", "Green Bean"],
+        "bad": [],
+        "tips": "Rosemary repels cabbage moths, carrot fly, and bean beetles."
+    },
+    "Sage": {
+        "good": ["Rosemary", "Cabbage", "Carrot", "Tomato", "Strawberry"],
+        "bad": ["Cucumber", "Basil"],
+        "tips": "Sage repels cabbage moths and carrot flies. Avoid planting near cucumbers."
+    },
+    "Spinach": {
+        "good": ["Strawberry", "Pea", "Green Bean", "Radish", "Pepper", "Kale", "Lettuce"],
+        "bad": [],
+        "tips": "Spinach grows well in the shade of taller plants during hot months."
+    },
+    "Squash": {
+        "good": ["Corn", "Green Bean", "Radish", "Marigold", "Pea", "Nasturtium", "Borage"],
+        "bad": ["Potato"],
+        "tips": "Large squash leaves shade the ground, suppressing weeds for neighbors."
+    },
+    "Strawberry": {
+        "good": ["Lettuce", "Spinach", "Onion", "Garlic", "Borage", "Thyme", "Sage"],
+        "bad": ["Cabbage", "Broccoli", "Fennel"],
+        "tips": "Borage is the best strawberry companion - it attracts pollinators and may improve yield."
+    },
+    "Sugar Snap Pea": {
+        "good": ["Carrot", "Corn", "Cucumber", "Green Bean", "Radish", "Turnip"],
+        "bad": ["Onion", "Garlic"],
+        "tips": "Same companions as regular peas. Great nitrogen fixer for the soil."
+    },
+    "Sunchoke": {
+        "good": ["Corn", "Sunflower"],
+        "bad": ["Tomato"],
+        "tips": "Sunchokes grow tall and can shade other plants. Give them their own area."
+    },
+    "Sunflower": {
+        "good": ["Cucumber", "Corn", "Squash", "Lettuce", "Pumpkin"],
+        "bad": ["Potato"],
+        "tips": "Sunflowers attract pollinators and provide natural trellising for climbing crops."
+    },
+    "Sweet Potato": {
+        "good": ["Green Bean", "Thyme", "Oregano", "Dill", "Horseradish"],
+        "bad": ["Squash", "Tomato"],
+        "tips": "Sweet potato vines provide ground cover. Pair with herbs that repel pests."
+    },
+    "Swiss Chard": {
+        "good": ["Green Bean", "Onion", "Cabbage", "Lettuce", "Lavender"],
+        "bad": ["Corn", "Cucumber"],
+        "tips": "Swiss chard does well with brassicas and alliums. Attractive as an edible border."
+    },
+    "Tarragon": {
+        "good": ["Tomato", "Eggplant", "Pepper"],
+        "bad": [],
+        "tips": "Tarragon improves the flavor and growth of neighboring vegetables."
+    },
+    "Thyme": {
+        "good": ["Cabbage", "Broccoli", "Eggplant", "Potato", "Strawberry", "Rose", "Lavender"],
+        "bad": ["Basil"],
+        "tips": "Thyme repels cabbage worms, whiteflies, and corn earworms."
+    },
+    "Tomatillo": {
+        "good": ["Basil", "Carrot", "Parsley", "Marigold", "Pepper"],
+        "bad": ["Fennel", "Potato", "Corn", "Dill"],
+        "tips": "Tomatillos need cross-pollination - plant at least two. Similar companions to tomatoes."
+    },
+    "Tomato": {
+        "good": ["Basil", "Carrot", "Parsley", "Marigold", "Lettuce", "Onion", "Chives", "Borage", "Nasturtium", "Dill"],
+        "bad": ["Cabbage", "Fennel", "Potato", "Corn"],
+        "tips": "Tomatoes love basil as a companion - it may improve flavor and repel pests. Young dill attracts beneficial insects, though mature dill may slightly inhibit tomato growth."
+    },
+    "Turmeric": {
+        "good": ["Ginger", "Lemongrass", "Cilantro", "Green Bean"],
+        "bad": [],
+        "tips": "Turmeric grows well with other tropical plants and benefits from partial shade."
+    },
+    "Turnip": {
+        "good": ["Pea", "Onion", "Garlic", "Vetch"],
+        "bad": ["Potato", "Mustard"],
+        "tips": "Turnips pair well with peas. Onions and garlic help deter turnip pests."
+    },
+    "Watermelon": {
+        "good": ["Corn", "Sunflower", "Nasturtium", "Radish", "Marigold"],
+        "bad": ["Potato", "Cucumber"],
+        "tips": "Watermelons need space. Nasturtiums help repel beetles."
+    },
+    "Winter Squash": {
+        "good": ["Corn", "Green Bean", "Radish", "Marigold", "Nasturtium", "Borage"],
+        "bad": ["Potato"],
+        "tips": "Classic Three Sisters companion. Large leaves suppress weeds."
+    },
+    "Zucchini": {
+        "good": ["Corn", "Green Bean", "Radish", "Marigold", "Nasturtium", "Borage", "Pea"],
+        "bad": ["Potato"],
+        "tips": "Zucchini benefits from borage to attract pollinators and nasturtiums to repel squash bugs."
+    },
+    # Aliases for generic lookups
+    "Bean": {
+        "good": ["Corn", "Cucumber", "Potato", "Carrot", "Pea", "Squash", "Eggplant"],
+        "bad": ["Onion", "Garlic", "Pepper", "Fennel"],
+        "tips": "Beans fix nitrogen in the soil, benefiting neighboring plants."
+    },
+    "Melon": {
+        "good": ["Corn", "Sunflower", "Nasturtium", "Radish", "Marigold"],
+        "bad": ["Potato", "Cucumber"],
+        "tips": "Melons need space. Plant with nasturtiums and marigolds for pest control."
+    },
+}
+
+
+def _compile(data):
+    names = []
+    index = {}
+    for name, entry in data.items():
+        for other in (name, *entry["good"], *entry["bad"]):
+            if other not in index:
+                index[other] = len(names)
+                names.append(other)
+
+    good = [0] * len(names)
+    bad = [0] * len(names)
+    for name, entry in data.items():
+        i = index[name]
+        for other in entry["good"]:
+            good[i] |= 1 << index[other]
+        for other in entry["bad"]:
+            bad[i] |= 1 << index[other]
+
+    size = len(names)
+    relation = array("b", bytes(size * size))
+    for i in range(size):
+        for j in range(size):
+            if i == j:
+                continue
+            if (bad[i] >> j) & 1 or (bad[j] >> i) & 1:
+                relation[i * size + j] = -1
+            elif (good[i] >> j) & 1 or (good[j] >> i) & 1:
+                relation[i * size + j] = 1
+    return tuple(names), index, tuple(good), tuple(bad), relation
+
+
+COMPANION_NAMES, COMPANION_INDEX, GOOD_COMPANIONS, BAD_COMPANIONS, RELATION = _compile(COMPANION_DATA)
+
+
+def companion_relation(name_a, name_b):
+    """Return +1 (good), -1 (bad) or 0 for a pair of plant names."""
+    i = COMPANION_INDEX.get(name_a)
+    j = COMPANION_INDEX.get(name_b)
+    if i is None or j is None:
+        return 0
+    return RELATION[i * len(COMPANION_NAMES) + j]
+
+
+def companion_info(plant_name, neighbor_names):
+    """Return the neighbors that ``plant_name`` lists as good or bad companions, and its tips."""
+    i = COMPANION_INDEX.get(plant_name)
+    data = COMPANION_DATA.get(plant_name)
+    good_neighbors = []
+    bad_neighbors = []
+    if data:
+        good, bad = GOOD_COMPANIONS[i], BAD_COMPANIONS[i]
+        for neighbor in neighbor_names:
+            j = COMPANION_INDEX.get(neighbor)
+            if j is None or neighbor == plant_name:
+                continue
+            if (good >> j) & 1:
+                good_neighbors.append(neighbor)
+            if (bad >> j) & 1:
+                bad_neighbors.append(neighbor)
+
+    return {
+        "good_companions": good_neighbors,
+        "bad_companions": bad_neighbors,
+        "tips": [data["tips"]] if data else [],
+    }
+
+
+# (catalog, plant id -> companion id) pair, swapped atomically when the catalog is reloaded
+_ids_state = (None, None)
+_ids_lock = threading.Lock()
+
+
+def plant_companion_ids():
+    """Return a dict mapping catalog plant ids to companion ids (plants without data are absent)."""
+    global _ids_state
+
+    catalog = get_plant_catalog()
+    built_for, ids = _ids_state
+    if built_for is catalog:
+        return ids
+
+    with _ids_lock:
+        built_for, ids = _ids_state
+        if built_for is not catalog:
+            ids = {
+                record.id: COMPANION_INDEX[record.name]
+                for record in catalog if record.name in COMPANION_INDEX
+            }
+            _ids_state = (catalog, ids)
+    return ids
+
+
+def companion_heatmap(grid_rows, grid_cols, placements, radius=DEFAULT_COMPANION_RADIUS, candidate_plant_id=None):
+    """Score every placement of a garden grid against its neighbors within ``radius``.
+
+    ``placements`` is an iterable of ``(garden_plant_id, plant_id, row, col)``;
+    placements outside the grid are ignored. Returns a dict with:
+
+        scores      rows x cols list, net relation score of each occupied cell
+                    (good minus bad neighbors), None for empty cells
+        conflicts   pairs of placements within ``radius`` with a bad relation
+        candidate   (only with ``candidate_plant_id``) rows x cols list scoring
+                    that plant at every empty cell, None for occupied cells
+    """
+    ids = plant_companion_ids()
+    size = len(COMPANION_NAMES)
+    cells = grid_rows * grid_cols
+
+    # Per cell: companion id of the occupant (-1 without data), or None when empty
+    occupant = [None] * cells
+    placement_at = [None] * cells
+    for garden_plant_id, plant_id, row, col in placements:
+        if row is None or col is None or not (0 <= row < grid_rows and 0 <= col < grid_cols):
+            continue
+        cell = row * grid_cols + col
+        occupant[cell] = ids.get(plant_id, -1)
+        placement_at[cell] = garden_plant_id
+
+    scores = [None if o is None else 0 for o in occupant]
+    candidate = ids.get(candidate_plant_id, -1) if candidate_plant_id is not None else None
+    candidate_scores = [0 if o is None else None for o in occupant] if candidate is not None else None
+    candidate_row = candidate * size if candidate is not None and candidate >= 0 else None
+    conflicts = []
+
+    for cell, i in enumerate(occupant):
+        if i is None or i < 0:
+            continue
+        row, col = divmod(cell, grid_cols)
+        base = i * size
+        for r in range(max(0, row - radius), min(grid_rows, row + radius + 1)):
+            offset = r * grid_cols
+            for c in range(max(0, col - radius), min(grid_cols, col + radius + 1)):
+                other = offset + c
+                j = occupant[other]
+                if j is None:
+                    if candidate_row is not None:
+                        candidate_scores[other] += RELATION[candidate_row + i]
+                    continue
+                # Each occupied pair is visited from both ends; score it once
+                if other <= cell or j < 0:
+                    continue
+                relation = RELATION[base + j]
+                if relation:
+                    scores[cell] += relation
+                    scores[other] += relation
+                    if relation < 0:
+                        conflicts.append({
+                            "garden_plant_ids": [placement_at[cell], placement_at[other]],
+                            "plants": [COMPANION_NAMES[i], COMPANION_NAMES[j]],
+                            "cells": [[row, col], [r, c]],
+                        })
+
+    result = {
+        "scores": [scores[r * grid_cols:(r + 1) * grid_cols] for r in range(grid_rows)],
+        "conflicts": conflicts,
+    }
+    if candidate_scores is not None:
+        result["candidate"] = [candidate_scores[r * grid_cols:(r + 1) * grid_cols] for r in range(grid_rows)]
+    return result
@@ -0,0 +1,74 @@
+"""
+Streaming CSV and NDJSON exports.
+
+``export_response`` runs a column SELECT with ``yield_per`` (a server-side
+cursor where the driver supports one) and returns a generator response that
+encodes and sends the rows a batch at a time, so memory use depends on
+``EXPORT_BATCH_SIZE`` rather than on how much history is being exported.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, stream_with_context
+from ..models.database import db
+
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for row in batch:
+            writer.writerow(["" if value is None else _plain(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns, batches):
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in batch
+        )
+
+
+def export_response(statement, fmt, filename):
+    """Stream the rows of ``statement`` as CSV or NDJSON.
+
+    ``statement`` selects plain columns; their labels become the CSV header
+    or the NDJSON keys. Raises ValueError for an unknown ``fmt``.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    columns = [column.key for column in statement.selected_columns]
+    encode = _csv_chunks if fmt == "csv" else _ndjson_chunks
+
+    def generate():
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        try:
+            yield from encode(columns, result.partitions())
+        finally:
+            result.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,47 @@
+"""
+Garden contents versioning.
+
+``UserGarden.contents_version`` is bumped in the same transaction as any
+flush that adds a plant to a garden, removes one, or moves one between
+gardens. Per-user caches can key on the ``(garden_id, contents_version)``
+pairs of the user's gardens, which is a single indexed read.
+"""
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, attributes
+from ..models.database import db
+from ..models.user_garden import UserGarden
+from ..models.user_garden_plant import UserGardenPlant
+
+
+def garden_contents_key(user_id):
+    """Return a hashable key that changes whenever the user's garden contents do."""
+    rows = db.session.execute(
+        select(UserGarden.id, UserGarden.contents_version)
+        .where(UserGarden.user_id == user_id)
+        .order_by(UserGarden.id)
+    ).all()
+    return tuple((garden_id, version) for garden_id, version in rows)
+
+
+def bump_contents_version(connection, garden_ids):
+    """Increment contents_version for the given gardens."""
+    if garden_ids:
+        connection.execute(
+            update(UserGarden.__table__)
+            .where(UserGarden.id.in_(garden_ids))
+            .values(contents_version=UserGarden.contents_version + 1)
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _garden_plants_flushed(session, flush_context):
+    garden_ids = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, UserGardenPlant) and obj.garden_id is not None:
+            garden_ids.add(obj.garden_id)
+    for obj in session.dirty:
+        if isinstance(obj, UserGardenPlant):
+            history = attributes.get_history(obj, "garden_id")
+            garden_ids.update(g for g in (*history.added, *history.deleted) if g is not None)
+    bump_contents_version(session.connection(), garden_ids)
@@ -0,0 +1,300 @@
+"""
+Offline zip code -> USDA hardiness zone lookup.
+
+The zone table is a small binary file that is memory-mapped on first use:
+
+    header   4s magic "HZT1", uint32 record count (little-endian)
+    zips     count x uint32, sorted ascending (5-digit zip as an integer)
+    zones    count x uint8 zone codes (see encode_zone_code)
+
+A lookup is a binary search over the zip column, so it needs no network and
+no parsing at request time. Zip codes missing from the table (PO boxes,
+new zips) take the zone of the nearest listed zip in the same 3-digit
+sectional area. Only if that also fails, and HARDINESS_ZONE_HTTP_FALLBACK is
+set, is phzmapi.org asked.
+
+Build the table with ``app/scripts/build_hardiness_zone_table.py``. A running
+process picks up a newly installed table within a minute, but keeps the
+table it has opened: replacing that one needs a worker restart.
+
+Routes call ``resolve_zone``, which caches results per zip. The profile route
+uses ``peek_zone`` plus ``resolve_profile_zone_async`` so a save never waits
+on the HTTP fallback; the zone is written to the profile once it is known.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+import requests
+from flask import current_app
+from sqlalchemy import update
+from ..metrics import external_call
+from ..models.database import db
+from ..models.profile import UserProfile
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HZT1"
+HEADER = struct.Struct("<4sI")
+
+# USDA API URL, used only as a fallback
+USDA_API_URL = "https://phzmapi.org"
+
+# Timeout for external API calls (seconds)
+EXTERNAL_API_TIMEOUT = 10
+
+# Resolved zones are cached for a day; the table itself never changes at runtime
+ZONE_CACHE_TTL = 86400
+
+_HALVES = ("", "a", "b")
+
+
+class ZoneServiceError(Exception):
+    """Raised when the fallback zone service returns an error status."""
+
+    def __init__(self, status_code):
+        super().__init__(f"USDA API returned status {status_code}")
+        self.status_code = status_code
+
+
+def encode_zone_code(zone):
+    """Encode a zone string like '7b' as one byte (0 means unknown)."""
+    zone = (zone or "").strip().lower()
+    half = zone[-1:] if zone[-1:] in ("a", "b") else ""
+    number = zone[:-1] if half else zone
+    if not number.isdigit() or not 1 <= int(number) <= 13:
+        return 0
+    return int(number) * 3 + _HALVES.index(half)
+
+
+def decode_zone_code(code):
+    """Decode a zone byte back to its zone string, or None for 0."""
+    if not code:
+        return None
+    number, half = divmod(code, 3)
+    return f"{number}{_HALVES[half]}"
+
+
+def zip_to_int(zip_code):
+    """Return the 5-digit zip of a '12345' or '12345-6789' code as an int, or None."""
+    zip5 = (zip_code or "").strip()[:5]
+    return int(zip5) if len(zip5) == 5 and zip5.isdigit() else None
+
+
+def temperature_range(zone):
+    """Return the USDA extreme-minimum range for a zone, e.g. '0 to 5' for 7a."""
+    code = encode_zone_code(zone)
+    if not code:
+        return None
+    number, half = divmod(code, 3)
+    low = -60 + (number - 1) * 10 + (5 if half == 2 else 0)
+    high = low + (10 if half == 0 else 5)
+    return f"{low} to {high}"
+
+
+class ZoneTable:
+    """Read-only view over a zone table buffer."""
+
+    def __init__(self, buffer):
+        magic, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a hardiness zone table")
+        view = memoryview(buffer)
+        zips_end = HEADER.size + 4 * count
+        if len(view) < zips_end + count:
+            raise ValueError("Truncated hardiness zone table")
+
+        if sys.byteorder == "little":
+            self.zips = view[HEADER.size:zips_end].cast("I")
+        else:
+            self.zips = array("I", view[HEADER.size:zips_end])
+            self.zips.byteswap()
+        self.zones = view[zips_end:zips_end + count]
+        self._buffer = buffer
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a table file."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        return len(self.zips)
+
+    def lookup(self, zip_code):
+        """Return the zone for a zip code, or None if it cannot be placed."""
+        key = zip_to_int(zip_code)
+        if key is None or not len(self.zips):
+            return None
+
+        i = bisect_left(self.zips, key)
+        if i < len(self.zips) and self.zips[i] == key:
+            return decode_zone_code(self.zones[i])
+
+        # Nearest listed zip in the same 3-digit sectional area
+        neighbours = [j for j in (i - 1, i) if 0 <= j < len(self.zips)
+                      and self.zips[j] // 100 == key // 100]
+        if not neighbours:
+            return None
+        nearest = min(neighbours, key=lambda j: abs(self.zips[j] - key))
+        return decode_zone_code(self.zones[nearest])
+
+
+def write_zone_table(path, zones_by_zip):
+    """Write a table file from a {zip: zone string} mapping.
+
+    Zips that are not 5-digit codes and zones that cannot be encoded are
+    skipped. Returns the number of records written.
+    """
+    records = {}
+    for zip_code, zone in zones_by_zip.items():
+        key, code = zip_to_int(zip_code), encode_zone_code(zone)
+        if key is not None and code:
+            records[key] = code
+
+    zips = array("I", sorted(records))
+    zones = bytes(records[key] for key in zips)
+    if sys.byteorder != "little":
+        zips.byteswap()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(zones)))
+        f.write(zips.tobytes())
+        f.write(zones)
+    os.replace(tmp_path, path)
+    return len(zones)
+
+
+_zone_cache = TTLCache("hardiness_zone", ttl=ZONE_CACHE_TTL, max_entries=50000)
+
+# A missing table is looked for again at most this often (seconds)
+ZONE_TABLE_RECHECK_SECONDS = 60
+
+# (path, table, checked_at): table is None, and checked_at the monotonic time
+# of the last attempt, while the file is missing or unreadable
+_table_state = (None, None, float("-inf"))
+_table_lock = threading.Lock()
+
+
+def get_zone_table():
+    """Return the configured zone table, or None if it is not installed.
+
+    Once opened a table is kept for the life of the process (rebuilding it
+    needs a restart); a missing one is picked up within
+    ``ZONE_TABLE_RECHECK_SECONDS`` of being installed.
+    """
+    global _table_state
+
+    path = current_app.config.get("HARDINESS_ZONE_TABLE")
+    loaded_path, table, checked_at = _table_state
+    if loaded_path == path and (
+        table is not None or time.monotonic() - checked_at < ZONE_TABLE_RECHECK_SECONDS
+    ):
+        return table
+
+    with _table_lock:
+        loaded_path, table, checked_at = _table_state
+        now = time.monotonic()
+        if loaded_path == path and (
+            table is not None or now - checked_at < ZONE_TABLE_RECHECK_SECONDS
+        ):
+            return table
+
+        table = None
+        if path and os.path.exists(path):
+            try:
+                table = ZoneTable.open(path)
+                logger.info("Loaded hardiness zone table: zips=%d path=%s", len(table), path)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to load hardiness zone table %s: %s", path, e)
+        elif loaded_path != path:
+            # Warn once per path, not on every re-check
+            logger.warning("Hardiness zone table not found at %s", path)
+        _table_state = (path, table, now)
+    return table
+
+
+def _fetch_zone_remote(zip_code):
+    with external_call("phzmapi"):
+        response = requests.get(f"{USDA_API_URL}/{zip_code[:5]}.json", timeout=EXTERNAL_API_TIMEOUT)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise ZoneServiceError(response.status_code)
+        return response.json().get("zone")
+
+
+def lookup_hardiness_zone(zip_code):
+    """Return ``{"zone", "temperature_range"}`` for a zip code, or None.
+
+    Raises ``requests.RequestException`` or ``ZoneServiceError`` only when
+    the HTTP fallback is used and fails.
+    """
+    if zip_to_int(zip_code) is None:
+        return None
+
+    table = get_zone_table()
+    zone = table.lookup(zip_code) if table is not None else None
+    if zone is None and current_app.config.get("HARDINESS_ZONE_HTTP_FALLBACK", True):
+        zone = _fetch_zone_remote(zip_code)
+    if not zone:
+        return None
+    return {"zone": zone, "temperature_range": temperature_range(zone)}
+
+
+def resolve_zone(zip_code):
+    """Cached ``lookup_hardiness_zone``; concurrent lookups of a zip share one call."""
+    key = zip_to_int(zip_code)
+    if key is None:
+        return None
+    return _zone_cache.get_or_load(key, lambda: lookup_hardiness_zone(zip_code))
+
+
+def peek_zone(zip_code):
+    """Return the zone for a zip from the cache or table only, never the network."""
+    key = zip_to_int(zip_code)
+    if key is None:
+        return None
+    result = _zone_cache.get(key)
+    if result is None:
+        table = get_zone_table()
+        zone = table.lookup(zip_code) if table is not None else None
+        if zone:
+            result = {"zone": zone, "temperature_range": temperature_range(zone)}
+            _zone_cache.set(key, result)
+    return result
+
+
+def _fill_profile_zone(app, user_id, zip_code):
+    with app.app_context():
+        try:
+            result = resolve_zone(zip_code)
+        except Exception as e:
+            logger.warning("Failed to fetch hardiness zone for zip=%s: %s", zip_code, e)
+            return
+        if result is None:
+            return
+        # Skip the write if the user has changed their zip in the meantime
+        db.session.execute(
+            update(UserProfile)
+            .where(UserProfile.user_id == user_id, UserProfile.zip_code == zip_code)
+            .values(plant_hardiness_zone=result["zone"])
+        )
+        db.session.commit()
+        logger.info("Hardiness zone filled in for user_id=%s zone=%s", user_id, result["zone"])
+
+
+def resolve_profile_zone_async(user_id, zip_code):
+    """Resolve a zip's zone on a background thread and store it on the profile."""
+    app = current_app._get_current_object()
+    threading.Thread(
+        target=_fill_profile_zone, args=(app, user_id, zip_code), daemon=True
+    ).start()
@@ -0,0 +1,151 @@
+"""
+Harvest summary rollups.
+
+``harvest_user_rollup``, ``harvest_plant_rollup`` and ``harvest_month_rollup``
+hold running counts and quantity totals per user, per (user, plant, unit)
+and per (user, year, month). Any flush that inserts, deletes or edits
+``Harvest`` rows applies the matching deltas in the same transaction, so the
+summary endpoint reads a few rows by primary key instead of aggregating the
+user's whole history.
+
+Writes that bypass the ORM unit of work (core ``executemany`` inserts, bulk
+deletes) must call ``apply_harvest_rows`` themselves. ``rebuild_harvest_rollups``
+recomputes everything from the harvest table.
+"""
+
+import logging
+from collections import defaultdict
+from sqlalchemy import delete, event, extract, func, insert, select, update
+from sqlalchemy.orm import Session, attributes
+from ..models.database import db
+from ..models.harvest import Harvest, HarvestMonthRollup, HarvestPlantRollup, HarvestUserRollup
+
+logger = logging.getLogger(__name__)
+
+# Harvest columns the rollups depend on
+ROLLUP_COLUMNS = ("user_id", "plant_id", "unit", "quantity", "harvest_date")
+
+
+def _collect_deltas(rows, sign):
+    """Aggregate harvest rows into {(table, key): [count, quantity]} deltas."""
+    deltas = defaultdict(lambda: [0, 0.0])
+    for row in rows:
+        user_id = int(row["user_id"])
+        quantity = float(row["quantity"] or 0.0) * sign
+
+        deltas[(HarvestUserRollup, (user_id,))][0] += sign
+
+        plant = deltas[(HarvestPlantRollup, (user_id, int(row["plant_id"]), row["unit"]))]
+        plant[0] += sign
+        plant[1] += quantity
+
+        harvest_date = row["harvest_date"]
+        if harvest_date is not None:
+            month = deltas[(HarvestMonthRollup, (user_id, harvest_date.year, harvest_date.month))]
+            month[0] += sign
+            month[1] += quantity
+    return deltas
+
+
+def _key_clause(table, key):
+    return [column == value for column, value in zip(table.__table__.primary_key.columns, key)]
+
+
+def apply_harvest_rows(connection, rows, sign=1):
+    """Add (sign=1) or remove (sign=-1) harvest rows from the rollups.
+
+    ``rows`` are mappings with the ROLLUP_COLUMNS keys.
+    """
+    deltas = _collect_deltas(rows, sign)
+    for (table, key), (count, quantity) in deltas.items():
+        if count == 0 and quantity == 0:
+            continue
+        values = {"harvest_count": table.harvest_count + count}
+        if table is not HarvestUserRollup:
+            values["total_quantity"] = table.total_quantity + quantity
+
+        where = _key_clause(table, key)
+        result = connection.execute(update(table.__table__).where(*where).values(**values))
+        if result.rowcount == 0 and count > 0:
+            row = {column.key: value for column, value in zip(table.__table__.primary_key.columns, key)}
+            row["harvest_count"] = count
+            if table is not HarvestUserRollup:
+                row["total_quantity"] = quantity
+            connection.execute(insert(table.__table__).values(**row))
+        elif count < 0:
+            connection.execute(
+                delete(table.__table__).where(*where, table.harvest_count <= 0)
+            )
+
+
+def _row_values(harvest, committed=False):
+    """Return the rollup columns of a Harvest, optionally as last flushed."""
+    values = {}
+    for column in ROLLUP_COLUMNS:
+        value = getattr(harvest, column)
+        if committed:
+            history = attributes.get_history(harvest, column)
+            if history.deleted:
+                value = history.deleted[0]
+        values[column] = value
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _harvests_flushed(session, flush_context):
+    added, removed = [], []
+    for obj in session.new:
+        if isinstance(obj, Harvest):
+            added.append(_row_values(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Harvest):
+            removed.append(_row_values(obj, committed=True))
+    for obj in session.dirty:
+        if isinstance(obj, Harvest) and any(
+            attributes.get_history(obj, column).deleted for column in ROLLUP_COLUMNS
+        ):
+            removed.append(_row_values(obj, committed=True))
+            added.append(_row_values(obj))
+
+    if added or removed:
+        connection = session.connection()
+        apply_harvest_rows(connection, removed, sign=-1)
+        apply_harvest_rows(connection, added, sign=1)
+
+
+def rebuild_harvest_rollups(user_id=None):
+    """Recompute the rollups from the harvest table (all users, or one)."""
+    tables = (HarvestUserRollup, HarvestPlantRollup, HarvestMonthRollup)
+    for table in tables:
+        statement = delete(table.__table__)
+        if user_id is not None:
+            statement = statement.where(table.user_id == user_id)
+        db.session.execute(statement)
+
+    def scoped(query):
+        return query if user_id is None else query.where(Harvest.user_id == user_id)
+
+    db.session.execute(insert(HarvestUserRollup.__table__).from_select(
+        ["user_id", "harvest_count"],
+        scoped(select(Harvest.user_id, func.count(Harvest.id)).group_by(Harvest.user_id)),
+    ))
+    db.session.execute(insert(HarvestPlantRollup.__table__).from_select(
+        ["user_id", "plant_id", "unit", "harvest_count", "total_quantity"],
+        scoped(
+            select(Harvest.user_id, Harvest.plant_id, Harvest.unit,
+                   func.count(Harvest.id), func.sum(Harvest.quantity))
+            .group_by(Harvest.user_id, Harvest.plant_id, Harvest.unit)
+        ),
+    ))
+    year = extract("year", Harvest.harvest_date)
+    month = extract("month", Harvest.harvest_date)
+    db.session.execute(insert(HarvestMonthRollup.__table__).from_select(
+        ["user_id", "year", "month", "harvest_count", "total_quantity"],
+        scoped(
+            select(Harvest.user_id, year, month, func.count(Harvest.id), func.sum(Harvest.quantity))
+            .where(Harvest.harvest_date.isnot(None))
+            .group_by(Harvest.user_id, year, month)
+        ),
+    ))
+    db.session.commit()
+    logger.info("Rebuilt harvest rollups for user_id=%s", "all" if user_id is None else user_id)
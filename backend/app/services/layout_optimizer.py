@@ -0,0 +1,376 @@
+"""
+Garden map auto-layout.
+
+``LayoutOptimizer`` places a list of plants on a garden grid so that the
+companion relation score (``companions.RELATION``) summed over every pair of
+plants within ``radius`` cells of each other is as high as possible, using
+simulated annealing under a wall-clock budget.
+
+Each plant covers a rectangle of cells anchored at its (row, col): it is
+``ceil(spread / cell_size)`` cells wide and ``ceil(row_spacing / cell_size)``
+cells tall, so grid rows play the part of planting rows. Rectangles may not
+overlap each other, fixed placements or the grid edge.
+
+The solver is incremental: plants added with an anchor keep it when it is
+still free, so re-optimizing a previous layout after adding, removing or
+moving a plant starts from that layout (with a colder schedule) instead of
+from scratch, and each move is scored from the moved plants' neighbors
+rather than the whole grid.
+"""
+
+import math
+import random
+import time
+from .companions import COMPANION_NAMES, COMPANION_INDEX, DEFAULT_COMPANION_RADIUS, RELATION
+
+# Inches covered by one grid cell (square-foot gardening)
+CELL_SIZE_INCHES = 12
+
+DEFAULT_TIME_BUDGET_MS = 500
+MAX_TIME_BUDGET_MS = 5000
+
+# Each placed plant outweighs any companion score it could cost
+PLACED_BONUS = 1000
+
+# Starting temperatures for a fresh layout and for refining a previous one
+COLD_START_TEMPERATURE = 2.0
+WARM_START_TEMPERATURE = 0.4
+FINAL_TEMPERATURE = 0.02
+
+# Random free anchors tried per plant by the greedy initial placement, and
+# the share of the time budget it aims to stay within (fewer samples per
+# plant when there are many plants)
+GREEDY_SAMPLES = 120
+GREEDY_BUDGET_SHARE = 0.5
+
+EMPTY = -1
+
+
+def footprint(plant, cell_size=CELL_SIZE_INCHES):
+    """Return the (rows, cols) a plant covers for the given cell size in inches."""
+    rows = max(1, math.ceil((plant.row_spacing or 0) / cell_size))
+    cols = max(1, math.ceil((plant.spread or 0) / cell_size))
+    return rows, cols
+
+
+class _Item:
+    __slots__ = ("plant", "companion", "rows", "cols", "row", "col", "fixed")
+
+    def __init__(self, plant, rows, cols, fixed):
+        self.plant = plant
+        self.companion = COMPANION_INDEX.get(plant.name, EMPTY)
+        self.rows = rows
+        self.cols = cols
+        self.row = None
+        self.col = None
+        self.fixed = fixed
+
+
+class LayoutOptimizer:
+    """Simulated-annealing placement of plants on a ``grid_rows`` x ``grid_cols`` grid."""
+
+    def __init__(self, grid_rows, grid_cols, radius=DEFAULT_COMPANION_RADIUS,
+                 cell_size=CELL_SIZE_INCHES, rng=None):
+        self.grid_rows = grid_rows
+        self.grid_cols = grid_cols
+        self.radius = radius
+        self.cell_size = cell_size
+        self.rng = rng or random.Random()
+        self.items = []
+        self.grid = [EMPTY] * (grid_rows * grid_cols)  # cell -> item index
+        self.score = 0   # companion score of the current layout
+        self.warm = 0    # movable items that kept a given anchor
+
+    # Occupancy
+
+    def _fits(self, item, row, col, ignore=()):
+        if row < 0 or col < 0 or row + item.rows > self.grid_rows or col + item.cols > self.grid_cols:
+            return False
+        grid, width = self.grid, self.grid_cols
+        for r in range(row, row + item.rows):
+            base = r * width
+            for cell in range(base + col, base + col + item.cols):
+                occupant = grid[cell]
+                if occupant != EMPTY and occupant not in ignore:
+                    return False
+        return True
+
+    def _stamp(self, index, value):
+        item = self.items[index]
+        grid, width = self.grid, self.grid_cols
+        for r in range(item.row, min(item.row + item.rows, self.grid_rows)):
+            base = r * width
+            for cell in range(base + item.col, base + min(item.col + item.cols, width)):
+                grid[cell] = value
+
+    def _put(self, index, row, col):
+        item = self.items[index]
+        item.row, item.col = row, col
+        self._stamp(index, index)
+
+    def _lift(self, index):
+        self._stamp(index, EMPTY)
+
+    # Scoring
+
+    def _near(self, a, a_row, a_col, b, b_row, b_col):
+        """Whether two rectangles are within ``radius`` cells (Chebyshev gap)."""
+        gap_rows = max(b_row - (a_row + a.rows - 1), a_row - (b_row + b.rows - 1), 0)
+        gap_cols = max(b_col - (a_col + a.cols - 1), a_col - (b_col + b.cols - 1), 0)
+        return gap_rows <= self.radius and gap_cols <= self.radius
+
+    def _contribution(self, index, row, col):
+        """Relation score between an item placed at (row, col) and the items on the grid near it."""
+        item = self.items[index]
+        if item.companion == EMPTY:
+            return 0
+        radius, grid, width = self.radius, self.grid, self.grid_cols
+        base = item.companion * len(COMPANION_NAMES)
+        seen = set()
+        total = 0
+        for r in range(max(0, row - radius), min(self.grid_rows, row + item.rows + radius)):
+            offset = r * width
+            for cell in range(offset + max(0, col - radius), offset + min(width, col + item.cols + radius)):
+                other = grid[cell]
+                if other == EMPTY or other == index or other in seen:
+                    continue
+                seen.add(other)
+                companion = self.items[other].companion
+                if companion != EMPTY:
+                    total += RELATION[base + companion]
+        return total
+
+    def _pair(self, i, i_row, i_col, j, j_row, j_col):
+        a, b = self.items[i], self.items[j]
+        if a.companion == EMPTY or b.companion == EMPTY or not self._near(a, i_row, i_col, b, j_row, j_col):
+            return 0
+        return RELATION[a.companion * len(COMPANION_NAMES) + b.companion]
+
+    # Building the layout
+
+    def add_fixed(self, plant, row, col):
+        """Add an existing placement that is never moved (it may overlap other fixed ones)."""
+        rows, cols = footprint(plant, self.cell_size)
+        item = _Item(plant, rows, cols, fixed=True)
+        self.items.append(item)
+        index = len(self.items) - 1
+        if 0 <= row < self.grid_rows and 0 <= col < self.grid_cols:
+            self.score += self._contribution(index, row, col)
+            self._put(index, row, col)
+        return index
+
+    def add(self, plant, row=None, col=None):
+        """Add a plant to lay out; a free (row, col) anchor is kept as its starting position."""
+        rows, cols = footprint(plant, self.cell_size)
+        self.items.append(_Item(plant, rows, cols, fixed=False))
+        index = len(self.items) - 1
+        if row is not None and col is not None and self._fits(self.items[index], row, col):
+            self.score += self._contribution(index, row, col)
+            self._put(index, row, col)
+            self.warm += 1
+        return index
+
+    def _place_greedy(self, index, free, deadline, samples=GREEDY_SAMPLES):
+        """Place an item at the best of ``samples`` sampled free anchors.
+
+        ``free`` lists candidate anchor cells; cells that have since been
+        covered are dropped from it as they are met (placements only ever
+        remove free cells here). Returns False when the item does not fit
+        or the deadline passes during the crowded-grid scan.
+        """
+        item = self.items[index]
+        if item.rows > self.grid_rows or item.cols > self.grid_cols:
+            return False
+        grid, width, rng = self.grid, self.grid_cols, self.rng
+        best = None
+        for _ in range(samples):
+            if not free:
+                break
+            k = rng.randrange(len(free))
+            cell = free[k]
+            if grid[cell] != EMPTY:
+                free[k] = free[-1]
+                free.pop()
+                continue
+            row, col = divmod(cell, width)
+            if self._fits(item, row, col):
+                gain = self._contribution(index, row, col)
+                if best is None or gain > best[0]:
+                    best = (gain, row, col)
+        if best is None:
+            # Crowded grid: take the first free anchor that fits, if any
+            k = 0
+            while k < len(free):
+                if k & 63 == 0 and time.perf_counter() >= deadline:
+                    return False
+                cell = free[k]
+                if grid[cell] != EMPTY:
+                    free[k] = free[-1]
+                    free.pop()
+                    continue
+                row, col = divmod(cell, width)
+                if self._fits(item, row, col):
+                    best = (self._contribution(index, row, col), row, col)
+                    break
+                k += 1
+            if best is None:
+                return False
+        self.score += best[0]
+        self._put(index, best[1], best[2])
+        return True
+
+    # Annealing moves. Each returns the score delta of an applied move, or
+    # None when the move is not possible; ``undo`` reverts the last move.
+
+    def _relocate(self, index):
+        item = self.items[index]
+        max_row = self.grid_rows - item.rows
+        max_col = self.grid_cols - item.cols
+        if max_row < 0 or max_col < 0:
+            return None
+        row, col = self.rng.randint(0, max_row), self.rng.randint(0, max_col)
+        if (row, col) == (item.row, item.col) or not self._fits(item, row, col, ignore=(index,)):
+            return None
+        old_row, old_col = item.row, item.col
+        if old_row is not None:
+            self._lift(index)
+        delta = self._contribution(index, row, col)
+        if old_row is None:
+            delta += PLACED_BONUS
+        else:
+            delta -= self._contribution(index, old_row, old_col)
+        self._put(index, row, col)
+        self._undo = ("relocate", index, old_row, old_col)
+        return delta
+
+    def _swap(self, i, j):
+        a, b = self.items[i], self.items[j]
+        if (a.companion == b.companion and a.rows == b.rows and a.cols == b.cols) or a.row is None or b.row is None:
+            return None
+        a_row, a_col, b_row, b_col = a.row, a.col, b.row, b.col
+        self._lift(i)
+        self._lift(j)
+        if not (self._fits(a, b_row, b_col) and self._fits(b, a_row, a_col)
+                and not self._overlaps(a, b_row, b_col, b, a_row, a_col)):
+            self._put(i, a_row, a_col)
+            self._put(j, b_row, b_col)
+            return None
+        delta = (self._contribution(i, b_row, b_col) + self._contribution(j, a_row, a_col)
+                 + self._pair(i, b_row, b_col, j, a_row, a_col)
+                 - self._contribution(i, a_row, a_col) - self._contribution(j, b_row, b_col)
+                 - self._pair(i, a_row, a_col, j, b_row, b_col))
+        self._put(i, b_row, b_col)
+        self._put(j, a_row, a_col)
+        self._undo = ("swap", i, j)
+        return delta
+
+    @staticmethod
+    def _overlaps(a, a_row, a_col, b, b_row, b_col):
+        return (a_row < b_row + b.rows and b_row < a_row + a.rows
+                and a_col < b_col + b.cols and b_col < a_col + a.cols)
+
+    def _revert(self):
+        move = self._undo
+        if move[0] == "relocate":
+            _, index, row, col = move
+            item = self.items[index]
+            self._lift(index)
+            if row is None:
+                item.row = item.col = None
+            else:
+                self._put(index, row, col)
+        else:
+            _, i, j = move
+            a, b = self.items[i], self.items[j]
+            a_row, a_col, b_row, b_col = a.row, a.col, b.row, b.col
+            self._lift(i)
+            self._lift(j)
+            self._put(i, b_row, b_col)
+            self._put(j, a_row, a_col)
+
+    def _snapshot(self):
+        return [(item.row, item.col) for item in self.items]
+
+    def optimize(self, time_budget):
+        """Improve the layout for up to ``time_budget`` seconds and keep the best one found.
+
+        Returns a dict with the number of annealing iterations and the
+        seconds spent on the initial placement and in total.
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget
+        movable = [i for i, item in enumerate(self.items) if not item.fixed]
+
+        # Largest footprints first leaves room for the small ones. Plants not
+        # placed before the deadline stay unplaced.
+        free = [cell for cell, occupant in enumerate(self.grid) if occupant == EMPTY]
+        pending = sorted((i for i in movable if self.items[i].row is None),
+                         key=lambda i: -self.items[i].rows * self.items[i].cols)
+        greedy_deadline = started + time_budget * GREEDY_BUDGET_SHARE
+        samples, sampled = GREEDY_SAMPLES, 0
+        for n, index in enumerate(pending):
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if sampled:
+                # Spread what is left of the greedy share over the remaining plants
+                per_sample = (now - started) / sampled
+                affordable = (greedy_deadline - now) / (per_sample * (len(pending) - n))
+                samples = max(1, min(GREEDY_SAMPLES, int(affordable)))
+            self._place_greedy(index, free, deadline, samples)
+            sampled += samples
+        initial_seconds = time.perf_counter() - started
+
+        placed = sum(1 for i in movable if self.items[i].row is not None)
+        current = self.score + placed * PLACED_BONUS
+        best, best_layout = current, self._snapshot()
+        warm = movable and self.warm * 2 >= len(movable)
+        start_temperature = WARM_START_TEMPERATURE if warm else COLD_START_TEMPERATURE
+        temperature = start_temperature
+        iterations = 0
+        rng = self.rng
+
+        while movable:
+            if iterations & 255 == 0:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                progress = (now - started) / time_budget
+                temperature = start_temperature * (FINAL_TEMPERATURE / start_temperature) ** progress
+            iterations += 1
+
+            i = movable[rng.randrange(len(movable))]
+            if len(movable) > 1 and rng.random() < 0.3:
+                j = movable[rng.randrange(len(movable))]
+                delta = self._swap(i, j) if i != j else None
+            else:
+                delta = self._relocate(i)
+            if delta is None:
+                continue
+            if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                current += delta
+                if current > best:
+                    best, best_layout = current, self._snapshot()
+            else:
+                self._revert()
+
+        self._restore(best_layout)
+        return {
+            "iterations": iterations,
+            "initial_seconds": initial_seconds,
+            "seconds": time.perf_counter() - started,
+        }
+
+    def _restore(self, layout):
+        self.grid = [EMPTY] * (self.grid_rows * self.grid_cols)
+        self.score = 0
+        for index, (item, (row, col)) in enumerate(zip(self.items, layout)):
+            item.row, item.col = row, col
+            if row is not None:
+                self.score += self._contribution(index, row, col)
+                self._stamp(index, index)
+
+    def layout(self):
+        """Return ``(plant, row, col, rows, cols)`` for every movable plant, in the order added."""
+        return [(item.plant, item.row, item.col, item.rows, item.cols)
+                for item in self.items if not item.fixed]
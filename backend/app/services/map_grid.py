@@ -0,0 +1,295 @@
+"""
+In-memory garden map grid and batch map edits.
+
+``MapGrid`` holds a garden's placements as a flat row-major list of
+garden_plant ids (0 for an empty cell), loaded with one query, so
+occupancy checks during an edit never go back to the database.
+
+The map GET serves ``to_list()`` directly, and ``resize_map`` clears plants
+outside new bounds with one UPDATE, optionally repacking them into the
+remaining free cells.
+
+``apply_map_operations`` validates a whole list of place / move / swap /
+remove operations against that grid first, then writes the net changes
+with a handful of set-based statements and a single commit. A failing
+operation rejects the whole batch.
+
+``resize_map`` and ``apply_map_operations`` report the plants they write
+with core statements to ``map_versions.note_map_changes`` so the map
+version and change log see them.
+"""
+
+import logging
+from sqlalchemy import bindparam, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from ..models.database import db
+from ..models.user_garden_plant import GrowthStage, UserGardenPlant
+from .garden_contents import bump_contents_version
+from .map_versions import note_map_changes
+from .plant_catalog import find_plant
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_OPERATIONS = 500
+
+EMPTY = 0
+
+
+class MapBatchError(Exception):
+    """An operation of a batch map edit cannot be applied."""
+
+    def __init__(self, message, status_code=400, index=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.index = index
+
+
+class MapGrid:
+    """Occupancy of a garden grid: ``cells[row * cols + col]`` is a garden_plant id or 0."""
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.cells = [EMPTY] * (rows * cols)
+        self.positions = {}   # garden_plant id -> (row, col) or None when not on the map
+        self.plant_ids = {}   # garden_plant id -> plant id
+        self.displaced = []   # (row, col, garden_plant id) stored outside the grid
+
+    @classmethod
+    def load(cls, garden, rows=None, cols=None):
+        """Build the grid of a garden (or of new ``rows`` x ``cols`` bounds) from one query."""
+        grid = cls(rows or garden.grid_rows or 8, cols or garden.grid_cols or 10)
+        for garden_plant_id, plant_id, row, col in db.session.execute(
+            select(UserGardenPlant.id, UserGardenPlant.plant_id, UserGardenPlant.row, UserGardenPlant.col)
+            .where(UserGardenPlant.garden_id == garden.id)
+            .order_by(UserGardenPlant.id)
+        ):
+            grid.add(garden_plant_id, plant_id, row, col)
+        return grid
+
+    def add(self, garden_plant_id, plant_id, row, col):
+        """Record a stored placement; positions outside the grid are noted as displaced."""
+        self.plant_ids[garden_plant_id] = plant_id
+        self.positions[garden_plant_id] = None
+        if row is None or col is None:
+            return
+        if not self.in_bounds(row, col):
+            self.displaced.append((row, col, garden_plant_id))
+        elif not self.occupant(row, col):
+            self.put(garden_plant_id, row, col)
+
+    def to_list(self):
+        """Return the grid as a list of rows of garden_plant ids (0 for empty cells)."""
+        cols = self.cols
+        return [self.cells[start:start + cols] for start in range(0, len(self.cells), cols)]
+
+    def free_cells(self):
+        """Yield empty (row, col) cells in row-major order."""
+        for cell, occupant in enumerate(self.cells):
+            if occupant == EMPTY:
+                yield divmod(cell, self.cols)
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def occupant(self, row, col):
+        return self.cells[row * self.cols + col]
+
+    def put(self, garden_plant_id, row, col):
+        self.cells[row * self.cols + col] = garden_plant_id
+        self.positions[garden_plant_id] = (row, col)
+
+    def lift(self, garden_plant_id):
+        position = self.positions.get(garden_plant_id)
+        if position is not None:
+            self.cells[position[0] * self.cols + position[1]] = EMPTY
+            self.positions[garden_plant_id] = None
+
+
+def _cell(operation, index, grid):
+    row, col = operation.get("row"), operation.get("col")
+    if isinstance(row, bool) or isinstance(col, bool) or not isinstance(row, int) or not isinstance(col, int):
+        raise MapBatchError("row and col must be integers", 400, index)
+    if not grid.in_bounds(row, col):
+        raise MapBatchError("Position is outside the garden grid", 400, index)
+    return row, col
+
+
+def _garden_plant(garden_plant_id, index, grid):
+    if isinstance(garden_plant_id, bool) or not isinstance(garden_plant_id, int) or garden_plant_id <= 0 \
+            or garden_plant_id not in grid.positions:
+        raise MapBatchError(f"Garden plant {garden_plant_id} not found in this garden", 404, index)
+    return garden_plant_id
+
+
+def _free(grid, row, col, index, moving=None):
+    occupant = grid.occupant(row, col)
+    if occupant != EMPTY and occupant != moving:
+        raise MapBatchError(f"Cell ({row}, {col}) is already occupied", 409, index)
+
+
+def _write_positions(positions):
+    """Set (row, col) for many garden plants with one executemany UPDATE."""
+    if positions:
+        table = UserGardenPlant.__table__
+        db.session.execute(
+            update(table).where(table.c.id == bindparam("b_id"))
+            .values(row=bindparam("b_row"), col=bindparam("b_col")),
+            [{"b_id": i, "b_row": row, "b_col": col} for i, (row, col) in positions],
+        )
+
+
+def resize_map(garden, grid_rows, grid_cols, repack=False):
+    """Resize a garden's grid and return the map diff of displaced plants.
+
+    Plants outside the new bounds are taken off the map with one UPDATE.
+    With ``repack`` they are then moved, in their old row-major order, into
+    the free cells of the new grid; those that do not fit stay unplaced.
+    The caller commits.
+    """
+    table = UserGardenPlant.__table__
+    out_of_bounds = (table.c.garden_id == garden.id) & or_(table.c.row >= grid_rows, table.c.col >= grid_cols)
+
+    repacked = []
+    if repack:
+        grid = MapGrid.load(garden, grid_rows, grid_cols)
+        displaced = [garden_plant_id for _, _, garden_plant_id in sorted(grid.displaced)]
+        repacked = list(zip(displaced, grid.free_cells()))
+        cleared = displaced[len(repacked):]
+        db.session.execute(update(table).where(out_of_bounds).values(row=None, col=None))
+        _write_positions(repacked)
+    else:
+        cleared = db.session.execute(
+            update(table).where(out_of_bounds).values(row=None, col=None).returning(table.c.id)
+        ).scalars().all()
+
+    garden.grid_rows = grid_rows
+    garden.grid_cols = grid_cols
+    note_map_changes(db.session, garden.id, [i for i, _ in repacked] + list(cleared))
+    return {
+        "moved": [{"id": i, "row": row, "col": col} for i, (row, col) in repacked]
+                 + [{"id": i, "row": None, "col": None} for i in sorted(cleared)],
+    }
+
+
+def apply_map_operations(garden, operations):
+    """Apply a batch of map operations atomically and return the map diff.
+
+    Operations are applied in order:
+
+        {"op": "place", "plant_id", "row", "col", "growth_stage"}
+        {"op": "move", "garden_plant_id", "row", "col"}
+        {"op": "swap", "garden_plant_ids": [a, b]}
+        {"op": "remove", "garden_plant_id"}
+
+    Plants placed by the batch cannot be referenced by later operations.
+    Raises MapBatchError (nothing is written) when an operation fails.
+    """
+    grid = MapGrid.load(garden)
+    original = dict(grid.positions)
+    removed = []
+    new_plants = []  # (temporary id, plant record, growth stage)
+    next_temporary_id = -1
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise MapBatchError("Each operation must be an object", 400, index)
+        op = operation.get("op")
+
+        if op == "place":
+            row, col = _cell(operation, index, grid)
+            plant = find_plant(operation.get("plant_id"))
+            if not plant:
+                raise MapBatchError("Plant not found", 404, index)
+            stage = operation.get("growth_stage", "SEEDLING")
+            if not isinstance(stage, str) or stage.upper() not in GrowthStage.__members__:
+                raise MapBatchError("growth_stage must be one of: " + ", ".join(GrowthStage.__members__), 400, index)
+            _free(grid, row, col, index)
+            grid.put(next_temporary_id, row, col)
+            new_plants.append((next_temporary_id, plant, GrowthStage[stage.upper()]))
+            next_temporary_id -= 1
+
+        elif op == "move":
+            garden_plant_id = _garden_plant(operation.get("garden_plant_id"), index, grid)
+            row, col = _cell(operation, index, grid)
+            _free(grid, row, col, index, moving=garden_plant_id)
+            grid.lift(garden_plant_id)
+            grid.put(garden_plant_id, row, col)
+
+        elif op == "swap":
+            ids = operation.get("garden_plant_ids")
+            if not isinstance(ids, list) or len(ids) != 2:
+                raise MapBatchError("garden_plant_ids must list two garden plants", 400, index)
+            a = _garden_plant(ids[0], index, grid)
+            b = _garden_plant(ids[1], index, grid)
+            a_position, b_position = grid.positions[a], grid.positions[b]
+            grid.lift(a)
+            grid.lift(b)
+            if b_position is not None:
+                grid.put(a, *b_position)
+            if a_position is not None:
+                grid.put(b, *a_position)
+
+        elif op == "remove":
+            garden_plant_id = _garden_plant(operation.get("garden_plant_id"), index, grid)
+            grid.lift(garden_plant_id)
+            del grid.positions[garden_plant_id]
+            removed.append(garden_plant_id)
+
+        else:
+            raise MapBatchError("op must be one of: place, move, swap, remove", 400, index)
+
+    moved = [
+        (garden_plant_id, position)
+        for garden_plant_id, position in grid.positions.items()
+        if garden_plant_id > 0 and position != original[garden_plant_id]
+    ]
+
+    table = UserGardenPlant.__table__
+    placed = []
+    moved_ids = [i for i, _ in moved]
+    try:
+        if removed:
+            db.session.execute(delete(table).where(table.c.id.in_(removed)))
+        if moved:
+            # Clear old cells first so swaps never hold two plants in one cell
+            db.session.execute(update(table).where(table.c.id.in_(moved_ids)).values(row=None, col=None))
+            _write_positions([(i, p) for i, p in moved if p is not None])
+        if new_plants:
+            values = []
+            for temporary_id, plant, stage in new_plants:
+                row, col = grid.positions[temporary_id]
+                values.append({"garden_id": garden.id, "plant_id": plant.id, "growth_stage": stage,
+                               "row": row, "col": col})
+            new_ids = db.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), values
+            ).scalars().all()
+            for new_id, (temporary_id, plant, stage) in zip(new_ids, new_plants):
+                row, col = grid.positions[temporary_id]
+                placed.append({
+                    "id": new_id,
+                    "plant_id": plant.id,
+                    "plant_name": plant.name,
+                    "growth_stage": stage.value,
+                    "row": row,
+                    "col": col,
+                    "image_url": plant.image_url,
+                })
+        if removed or new_plants:
+            bump_contents_version(db.session.connection(), [garden.id])
+        note_map_changes(db.session, garden.id, [*removed, *moved_ids, *(p["id"] for p in placed)])
+        db.session.commit()
+    except IntegrityError:
+        # Another request took one of the cells since the grid was loaded
+        db.session.rollback()
+        raise MapBatchError("The map changed while the batch was applied; reload and retry", 409)
+    except Exception:
+        db.session.rollback()
+        logger.error("Batch map edit of garden %s failed", garden.id, exc_info=True)
+        raise
+
+    return {
+        "placed": placed,
+        "moved": [{"id": i, "row": p[0] if p else None, "col": p[1] if p else None} for i, p in moved],
+        "removed": removed,
+    }
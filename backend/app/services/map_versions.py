@@ -0,0 +1,130 @@
+"""
+Garden map versioning and change log.
+
+``UserGarden.map_version`` is bumped once per committed transaction that
+changes a garden's map (a plant placed, moved, updated or removed, or the
+garden renamed or resized), and every garden plant touched is logged in
+``garden_map_change`` under the new version. A client that holds version
+``v`` can then fetch just the placements changed since ``v``
+(``changes_since``) instead of the whole map.
+
+ORM changes are picked up by a flush hook; code that writes garden plants
+with core statements reports them with ``note_map_changes``. The log keeps
+at least the last ``MAP_CHANGE_RETENTION`` versions of each garden; older
+clients get the full map.
+"""
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.orm import Session, attributes
+from ..models.database import db
+from ..models.user_garden import UserGarden
+from ..models.user_garden_plant import GardenMapChange, UserGardenPlant
+
+# Versions of change log kept per garden
+MAP_CHANGE_RETENTION = 500
+
+# Old log rows of a garden are pruned every this many versions
+PRUNE_EVERY = 50
+
+# Garden attributes that are part of the map response
+_MAP_GARDEN_ATTRIBUTES = ("garden_name", "grid_rows", "grid_cols")
+
+_PENDING_KEY = "map_changes"
+
+
+def note_map_changes(session, garden_id, garden_plant_ids=()):
+    """Record that a garden's map changed in the session's current transaction.
+
+    The version is bumped (once per garden) and the ids logged when the
+    transaction commits.
+    """
+    session.info.setdefault(_PENDING_KEY, {}).setdefault(garden_id, set()).update(garden_plant_ids)
+
+
+def changes_since(garden_id, since):
+    """Return ``(rows, removed_ids)`` for the garden plants changed after version ``since``.
+
+    ``rows`` are ``(id, plant_id, growth_stage, row, col, expected_harvest_date)``
+    of changed plants still in the garden, in id order; ``removed_ids`` are
+    the changed ids that no longer are.
+    """
+    rows, removed = [], []
+    for garden_plant_id, *placement in db.session.execute(
+        select(GardenMapChange.garden_plant_id, UserGardenPlant.id, UserGardenPlant.plant_id,
+               UserGardenPlant.growth_stage, UserGardenPlant.row, UserGardenPlant.col,
+               UserGardenPlant.expected_harvest_date)
+        .outerjoin(UserGardenPlant, (UserGardenPlant.id == GardenMapChange.garden_plant_id)
+                   & (UserGardenPlant.garden_id == garden_id))
+        .where(GardenMapChange.garden_id == garden_id, GardenMapChange.version > since)
+        # The plant columns follow from the id, so DISTINCT leaves one row per plant
+        .distinct()
+        .order_by(GardenMapChange.garden_plant_id)
+    ):
+        if placement[0] is None:
+            removed.append(garden_plant_id)
+        else:
+            rows.append(tuple(placement))
+    return rows, removed
+
+
+@event.listens_for(Session, "after_flush")
+def _map_changes_flushed(session, flush_context):
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, UserGardenPlant) and obj.garden_id is not None:
+            note_map_changes(session, obj.garden_id, (obj.id,))
+    for obj in session.deleted:
+        if isinstance(obj, UserGarden):
+            note_map_changes(session, obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, UserGardenPlant) and session.is_modified(obj):
+            history = attributes.get_history(obj, "garden_id")
+            for garden_id in (*history.added, *history.unchanged, *history.deleted):
+                if garden_id is not None:
+                    note_map_changes(session, garden_id, (obj.id,))
+        elif isinstance(obj, UserGarden) and obj.id is not None and any(
+            attributes.get_history(obj, name).has_changes() for name in _MAP_GARDEN_ATTRIBUTES
+        ):
+            note_map_changes(session, obj.id)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_map_versions(session):
+    # Flush first so the changes of pending objects are collected too
+    session.flush()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    connection = session.connection()
+    table = UserGarden.__table__
+    bumped = connection.execute(
+        update(table)
+        .where(table.c.id.in_(pending))
+        .values(map_version=table.c.map_version + 1)
+        .returning(table.c.id, table.c.map_version)
+    ).all()
+
+    log = GardenMapChange.__table__
+    # Gardens deleted in this transaction take their log with them
+    deleted = set(pending).difference(garden_id for garden_id, _ in bumped)
+    if deleted:
+        connection.execute(delete(log).where(log.c.garden_id.in_(deleted)))
+    rows = [
+        {"garden_id": garden_id, "version": version, "garden_plant_id": garden_plant_id}
+        for garden_id, version in bumped
+        for garden_plant_id in pending[garden_id]
+    ]
+    if rows:
+        connection.execute(insert(log), rows)
+    for garden_id, version in bumped:
+        if version % PRUNE_EVERY == 0 and version > MAP_CHANGE_RETENTION:
+            connection.execute(
+                delete(log).where(log.c.garden_id == garden_id,
+                                  log.c.version <= version - MAP_CHANGE_RETENTION)
+            )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_map_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
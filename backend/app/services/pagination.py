@@ -0,0 +1,133 @@
+"""
+Keyset pagination for dated history listings (journal entries, harvests).
+
+Listings are ordered newest first on ``(date, id)``, which the
+``(garden_id, user_id, date)`` indexes serve directly (SQLite appends the
+rowid to every index). A cursor is ``"<iso date>,<id>"`` of a row already
+shown: ``before`` continues towards older rows, ``after`` back towards newer
+ones. Rows without a date sort last, as ``ORDER BY date DESC`` puts them.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from sqlalchemy import and_, or_
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(date, row_id):
+    return f"{date.isoformat() if date else ''},{row_id}"
+
+
+def decode_cursor(value):
+    """Return (date or None, id) from a cursor string. Raises ValueError."""
+    date_part, sep, id_part = value.rpartition(",")
+    if not sep:
+        raise ValueError("Invalid cursor.")
+    try:
+        return (_naive_utc(datetime.fromisoformat(date_part)) if date_part else None), int(id_part)
+    except ValueError:
+        raise ValueError("Invalid cursor.") from None
+
+
+def _naive_utc(value):
+    # Dates are stored as naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_date_bound(value, end=False):
+    """Parse a from/to bound. A bare date covers that whole day.
+
+    Returns (datetime, inclusive). Raises ValueError.
+    """
+    if len(value) == 10:
+        day = datetime.combine(datetime.strptime(value, "%Y-%m-%d").date(), time.min)
+        return (day + timedelta(days=1), False) if end else (day, True)
+    return _naive_utc(datetime.fromisoformat(value.replace("Z", "+00:00"))), True
+
+
+def parse_listing_args(args):
+    """Read limit/before/after/from/to from request args. Raises ValueError."""
+    params = {"limit": None, "before": None, "after": None, "from": None, "to": None}
+    if "limit" in args:
+        limit = args.get("limit", type=int)
+        if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+        params["limit"] = limit
+    if "before" in args and "after" in args:
+        raise ValueError("Use either before or after, not both.")
+    for key in ("before", "after"):
+        if key in args:
+            params[key] = decode_cursor(args[key])
+    for key in ("from", "to"):
+        if key in args:
+            try:
+                params[key] = parse_date_bound(args[key], end=key == "to")
+            except ValueError:
+                raise ValueError(f"Invalid {key} date; use YYYY-MM-DD or an ISO datetime.") from None
+    return params
+
+
+def filter_date_range(query, date_column, params):
+    """Apply the from/to bounds of ``params`` to ``query``."""
+    if params["from"]:
+        query = query.filter(date_column >= params["from"][0])
+    if params["to"]:
+        bound, inclusive = params["to"]
+        query = query.filter(date_column <= bound if inclusive else date_column < bound)
+    return query
+
+
+def _older_than(date_column, id_column, cursor):
+    """Dated rows after the cursor in newest-first order (a range seek)."""
+    date, row_id = cursor
+    return and_(date_column <= date, or_(date_column < date, id_column < row_id))
+
+
+def _newer_than(date_column, id_column, cursor):
+    date, row_id = cursor
+    if date is None:
+        return or_(date_column.isnot(None), id_column > row_id)
+    return and_(date_column >= date, or_(date_column > date, id_column > row_id))
+
+
+def keyset_page(query, date_column, id_column, params):
+    """Run ``query`` for one page. Returns (rows, next_cursor, prev_cursor).
+
+    Rows are newest first. Cursors are None when there is nothing further
+    in that direction (or, without limit/before/after, always None).
+    """
+    query = filter_date_range(query, date_column, params)
+    limit, before, after = params["limit"], params["before"], params["after"]
+    fetch = limit + 1 if limit else None
+
+    if after is not None:
+        rows = query.filter(_newer_than(date_column, id_column, after))\
+            .order_by(date_column.asc(), id_column.asc()).limit(fetch).all()
+    elif before is not None and before[0] is None:
+        rows = query.filter(date_column.is_(None), id_column < before[1])\
+            .order_by(id_column.desc()).limit(fetch).all()
+    elif before is not None:
+        rows = query.filter(_older_than(date_column, id_column, before))\
+            .order_by(date_column.desc(), id_column.desc()).limit(fetch).all()
+        # Undated rows sort last; the range seek above skips them
+        if not fetch or len(rows) < fetch:
+            rows += query.filter(date_column.is_(None)).order_by(id_column.desc())\
+                .limit(fetch - len(rows) if fetch else None).all()
+    else:
+        rows = query.order_by(date_column.desc(), id_column.desc()).limit(fetch).all()
+
+    has_more = bool(limit) and len(rows) > limit
+    rows = rows[:limit] if limit else rows
+    if after is not None:
+        rows.reverse()
+    if not rows or (limit is None and before is None and after is None):
+        return rows, None, None
+
+    def cursor(row):
+        return encode_cursor(getattr(row, date_column.key), getattr(row, id_column.key))
+
+    if after is not None:
+        return rows, cursor(rows[-1]), cursor(rows[0]) if has_more else None
+    return rows, cursor(rows[-1]) if has_more else None, cursor(rows[0]) if before is not None else None
@@ -0,0 +1,229 @@
+"""
+Shared in-process plant catalog.
+
+The plant table is nearly static, so it is loaded once per process into a
+read-only ``PlantCatalog`` (id -> record, name -> id and per-attribute
+indexes) that routes read instead of re-querying and re-hydrating ORM
+objects on every request.
+
+Any flush or bulk statement that writes ``Plant`` rows (``plants.add_plant``,
+the ``app/scripts`` importers) bumps the ``plant_catalog_version`` row in the
+same transaction and drops this process's copy on commit. Other processes
+notice the new version the next time they re-check it, at most every
+``PLANT_CATALOG_RECHECK_SECONDS``. Either way, callbacks registered with
+``on_catalog_change`` are then called so caches derived from the catalog
+can be rebuilt off the request path.
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+from ..models.database import db
+from ..models.plant import Plant, PlantCatalogVersion
+
+logger = logging.getLogger(__name__)
+
+# Immutable, attribute-compatible stand-in for a Plant row
+PlantRecord = namedtuple("PlantRecord", [column.key for column in Plant.__table__.columns])
+
+# Attributes with a small set of values that get an exact-match index
+INDEXED_ATTRIBUTES = (
+    "growing_season",
+    "water_needs",
+    "sunlight",
+    "space_required",
+    "sowing_method",
+    "requires_greenhouse",
+    "suitable_for_containers",
+)
+
+DEFAULT_RECHECK_SECONDS = 5.0
+
+
+class PlantCatalog:
+    """Read-only snapshot of the plant table."""
+
+    def __init__(self, records, version):
+        self.version = version
+        self.records = tuple(records)
+        self.by_id = {}
+        self.name_to_id = {}
+        self.indexes = {attr: {} for attr in INDEXED_ATTRIBUTES}
+
+        for record in self.records:
+            self.by_id[record.id] = record
+            self.name_to_id.setdefault(record.name, record.id)
+            for attr, index in self.indexes.items():
+                index.setdefault(getattr(record, attr), []).append(record.id)
+
+        # Freeze the posting lists so callers cannot mutate the snapshot
+        for index in self.indexes.values():
+            for value, ids in index.items():
+                index[value] = tuple(ids)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, plant_id):
+        """Return the record for a plant id (int or numeric string), or None."""
+        try:
+            return self.by_id.get(int(plant_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name):
+        """Return the first record with the given exact name, or None."""
+        plant_id = self.name_to_id.get(name)
+        return self.by_id[plant_id] if plant_id is not None else None
+
+    def filter(self, **criteria):
+        """Return records matching every ``attribute=value`` pair, in id order.
+
+        Only attributes in INDEXED_ATTRIBUTES can be used.
+        """
+        if not criteria:
+            return list(self.records)
+
+        postings = sorted(
+            (self.indexes[attr].get(value, ()) for attr, value in criteria.items()),
+            key=len,
+        )
+        # Walk the shortest posting list (already in id order) and probe the rest
+        others = [set(posting) for posting in postings[1:]]
+        return [
+            self.by_id[plant_id] for plant_id in postings[0]
+            if all(plant_id in other for other in others)
+        ]
+
+
+_catalog = None
+_checked_at = 0.0
+_lock = threading.Lock()
+_change_callbacks = []
+
+
+def on_catalog_change(callback):
+    """Register ``callback(app)``, called when this process's catalog goes stale."""
+    _change_callbacks.append(callback)
+    return callback
+
+
+def _catalog_changed():
+    if not has_app_context():
+        return
+    app = current_app._get_current_object()
+    for callback in _change_callbacks:
+        try:
+            callback(app)
+        except Exception:
+            logger.error("Plant catalog change callback %r failed", callback, exc_info=True)
+
+
+def _read_version():
+    """Return the shared catalog version (None if the row is missing)."""
+    return db.session.execute(
+        select(PlantCatalogVersion.version).where(PlantCatalogVersion.id == 1)
+    ).scalar()
+
+
+def _load_catalog(version):
+    rows = db.session.execute(select(Plant.__table__).order_by(Plant.id)).all()
+    catalog = PlantCatalog((PlantRecord(*row) for row in rows), version)
+    logger.info("Loaded plant catalog: plants=%d version=%s", len(catalog), version)
+    return catalog
+
+
+def get_plant_catalog(recheck=False):
+    """Return the current plant catalog, reloading it if it has changed.
+
+    The shared version is re-read at most every PLANT_CATALOG_RECHECK_SECONDS
+    unless ``recheck`` is set.
+    """
+    global _catalog, _checked_at
+
+    interval = current_app.config.get("PLANT_CATALOG_RECHECK_SECONDS", DEFAULT_RECHECK_SECONDS)
+    catalog = _catalog
+    if catalog is not None and not recheck and time.monotonic() - _checked_at < interval:
+        return catalog
+
+    with _lock:
+        version = _read_version()
+        # Another process wrote plants since this catalog was loaded
+        changed = _catalog is not None and version is not None and version != _catalog.version
+        if _catalog is None or changed:
+            _catalog = _load_catalog(version)
+        _checked_at = time.monotonic()
+        catalog = _catalog
+    if changed:
+        _catalog_changed()
+    return catalog
+
+
+def find_plant(plant_id):
+    """Look up one plant, re-checking the catalog version on a miss.
+
+    The re-check covers plants added by another process since this
+    process last looked.
+    """
+    record = get_plant_catalog().get(plant_id)
+    if record is None:
+        record = get_plant_catalog(recheck=True).get(plant_id)
+    return record
+
+
+def invalidate_plant_catalog():
+    """Drop this process's catalog so the next read reloads it."""
+    global _catalog
+    with _lock:
+        _catalog = None
+    _catalog_changed()
+
+
+def _bump_version(connection):
+    """Increment the shared catalog version inside the current transaction."""
+    result = connection.execute(
+        update(PlantCatalogVersion.__table__)
+        .where(PlantCatalogVersion.id == 1)
+        .values(version=PlantCatalogVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(PlantCatalogVersion.__table__).values(id=1, version=1))
+
+
+def _mark_catalog_written(session):
+    if not session.info.get("plant_catalog_written"):
+        session.info["plant_catalog_written"] = True
+        _bump_version(session.connection())
+
+
+@event.listens_for(Session, "after_flush")
+def _plant_rows_flushed(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Plant):
+            _mark_catalog_written(session)
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _plant_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if any(mapper.class_ is Plant for mapper in orm_execute_state.all_mappers):
+            _mark_catalog_written(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _plant_writes_committed(session):
+    if session.info.pop("plant_catalog_written", False):
+        invalidate_plant_catalog()
+
+
+@event.listens_for(Session, "after_rollback")
+def _plant_writes_rolled_back(session):
+    session.info.pop("plant_catalog_written", None)
@@ -0,0 +1,222 @@
+"""
+Precomputed plant-scoring engine for personalized recommendations.
+
+The plant catalog is held in memory as integer-encoded columns (zone
+bounds, season, sunlight, water, space, sowing method). Plants that share
+the same encoded attributes share a scoring "profile", so a request only
+scores each distinct profile once and then selects the top-k plants with a
+partial heap select instead of sorting the whole catalog.
+
+The engine is rebuilt from the shared ``PlantCatalog`` whenever the catalog
+is reloaded. The point values mirror ``recommendations.score_plant``, which
+is still used to build the human-readable reasons/warnings for the plants
+that are actually returned.
+"""
+
+import heapq
+import logging
+import threading
+from array import array
+from ..routes.frost_dates import parse_zone_number
+from .plant_catalog import get_plant_catalog
+
+logger = logging.getLogger(__name__)
+
+# Categorical vocabularies. Code 0 means "no value", codes 1..n are the
+# vocabulary entries and n + 1 means "a value we do not recognize".
+SEASONS = ("Spring", "Summer", "Fall", "Winter")
+SUN_LEVELS = ("Full Shade", "Partial Shade", "Partial Sun", "Full Sun")
+WATER_LEVELS = ("Low", "Medium", "High")
+SPACE_LEVELS = ("Small", "Medium", "Large")
+
+# Sowing method classes, checked in the same order as the seasonal route
+SOW_NONE, SOW_TRANSPLANT, SOW_DIRECT, SOW_OTHER = 0, 1, 2, 3
+
+# Sentinel for a missing or unparseable hardiness bound
+NO_ZONE = -1
+
+MAX_SCORE = 100
+
+
+def encode_category(value, vocabulary):
+    """Encode a categorical value as 0 (missing), 1..n (known) or n + 1 (other)."""
+    if not value:
+        return 0
+    try:
+        return vocabulary.index(value) + 1
+    except ValueError:
+        return len(vocabulary) + 1
+
+
+def encode_zone(zone_str):
+    """Encode a hardiness zone string as its numeric zone, or NO_ZONE."""
+    if not zone_str:
+        return NO_ZONE
+    zone_num = parse_zone_number(zone_str)
+    return NO_ZONE if zone_num is None else zone_num
+
+
+def encode_sowing_method(sowing_method):
+    """Classify a free-text sowing method into one of the SOW_* codes."""
+    if not sowing_method:
+        return SOW_NONE
+    lowered = sowing_method.lower()
+    if "transplant" in lowered:
+        return SOW_TRANSPLANT
+    if "direct" in lowered:
+        return SOW_DIRECT
+    return SOW_OTHER
+
+
+def _zone_points(user_zone_num, zone_min, zone_max):
+    """Zone compatibility points (30 full, 0 mismatch, 15 unknown)."""
+    if user_zone_num is None:
+        return 15
+    if zone_min == NO_ZONE and zone_max == NO_ZONE:
+        return 15
+    if zone_min != NO_ZONE and user_zone_num < zone_min:
+        return 0
+    if zone_max != NO_ZONE and user_zone_num > zone_max:
+        return 0
+    return 30
+
+
+def _season_table(current_season_code):
+    """Season timing points indexed by plant season code."""
+    table = [12] * (len(SEASONS) + 2)
+    for code in range(1, len(SEASONS) + 1):
+        diff = abs(code - current_season_code)
+        distance = min(diff, len(SEASONS) - diff)
+        if distance == 0:
+            table[code] = 25
+        elif distance == 1:
+            table[code] = 12
+        else:
+            table[code] = 0
+    return table
+
+
+def _sun_table(user_sun_code):
+    """Sunlight match points indexed by plant sunlight code."""
+    table = [10] * (len(SUN_LEVELS) + 2)
+    if not user_sun_code:
+        return table
+    for code in range(1, len(SUN_LEVELS) + 1):
+        diff = abs(code - user_sun_code)
+        if diff == 0:
+            table[code] = 20
+        elif diff == 1:
+            table[code] = 12
+        else:
+            table[code] = 4
+    return table
+
+
+def _water_table(has_irrigation):
+    """Water match points indexed by plant water code."""
+    if has_irrigation:
+        return [8, 15, 15, 15, 15]
+    return [8, 15, 15, 5, 5]
+
+
+# Space efficiency points indexed by plant space code
+SPACE_TABLE = [5, 10, 7, 4, 0]
+
+
+class PlantScoringEngine:
+    """Columnar, integer-encoded view of the plant catalog used for scoring."""
+
+    def __init__(self, rows):
+        """Build the engine from rows exposing the Plant scoring attributes."""
+        self.records = tuple(rows)
+        self.season = array("b")
+        self.sowing = array("b")
+        self.greenhouse = array("b")
+        self.profile_of = array("l")
+        self.profiles = []
+
+        profile_index = {}
+        for row in self.records:
+            profile = (
+                encode_zone(row.hardiness_min),
+                encode_zone(row.hardiness_max),
+                encode_category(row.growing_season, SEASONS),
+                encode_category(row.sunlight, SUN_LEVELS),
+                encode_category(row.water_needs, WATER_LEVELS),
+                encode_category(row.space_required, SPACE_LEVELS),
+            )
+            code = profile_index.get(profile)
+            if code is None:
+                code = profile_index[profile] = len(self.profiles)
+                self.profiles.append(profile)
+
+            self.season.append(profile[2])
+            self.sowing.append(encode_sowing_method(row.sowing_method))
+            self.greenhouse.append(1 if row.requires_greenhouse else 0)
+            self.profile_of.append(code)
+
+    def __len__(self):
+        return len(self.records)
+
+    def score_all(self, user_zone, user_sunlight, has_irrigation, current_season):
+        """Return the score of every plant, in catalog order.
+
+        ``user_sunlight`` is a sunlight category (e.g. "Full Sun") or None.
+        """
+        user_zone_num = parse_zone_number(user_zone) if user_zone else None
+        season_table = _season_table(encode_category(current_season, SEASONS))
+        sun_table = _sun_table(encode_category(user_sunlight, SUN_LEVELS) if user_sunlight else 0)
+        water_table = _water_table(has_irrigation)
+
+        profile_scores = [
+            _zone_points(user_zone_num, zone_min, zone_max)
+            + season_table[season]
+            + sun_table[sun]
+            + water_table[water]
+            + SPACE_TABLE[space]
+            for zone_min, zone_max, season, sun, water, space in self.profiles
+        ]
+        return [profile_scores[code] for code in self.profile_of]
+
+    def top_k(self, scores, k, candidates=None):
+        """Return the indices of the k best-scoring plants.
+
+        Ties keep catalog order, matching a stable descending sort.
+        """
+        indices = range(len(scores)) if candidates is None else candidates
+        return heapq.nlargest(k, indices, key=scores.__getitem__)
+
+    def seasonal_candidates(self, current_season, next_season):
+        """Return indices of plants to sow now or start indoors for next season."""
+        current_code = encode_category(current_season, SEASONS)
+        next_code = encode_category(next_season, SEASONS)
+        season, sowing, greenhouse = self.season, self.sowing, self.greenhouse
+        return [
+            i for i in range(len(season))
+            if season[i] == current_code
+            or (season[i] == next_code and (greenhouse[i] or sowing[i] == SOW_TRANSPLANT))
+        ]
+
+
+# (catalog, engine) pair, swapped atomically when the catalog is reloaded
+_engine_state = (None, None)
+_engine_lock = threading.Lock()
+
+
+def get_scoring_engine():
+    """Return the shared scoring engine, rebuilding it when the catalog changes."""
+    global _engine_state
+
+    catalog = get_plant_catalog()
+    built_for, engine = _engine_state
+    if built_for is catalog:
+        return engine
+
+    with _engine_lock:
+        built_for, engine = _engine_state
+        if built_for is not catalog:
+            engine = PlantScoringEngine(catalog.records)
+            _engine_state = (catalog, engine)
+            logger.info("Built plant scoring engine: plants=%d profiles=%d",
+                        len(engine), len(engine.profiles))
+    return engine
@@ -0,0 +1,231 @@
+"""
+In-memory ranked search over the plant catalog.
+
+Names, scientific names and descriptions are tokenized into an inverted
+index (token -> {plant_id: field weight}) with a sorted vocabulary for
+prefix expansion, so "tom che" finds "Cherry Tomato" while the user is
+still typing. Plant names also get a trigram index so that a substring of
+a name ("berry" in "Strawberry") keeps matching as it did with ILIKE.
+
+Scores are sum(field weight * idf) over the query terms, plus a bonus when
+the query matches the name itself. Exact token hits outrank prefix hits.
+
+The index follows the shared ``PlantCatalog``. When a reload only appends
+plants (the usual ``add_plant`` / importer case) the new index is derived
+from the previous one by indexing just the new records; anything else
+rebuilds it.
+"""
+
+import copy
+import logging
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from .plant_catalog import get_plant_catalog
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a token found in each field
+FIELD_WEIGHTS = (
+    ("name", 10.0),
+    ("scientific_name", 5.0),
+    ("description", 1.0),
+)
+
+# Score multiplier for a prefix hit relative to an exact token hit
+PREFIX_FACTOR = 0.6
+
+# Bonuses when the whole query matches the plant name
+NAME_EXACT_BONUS = 100.0
+NAME_PREFIX_BONUS = 50.0
+NAME_SUBSTRING_BONUS = 20.0
+
+# Prefix expansion needs this many characters and is capped per term
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSION = 256
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase and strip accents."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PlantSearchIndex:
+    """Inverted index over plant records. Treat instances as immutable."""
+
+    def __init__(self, records=()):
+        self.record_ids = []
+        self.names = {}       # plant_id -> normalized name
+        self.postings = {}    # token -> {plant_id: weight}
+        self.vocabulary = []  # sorted tokens
+        self.name_trigrams = {}  # trigram -> set of plant_ids
+        for record in records:
+            self._add(record)
+
+    def __len__(self):
+        return len(self.record_ids)
+
+    def extended(self, records):
+        """Return a new index with ``records`` added.
+
+        Posting lists touched by the new records are copied, everything else
+        is shared with this index.
+        """
+        index = copy.copy(self)
+        index.record_ids = list(self.record_ids)
+        index.names = dict(self.names)
+        index.postings = dict(self.postings)
+        index.vocabulary = list(self.vocabulary)
+        index.name_trigrams = dict(self.name_trigrams)
+        copied = set()
+        for record in records:
+            index._add(record, copied)
+        return index
+
+    def _add(self, record, copied=None):
+        """Index one record. ``copied`` tracks shared containers already copied."""
+        plant_id = record.id
+        self.record_ids.append(plant_id)
+
+        weights = {}
+        for field, weight in FIELD_WEIGHTS:
+            for token in set(tokenize(getattr(record, field))):
+                weights[token] = weights.get(token, 0.0) + weight
+
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                insort(self.vocabulary, token)
+                if copied is not None:
+                    copied.add(("t", token))
+            elif copied is not None and ("t", token) not in copied:
+                posting = self.postings[token] = dict(posting)
+                copied.add(("t", token))
+            posting[plant_id] = weight
+
+        name = normalize(record.name)
+        self.names[plant_id] = name
+        for gram in trigrams(name):
+            ids = self.name_trigrams.get(gram)
+            if ids is None:
+                ids = self.name_trigrams[gram] = set()
+                if copied is not None:
+                    copied.add(("g", gram))
+            elif copied is not None and ("g", gram) not in copied:
+                ids = self.name_trigrams[gram] = set(ids)
+                copied.add(("g", gram))
+            ids.add(plant_id)
+
+    def _expand(self, term):
+        """Return (token, factor) pairs that a query term matches."""
+        matches = []
+        if term in self.postings:
+            matches.append((term, 1.0))
+        if len(term) >= MIN_PREFIX_LENGTH:
+            i = bisect_left(self.vocabulary, term)
+            end = min(len(self.vocabulary), i + MAX_PREFIX_EXPANSION)
+            while i < end and self.vocabulary[i].startswith(term):
+                if self.vocabulary[i] != term:
+                    matches.append((self.vocabulary[i], PREFIX_FACTOR))
+                i += 1
+        return matches
+
+    def _name_substring_ids(self, query):
+        if len(query) < 3:
+            return {pid for pid, name in self.names.items() if query in name}
+        postings = sorted((self.name_trigrams.get(g, ()) for g in trigrams(query)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {pid for pid in candidates if query in self.names[pid]}
+
+    def search(self, query):
+        """Return [(plant_id, score)] for plants matching ``query``, best first.
+
+        A plant matches when every query term hits one of its fields (exactly
+        or as a prefix), or when the query is a substring of its name.
+        """
+        normalized = normalize(query).strip()
+        terms = tokenize(normalized)
+        if not terms:
+            return []
+
+        total = len(self.record_ids) or 1
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token, factor in self._expand(term):
+                posting = self.postings[token]
+                idf = math.log(1.0 + total / len(posting))
+                for plant_id, weight in posting.items():
+                    score = weight * idf * factor
+                    if score > term_scores.get(plant_id, 0.0):
+                        term_scores[plant_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+            if not scores:
+                break
+
+        scores = scores or {}
+        for plant_id in self._name_substring_ids(normalized):
+            name = self.names[plant_id]
+            if name == normalized:
+                bonus = NAME_EXACT_BONUS
+            elif name.startswith(normalized):
+                bonus = NAME_PREFIX_BONUS
+            else:
+                bonus = NAME_SUBSTRING_BONUS
+            scores[plant_id] = scores.get(plant_id, 0.0) + bonus
+
+        return sorted(scores.items(), key=lambda item: (-item[1], self.names[item[0]], item[0]))
+
+
+# (catalog, index) pair, swapped atomically when the catalog is reloaded
+_index_state = (None, None)
+_index_lock = threading.Lock()
+
+
+def _derive_index(previous_catalog, previous_index, catalog):
+    """Build the index for ``catalog``, reusing the previous one when possible."""
+    if previous_index is not None:
+        known = previous_catalog.records
+        if catalog.records[:len(known)] == known:
+            added = catalog.records[len(known):]
+            logger.info("Extending plant search index: added=%d", len(added))
+            return previous_index.extended(added)
+    index = PlantSearchIndex(catalog.records)
+    logger.info("Built plant search index: plants=%d tokens=%d", len(index), len(index.vocabulary))
+    return index
+
+
+def get_search_index():
+    """Return the search index for the current plant catalog."""
+    global _index_state
+
+    catalog = get_plant_catalog()
+    built_for, index = _index_state
+    if built_for is catalog:
+        return index
+
+    with _index_lock:
+        built_for, index = _index_state
+        if built_for is not catalog:
+            index = _derive_index(built_for, index, catalog)
+            _index_state = (catalog, index)
+    return index
@@ -0,0 +1,150 @@
+"""
+Thread-safe in-process TTL cache with request coalescing.
+
+``TTLCache.get_or_load`` returns a cached value while it is fresh. After
+``ttl`` seconds the value goes stale: it is still served for up to
+``stale_ttl`` more seconds while a single background refresh runs
+(stale-while-revalidate). Concurrent misses for the same key are coalesced so
+only one caller runs the loader and the others wait for its result.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Every live cache, for metrics
+_caches = weakref.WeakSet()
+
+
+def all_caches():
+    """Return the live TTLCache instances, sorted by name."""
+    return sorted(list(_caches), key=lambda cache: cache.name)
+
+
+class _Flight:
+    """An in-progress load that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    ``ttl=None`` keeps entries until they are evicted by size.
+    """
+
+    def __init__(self, name, ttl=None, stale_ttl=0, max_entries=10000):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._flights = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _age(self, stored_at):
+        return time.monotonic() - stored_at
+
+    def get(self, key):
+        """Return a fresh cached value, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and self._age(entry[1]) >= self.ttl):
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key, loader):
+        """Return the value for ``key``, calling ``loader()`` on a miss.
+
+        Exceptions raised by the loader propagate to every coalesced caller
+        and nothing is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self._age(entry[1])
+                if self.ttl is None or age < self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh, args=(key, loader), daemon=True
+                        ).start()
+                    return entry[0]
+
+            self.misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._store(key, flight.value)
+            return flight.value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _refresh(self, key, loader):
+        """Reload a stale entry in the background, keeping it on failure."""
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning("Background refresh failed cache=%s key=%s: %s", self.name, key, e)
+        else:
+            with self._lock:
+                self._store(key, value)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -0,0 +1,100 @@
+"""
+Cached Open-Meteo lookups for the weather route.
+
+Zip code -> coordinates results never change in practice, so they are kept
+in an in-process map backed by the ``geocoded_zip`` table and survive
+restarts. Forecasts are cached per ~11 km grid cell (coordinates rounded to
+``GRID_DECIMALS``) for ``FORECAST_TTL`` seconds, then served stale for up to
+``FORECAST_STALE_TTL`` more while one background refresh runs. Concurrent
+misses for the same zip or cell share a single outbound call.
+"""
+
+import logging
+import requests
+from sqlalchemy.exc import IntegrityError
+from ..models.database import db
+from ..metrics import external_call
+from ..models.geocode import GeocodedZip
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Timeout for external API calls (seconds)
+EXTERNAL_API_TIMEOUT = 10
+
+# Forecast cache: fresh for 10 minutes, then served stale for up to 30 more
+FORECAST_TTL = 600
+FORECAST_STALE_TTL = 1800
+
+# Round coordinates to 0.1 degree, about the resolution of the forecast model
+GRID_DECIMALS = 1
+
+_geocode_cache = TTLCache("geocode", max_entries=50000)
+_forecast_cache = TTLCache("forecast", ttl=FORECAST_TTL, stale_ttl=FORECAST_STALE_TTL, max_entries=5000)
+
+
+class WeatherUpstreamError(Exception):
+    """Raised when Open-Meteo returns a response we cannot use."""
+
+
+def _fetch_coordinates(zip_code):
+    with external_call("open_meteo_geocoding"):
+        response = requests.get(GEOCODING_URL, params={"name": zip_code}, timeout=EXTERNAL_API_TIMEOUT)
+        payload = response.json() if response.status_code == 200 else {}
+        if "results" not in payload:
+            logger.warning("Failed to geocode zip=%s status=%s", zip_code, response.status_code)
+            raise WeatherUpstreamError("Failed to fetch location data.")
+    result = payload["results"][0]
+    return result["latitude"], result["longitude"]
+
+
+def _load_coordinates(zip_code):
+    row = db.session.get(GeocodedZip, zip_code)
+    if row is not None:
+        return row.latitude, row.longitude
+
+    latitude, longitude = _fetch_coordinates(zip_code)
+    db.session.add(GeocodedZip(zip_code=zip_code, latitude=latitude, longitude=longitude))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process stored the same zip first
+        db.session.rollback()
+    return latitude, longitude
+
+
+def get_coordinates(zip_code):
+    """Return (latitude, longitude) for a zip code."""
+    return _geocode_cache.get_or_load(zip_code, lambda: _load_coordinates(zip_code))
+
+
+def grid_cell(latitude, longitude):
+    """Snap coordinates to the forecast cache grid."""
+    return round(latitude, GRID_DECIMALS), round(longitude, GRID_DECIMALS)
+
+
+def _fetch_forecast(cell):
+    latitude, longitude = cell
+    with external_call("open_meteo_forecast"):
+        response = requests.get(
+            OPEN_METEO_URL,
+            params={
+                "latitude": latitude,
+                "longitude": longitude,
+                "current": "temperature_2m,precipitation,weathercode",
+            },
+            timeout=EXTERNAL_API_TIMEOUT,
+        )
+        if response.status_code != 200:
+            logger.warning("Weather API returned status=%s for cell=%s", response.status_code, cell)
+            raise WeatherUpstreamError("Failed to fetch weather data.")
+        return response.json()
+
+
+def get_forecast(latitude, longitude):
+    """Return the current-conditions forecast for the grid cell containing a point."""
+    cell = grid_cell(latitude, longitude)
+    return _forecast_cache.get_or_load(cell, lambda: _fetch_forecast(cell))
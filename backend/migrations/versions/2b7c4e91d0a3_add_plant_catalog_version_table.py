@@ -0,0 +1,29 @@
+"""Add plant_catalog_version table
+
+Revision ID: 2b7c4e91d0a3
+Revises: 75b8a2a646f9
+Create Date: 2026-10-17 10:12:44.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7c4e91d0a3'
+down_revision = '75b8a2a646f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    plant_catalog_version = op.create_table('plant_catalog_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(plant_catalog_version, [{'id': 1, 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('plant_catalog_version')
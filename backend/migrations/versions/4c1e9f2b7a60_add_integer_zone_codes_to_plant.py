@@ -0,0 +1,68 @@
+"""Add integer half-zone codes to plant
+
+Revision ID: 4c1e9f2b7a60
+Revises: 8e3d5b7a9c14
+Create Date: 2026-10-17 13:02:41.905337
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1e9f2b7a60'
+down_revision = '8e3d5b7a9c14'
+branch_labels = None
+depends_on = None
+
+# Mirrors app.models.plant.zone_code_range at the time of this migration
+_ZONE_RE = re.compile(r"^\s*(\d{1,2})\s*([ab])?\s*$", re.IGNORECASE)
+
+
+def _zone_code_range(zone):
+    match = _ZONE_RE.match(zone or "")
+    if not match:
+        return None, None
+    code = int(match.group(1)) * 2
+    half = (match.group(2) or "").lower()
+    if half == "a":
+        return code, code
+    if half == "b":
+        return code + 1, code + 1
+    return code, code + 1
+
+
+def upgrade():
+    with op.batch_alter_table('plant', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hardiness_min_code', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('hardiness_max_code', sa.Integer(), nullable=True))
+
+    # Populate the codes once per distinct (min, max) pair
+    plant = sa.table(
+        'plant',
+        sa.column('hardiness_min', sa.String),
+        sa.column('hardiness_max', sa.String),
+        sa.column('hardiness_min_code', sa.Integer),
+        sa.column('hardiness_max_code', sa.Integer),
+    )
+    bind = op.get_bind()
+    pairs = bind.execute(sa.select(plant.c.hardiness_min, plant.c.hardiness_max).distinct()).all()
+    for zone_min, zone_max in pairs:
+        bind.execute(
+            plant.update()
+            .where(
+                plant.c.hardiness_min.is_(None) if zone_min is None else plant.c.hardiness_min == zone_min,
+                plant.c.hardiness_max.is_(None) if zone_max is None else plant.c.hardiness_max == zone_max,
+            )
+            .values(
+                hardiness_min_code=_zone_code_range(zone_min)[0],
+                hardiness_max_code=_zone_code_range(zone_max)[1],
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('plant', schema=None) as batch_op:
+        batch_op.drop_column('hardiness_max_code')
+        batch_op.drop_column('hardiness_min_code')
@@ -0,0 +1,41 @@
+"""Make garden map cells unique
+
+Revision ID: 7c3e9a5d2b18
+Revises: e2a6c4d81f35
+Create Date: 2026-10-17 18:31:52.418337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9a5d2b18'
+down_revision = 'e2a6c4d81f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plants sharing a cell keep the oldest one on the map; the others are unplaced
+    op.execute(
+        """
+        UPDATE user_garden_plant SET "row" = NULL, col = NULL
+        WHERE "row" IS NOT NULL AND col IS NOT NULL
+          AND id NOT IN (
+            SELECT MIN(id) FROM user_garden_plant
+            WHERE "row" IS NOT NULL AND col IS NOT NULL
+            GROUP BY garden_id, "row", col
+          )
+        """
+    )
+
+    with op.batch_alter_table('user_garden_plant', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_garden_plant_garden_cell')
+        batch_op.create_index('uq_user_garden_plant_garden_cell', ['garden_id', 'row', 'col'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_garden_plant', schema=None) as batch_op:
+        batch_op.drop_index('uq_user_garden_plant_garden_cell')
+        batch_op.create_index('ix_user_garden_plant_garden_cell', ['garden_id', 'row', 'col'], unique=False)
@@ -0,0 +1,91 @@
+"""
+Query-count regression test for ``GET /api/tasks``.
+
+The route loads the profile zone, gardens and garden plants in one query
+and reads plant attributes from the in-memory catalog, so the number of
+statements it issues must not grow with the number of gardens or plants.
+"""
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app
+from app.models.database import db
+from app.models.garden_type import GardenType, GardenTypeEnum
+from app.models.plant import Plant
+from app.models.profile import UserProfile
+from app.models.user import User
+from app.models.user_garden import UserGarden
+from app.models.user_garden_plant import UserGardenPlant
+from app.scripts.populate_plant_database import PLANTS
+from app.services.plant_catalog import get_plant_catalog, invalidate_plant_catalog
+
+# (gardens, plants per garden) for each user
+SHAPES = [(0, 0), (2, 5), (7, 20)]
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.config["SECRET_KEY"] = "tasks-query-count"
+    app.config["JWT_SECRET_KEY"] = "tasks-query-count-jwt-secret-key-32b"
+    app.config["HARDINESS_ZONE_HTTP_FALLBACK"] = False
+    # Keep the catalog version re-check out of the counted requests
+    app.config["PLANT_CATALOG_RECHECK_SECONDS"] = 3600
+    with app.app_context():
+        invalidate_plant_catalog()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        invalidate_plant_catalog()
+
+
+def _seed_user(index, garden_count, plants_per_garden, plant_ids):
+    user = User(username=f"tasks{index}", email=f"tasks{index}@example.com")
+    user.set_password("Tasks-passw0rd")
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(UserProfile(user_id=user.id, zip_code="10001", plant_hardiness_zone="7b",
+                               sunlight_hours=6, has_irrigation=False))
+    for g in range(garden_count):
+        garden = UserGarden(user_id=user.id, garden_name=f"Garden {g}", garden_type_id=1)
+        db.session.add(garden)
+        db.session.flush()
+        for p in range(plants_per_garden):
+            db.session.add(UserGardenPlant(garden_id=garden.id, plant_id=plant_ids[p % len(plant_ids)],
+                                           row=p // 10, col=p % 10))
+    db.session.commit()
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+def _count_statements(client, headers):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        response = client.get("/api/tasks", headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+def test_task_queries_do_not_grow_with_gardens_or_plants(app):
+    for plant_data in PLANTS[:25]:
+        db.session.add(Plant(**plant_data))
+    db.session.add(GardenType(name=GardenTypeEnum.RAISED_BED))
+    db.session.commit()
+    plant_ids = [plant.id for plant in Plant.query.order_by(Plant.id)]
+
+    users = [_seed_user(i, gardens, plants, plant_ids) for i, (gardens, plants) in enumerate(SHAPES)]
+    client = app.test_client()
+    # Load the plant catalog up front so its one-time load is not counted
+    get_plant_catalog()
+
+    counts = {shape: _count_statements(client, headers) for shape, headers in zip(SHAPES, users)}
+    assert len(set(counts.values())) == 1, f"statements per request by (gardens, plants): {counts}"